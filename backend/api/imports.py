@@ -0,0 +1,78 @@
+"""
+Bulk Import API
+Streams an uploaded companies or ESG score history file (CSV, JSONL or Parquet)
+into the store with the bulk importer.
+
+Imports write to the store, so the endpoint requires the IMPORT_API_TOKEN bearer
+token (and is disabled while none is set) and rejects bodies over IMPORT_MAX_BYTES.
+"""
+
+import hmac
+import tempfile
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+from config.settings import IMPORT_API_TOKEN, IMPORT_CHUNK_SIZE, IMPORT_MAX_BYTES, IMPORT_SPOOL_MAX_MEMORY
+from database.importer import FORMATS, KINDS, TARGETS, get_store, run_import
+
+router = APIRouter()
+
+
+def require_import_token(authorization: Optional[str] = Header(None)):
+    """Rejects the request unless it carries the configured import token."""
+    if not IMPORT_API_TOKEN:
+        raise HTTPException(status_code=403, detail="The import API is disabled; set IMPORT_API_TOKEN to enable it")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), IMPORT_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing import token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+def too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {IMPORT_MAX_BYTES} byte import limit")
+
+
+@router.post("/{kind}", dependencies=[Depends(require_import_token)])
+async def import_file(
+    kind: str,
+    request: Request,
+    format: str = Query(..., description="csv, jsonl or parquet"),
+    target: str = Query("db", description="db (database) or json (data/*.json)"),
+    chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=100000),
+):
+    """
+    Import the request body as companies or scores. The body is the raw file
+    (send `Content-Encoding: gzip` for gzipped CSV/JSONL); it is spooled to disk
+    as it arrives and imported in chunks, so large files do not build up in memory.
+    """
+    if kind not in KINDS or format not in FORMATS or target not in TARGETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Kind must be one of {list(KINDS)}, format one of {list(FORMATS)}, target one of {list(TARGETS)}"
+        )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > IMPORT_MAX_BYTES:
+        raise too_large()
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY) as upload:
+        # Chunked uploads carry no length, so the limit is also enforced as the body arrives
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:
+                raise too_large()
+            upload.write(chunk)
+        upload.seek(0)
+        compressed = request.headers.get("content-encoding", "").lower() == "gzip"
+        try:
+            # Validation and bulk writes are blocking; keep them off the event loop
+            stats = await run_in_threadpool(
+                run_import, kind, upload, format, get_store(target), chunk_size, None, None, compressed
+            )
+        except (ValueError, ImportError) as e:
+            raise HTTPException(status_code=400, detail=f"Error importing {kind}: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error importing {kind}: {str(e)}")
+    return stats
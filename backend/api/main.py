@@ -5,6 +5,8 @@ Main FastAPI application for ESG Builder backend.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .recommendations import router as recommendations_router
+from .portfolios import router as portfolios_router
+from .imports import router as imports_router
 
 app = FastAPI(
     title="ESG Builder API",
@@ -27,6 +29,16 @@ app.include_router(
     prefix="/api/recommendations",
     tags=["recommendations"]
 )
+app.include_router(
+    portfolios_router,
+    prefix="/api/portfolios",
+    tags=["portfolios"]
+)
+app.include_router(
+    imports_router,
+    prefix="/api/import",
+    tags=["import"]
+)
 
 @app.get("/")
 async def root():
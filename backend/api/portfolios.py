@@ -0,0 +1,72 @@
+"""
+Portfolios API
+FastAPI endpoints for portfolios with their companies' latest ESG scores and
+per-portfolio ESG summaries.
+"""
+
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.api.recommendations import recommendation_service
+from backend.services.portfolio_summary import latest_scores_by_company, portfolio_details, summarize_portfolios
+from config.settings import RECOMMENDATION_DATA_SOURCE
+
+router = APIRouter()
+
+
+async def load_portfolios(portfolio_id: Optional[int] = None) -> List[Dict]:
+    """Portfolios with members and latest scores, from the database (three queries) or data/*.json."""
+    if RECOMMENDATION_DATA_SOURCE == "database":
+        from database.async_database import get_async_sessionmaker
+        from database.repository import AsyncRepository
+
+        async with get_async_sessionmaker()() as db:
+            return await AsyncRepository(db).list_portfolios_with_scores(portfolio_id)
+
+    portfolios = [p for p in recommendation_service.portfolios if portfolio_id is None or p["id"] == portfolio_id]
+    companies_by_id = {c["id"]: c for c in recommendation_service.companies}
+    return portfolio_details(portfolios, companies_by_id, latest_scores_by_company(recommendation_service.esg_scores))
+
+
+async def load_summaries(portfolio_ids: Optional[List[int]] = None) -> List[Dict]:
+    """ESG summaries of every portfolio, or only `portfolio_ids`, from the database (three queries) or data/*.json."""
+    if RECOMMENDATION_DATA_SOURCE == "database":
+        from database.async_database import get_async_sessionmaker
+        from database.repository import AsyncRepository
+
+        async with get_async_sessionmaker()() as db:
+            return await AsyncRepository(db).portfolio_summaries(portfolio_ids)
+
+    latest_scores = latest_scores_by_company(recommendation_service.esg_scores)
+    return summarize_portfolios(recommendation_service.portfolios, latest_scores, portfolio_ids)
+
+
+@router.get("/")
+async def list_portfolios():
+    """List portfolios with their companies and each company's latest ESG score."""
+    try:
+        return {"portfolios": await load_portfolios()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching portfolios: {str(e)}")
+
+
+@router.get("/summary")
+async def get_portfolio_summaries(portfolio_ids: Optional[List[int]] = Query(None)):
+    """Average latest environmental, social, governance and total scores per portfolio."""
+    try:
+        return {"summaries": await load_summaries(portfolio_ids)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error summarizing portfolios: {str(e)}")
+
+
+@router.get("/{portfolio_id}")
+async def get_portfolio(portfolio_id: int):
+    """Get one portfolio with its companies and their latest ESG scores."""
+    try:
+        portfolios = await load_portfolios(portfolio_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching portfolio: {str(e)}")
+    if not portfolios:
+        raise HTTPException(status_code=404, detail=f"Portfolio {portfolio_id} not found")
+    return portfolios[0]
@@ -3,7 +3,10 @@ Portfolio Recommendations API
 FastAPI endpoints for generating and managing portfolio recommendations.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from backend.services.recommendation_service import (
@@ -12,10 +15,57 @@ from backend.services.recommendation_service import (
     RiskPreference,
     SectorAllocation
 )
+from config.settings import RECOMMENDATION_DATA_SOURCE, RECOMMENDATION_CACHE_SECONDS
 
 router = APIRouter()
 recommendation_service = PortfolioRecommendationService()
 
+# Database-backed service and when it was loaded (time.monotonic())
+_database_service: Optional[PortfolioRecommendationService] = None
+_database_service_loaded_at = 0.0
+_database_service_lock = asyncio.Lock()
+
+
+async def get_recommendation_service() -> PortfolioRecommendationService:
+    """
+    The service over data/*.json or, with RECOMMENDATION_DATA_SOURCE=database, over
+    the companies and latest scores read through the async repository. The database
+    snapshot is reused for RECOMMENDATION_CACHE_SECONDS instead of reloaded per request.
+    """
+    global _database_service, _database_service_loaded_at
+    if RECOMMENDATION_DATA_SOURCE != "database":
+        return recommendation_service
+
+    async with _database_service_lock:
+        if _database_service is None or time.monotonic() - _database_service_loaded_at > RECOMMENDATION_CACHE_SECONDS:
+            # Imported here so the JSON source does not need the async database drivers
+            from database.async_database import get_async_sessionmaker
+            from database.repository import AsyncRepository
+
+            async with get_async_sessionmaker()() as db:
+                repository = AsyncRepository(db)
+                companies = await repository.list_companies()
+                latest_scores = await repository.latest_scores()
+                portfolios = await repository.list_portfolios()
+            _database_service = PortfolioRecommendationService(
+                companies=companies, esg_scores=list(latest_scores.values()), portfolios=portfolios
+            )
+            _database_service_loaded_at = time.monotonic()
+        return _database_service
+
+
+async def load_company_values(field: str) -> List[str]:
+    """Sorted distinct 'sector' or 'region' values, with one SELECT DISTINCT in database mode."""
+    if RECOMMENDATION_DATA_SOURCE == "database":
+        from database.async_database import get_async_sessionmaker
+        from database.repository import AsyncRepository
+
+        async with get_async_sessionmaker()() as db:
+            repository = AsyncRepository(db)
+            return await (repository.sectors() if field == "sector" else repository.regions())
+
+    return sorted({company[field] for company in recommendation_service.companies if company.get(field)})
+
 
 class ESGFilterRequest(BaseModel):
     """Request model for ESG filters."""
@@ -55,7 +105,10 @@ class RecommendationResponse(BaseModel):
 
 
 @router.post("/generate", response_model=RecommendationResponse)
-async def generate_recommendation(request: RecommendationRequest):
+async def generate_recommendation(
+    request: RecommendationRequest,
+    service: PortfolioRecommendationService = Depends(get_recommendation_service),
+):
     """
     Generate a portfolio recommendation based on ESG filters and preferences.
 
@@ -96,7 +149,7 @@ async def generate_recommendation(request: RecommendationRequest):
         )
 
         # Generate recommendation
-        recommendation = recommendation_service.generate_recommendation(
+        recommendation = service.generate_recommendation(
             filters=esg_filter,
             risk_preference=risk_pref,
             sector_targets=request.sector_targets,
@@ -113,11 +166,7 @@ async def generate_recommendation(request: RecommendationRequest):
 async def get_available_sectors():
     """Get list of available sectors for filtering."""
     try:
-        sectors = set()
-        for company in recommendation_service.companies:
-            sectors.add(company["sector"])
-
-        return {"sectors": sorted(list(sectors))}
+        return {"sectors": await load_company_values("sector")}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sectors: {str(e)}")
 
@@ -126,11 +175,7 @@ async def get_available_sectors():
 async def get_available_regions():
     """Get list of available regions for filtering."""
     try:
-        regions = set()
-        for company in recommendation_service.companies:
-            regions.add(company["region"])
-
-        return {"regions": sorted(list(regions))}
+        return {"regions": await load_company_values("region")}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching regions: {str(e)}")
 
@@ -142,6 +187,7 @@ async def get_filtered_company_count(
     excluded_sectors: Optional[List[str]] = Query(None),
     preferred_regions: Optional[List[str]] = Query(None),
     excluded_regions: Optional[List[str]] = Query(None),
+    service: PortfolioRecommendationService = Depends(get_recommendation_service),
 ):
     """Get count of companies that match the specified filters."""
     try:
@@ -153,7 +199,7 @@ async def get_filtered_company_count(
             excluded_regions=excluded_regions or [],
         )
 
-        filtered_companies = recommendation_service.filter_companies_by_esg(esg_filter)
+        filtered_companies = service.filter_companies_by_esg(esg_filter)
 
         return {"count": len(filtered_companies)}
     except Exception as e:
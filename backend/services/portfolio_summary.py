@@ -0,0 +1,62 @@
+"""
+Portfolio ESG Summary
+Per-portfolio ESG averages over each member company's latest score, computed
+in bulk: callers load the latest scores once for all members instead of
+querying per portfolio and per company.
+
+Works on plain records, i.e. the dicts of data/*.json or database.repository:
+portfolios {"id", "name", "companies": [{"id"}, ...]}, companies {"id", "name",
+"ticker", ...} and scores {"company_id", "rating_date", "<pillar>_score", ...}.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+SCORE_FIELDS = ("environmental_score", "social_score", "governance_score", "total_score")
+
+
+def latest_scores_by_company(esg_scores: Iterable[Dict]) -> Dict[int, Dict]:
+    """Each company's most recent score record (latest rating_date; later records win ties)."""
+    latest: Dict[int, Dict] = {}
+    for score in esg_scores:
+        current = latest.get(score["company_id"])
+        if current is None or score["rating_date"] >= current["rating_date"]:
+            latest[score["company_id"]] = score
+    return latest
+
+
+def portfolio_details(portfolios: Iterable[Dict], companies_by_id: Dict[int, Dict],
+                      latest_scores: Dict[int, Dict]) -> List[Dict]:
+    """Portfolios with their member companies expanded and each member's latest score (or None)."""
+    details = []
+    for portfolio in portfolios:
+        members = []
+        for member in portfolio.get("companies") or []:
+            company = dict(companies_by_id.get(member["id"], member))
+            company["latest_score"] = latest_scores.get(member["id"])
+            members.append(company)
+        details.append({**portfolio, "companies": members})
+    return details
+
+
+def summarize_portfolio(portfolio: Dict, latest_scores: Dict[int, Dict]) -> Dict:
+    """Average latest pillar scores of a portfolio's members; members without a score are left out."""
+    member_ids = [member["id"] for member in portfolio.get("companies") or []]
+    scores = [latest_scores[company_id] for company_id in member_ids if company_id in latest_scores]
+    summary = {
+        "id": portfolio["id"],
+        "name": portfolio["name"],
+        "company_count": len(member_ids),
+        "scored_count": len(scores),
+        "as_of": max((score["rating_date"] for score in scores), default=None),
+    }
+    for field in SCORE_FIELDS:
+        values = [score[field] for score in scores if score.get(field) is not None]
+        summary[f"average_{field[:-len('_score')]}"] = round(sum(values) / len(values), 2) if values else None
+    return summary
+
+
+def summarize_portfolios(portfolios: Iterable[Dict], latest_scores: Dict[int, Dict],
+                         portfolio_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+    """summarize_portfolio() for every portfolio (or only `portfolio_ids`)."""
+    wanted = set(portfolio_ids) if portfolio_ids is not None else None
+    return [summarize_portfolio(p, latest_scores) for p in portfolios if wanted is None or p["id"] in wanted]
@@ -94,11 +94,18 @@ class PortfolioRecommendation:
 class PortfolioRecommendationService:
     """Service for generating portfolio recommendations."""
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        companies: Optional[List[Dict]] = None,
+        esg_scores: Optional[List[Dict]] = None,
+        portfolios: Optional[List[Dict]] = None,
+    ):
+        """Loads data/*.json, unless the records are passed in (e.g. read through the database repository)."""
         self.data_dir = Path(data_dir)
-        self.companies = self._load_companies()
-        self.esg_scores = self._load_esg_scores()
-        self.portfolios = self._load_portfolios()
+        self.companies = companies if companies is not None else self._load_companies()
+        self.esg_scores = esg_scores if esg_scores is not None else self._load_esg_scores()
+        self.portfolios = portfolios if portfolios is not None else self._load_portfolios()
 
     def _load_companies(self) -> List[Dict]:
         """Load company data."""
@@ -0,0 +1,114 @@
+"""
+Streaming ESG Score Aggregation
+Exponentially weighted, time-decayed pillar scores, updated one document at a time.
+
+For every company and source type (news, report) we keep a DecayedScoreState:
+the decayed total weight, the weighted mean and the weighted sum of squared
+deviations (for the variance) of each pillar, the document count and the time
+of the last update. A document's weight halves every half-life of its source
+type, so an update only needs the previous state, never the history:
+
+    decay = 0.5 ** (elapsed / half_life)
+    weight = weight * decay + 1
+    mean += (x - mean) / weight
+    m2 = m2 * decay + (x - mean_before) * (x - mean_after)
+
+Decay scales every past weight by the same factor, so the mean only moves on
+updates; reading a score at a later time just decays the weight of each source
+type before the source types are combined.
+"""
+
+import time
+from typing import Dict, Optional
+
+from config.settings import SCORE_HALF_LIFE_NEWS_HOURS, SCORE_HALF_LIFE_REPORT_HOURS
+
+PILLARS = ("environmental", "social", "governance", "total")
+
+HALF_LIVES_HOURS = {
+    "news": SCORE_HALF_LIFE_NEWS_HOURS,
+    "report": SCORE_HALF_LIFE_REPORT_HOURS,
+}
+
+
+def decay_factor(elapsed_seconds: float, half_life_hours: float) -> float:
+    """Weight left after `elapsed_seconds`; a half-life of 0 or less disables decay."""
+    if half_life_hours <= 0 or elapsed_seconds <= 0:
+        return 1.0
+    return 0.5 ** (elapsed_seconds / (half_life_hours * 3600))
+
+
+class DecayedScoreState:
+    """Time-decayed running mean and variance of the pillar scores of one source type."""
+
+    def __init__(self, weight: float = 0.0, count: int = 0, last_update: Optional[float] = None,
+                 mean: Optional[Dict[str, float]] = None, m2: Optional[Dict[str, float]] = None):
+        self.weight = weight
+        self.count = count
+        self.last_update = last_update
+        self.mean = mean or {pillar: 0.0 for pillar in PILLARS}
+        self.m2 = m2 or {pillar: 0.0 for pillar in PILLARS}
+
+    def update(self, scores: Dict, at: float, half_life_hours: float):
+        """
+        Adds one document's scores ('<pillar>_score' keys) observed at `at` (epoch seconds).
+        A document older than the last update is added with its weight already decayed.
+        """
+        if self.last_update is None or at >= self.last_update:
+            decay = decay_factor(at - self.last_update, half_life_hours) if self.last_update is not None else 1.0
+            self.weight *= decay
+            for pillar in PILLARS:
+                self.m2[pillar] *= decay
+            self.last_update = at
+            weight = 1.0
+        else:
+            weight = decay_factor(self.last_update - at, half_life_hours)
+
+        self.weight += weight
+        self.count += 1
+        for pillar in PILLARS:
+            value = float(scores.get(f"{pillar}_score", 0) or 0)
+            delta = value - self.mean[pillar]
+            self.mean[pillar] += weight * delta / self.weight
+            self.m2[pillar] += weight * delta * (value - self.mean[pillar])
+
+    def weight_at(self, now: float, half_life_hours: float) -> float:
+        if self.last_update is None:
+            return 0.0
+        return self.weight * decay_factor(now - self.last_update, half_life_hours)
+
+    def variance(self, pillar: str) -> float:
+        return self.m2[pillar] / self.weight if self.weight > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"weight": self.weight, "count": self.count, "last_update": self.last_update,
+                "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DecayedScoreState":
+        return cls(data["weight"], data["count"], data["last_update"], dict(data["mean"]), dict(data["m2"]))
+
+
+def combine_states(states: Dict[str, DecayedScoreState], now: Optional[float] = None,
+                   half_lives: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Combines the per-source states of one company into ESG scores as of `now`,
+    weighting each source type's mean by its decayed weight. Returns None when
+    the company has no analyzed documents.
+    """
+    now = time.time() if now is None else now
+    half_lives = half_lives or HALF_LIVES_HOURS
+    weights = {
+        source_type: state.weight_at(now, half_lives.get(source_type, 0))
+        for source_type, state in states.items() if state.count
+    }
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return None
+
+    scores = {}
+    for pillar in PILLARS:
+        mean = sum(states[s].mean[pillar] * w for s, w in weights.items()) / total_weight
+        scores[f"{pillar}_score"] = round(mean, 2)
+    scores["documents"] = sum(states[s].count for s in weights)
+    return scores
@@ -2,40 +2,48 @@ from data_collection.scrapers.reports_scraper import scrape_esg_reports
 from data_collection.scrapers.news_scraper import get_news_for_company
 from datetime import datetime
 
-def calculate_dynamic_esg_score(company_ticker, company_name):
+def calculate_dynamic_esg_score(company_ticker, company_name, tier=None):
     """
     Calculates dynamic ESG scores for a company based on NLP analysis of reports and news.
 
     Args:
         company_ticker (str): Company ticker symbol
         company_name (str): Company name for news search
+        tier (str): Sentiment model tier ("lexicon", "distilled" or "finbert"); defaults to NLP_DEFAULT_TIER
 
     Returns:
-        dict: ESG scores with individual pillar scores and total score
+        dict: ESG scores with individual pillar scores and total score, or None if
+        neither the report nor the news produced any analyzed scores
+    """
+    report_data = scrape_esg_reports(company_ticker, tier=tier)
+    news_articles = get_news_for_company(company_name, tier=tier)
+    return aggregate_esg_scores(report_data, news_articles)
+
+def aggregate_esg_scores(report_data, news_articles):
+    """
+    Aggregates already analyzed report and news results into one set of ESG scores.
+
+    Args:
+        report_data (dict): Result of scrape_esg_reports, or None
+        news_articles (list): Articles carrying an 'nlp_analysis' entry
+
+    Returns:
+        dict: ESG scores with individual pillar scores and total score, or None
+        without any analyzed input (no placeholder score is made up)
     """
     scores_list = []
 
     # Get report analysis
-    report_data = scrape_esg_reports(company_ticker)
     if report_data and 'scores' in report_data:
         scores_list.append(report_data['scores'])
 
     # Get news analysis
-    news_articles = get_news_for_company(company_name)
-    for article in news_articles:
+    for article in news_articles or []:
         if 'nlp_analysis' in article and 'scores' in article['nlp_analysis']:
             scores_list.append(article['nlp_analysis']['scores'])
 
     if not scores_list:
-        # Fallback to default scores if no data available
-        return {
-            "environmental_score": 50.0,
-            "social_score": 50.0,
-            "governance_score": 50.0,
-            "total_score": 50.0,
-            "rating_date": datetime.now().date(),
-            "source": "NLP Analysis - No Data"
-        }
+        return None
 
     # Aggregate scores (simple average)
     aggregated_scores = {
@@ -59,4 +67,4 @@ def calculate_dynamic_esg_score(company_ticker, company_name):
     aggregated_scores["rating_date"] = datetime.now().date()
     aggregated_scores["source"] = "NLP Analysis"
 
-    return aggregated_scores
\ No newline at end of file
+    return aggregated_scores
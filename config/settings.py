@@ -3,6 +3,8 @@ import os
 # Database settings
 # Default to SQLite, configurable via environment
 SQLALCHEMY_DATABASE_URL = os.environ.get("SQLALCHEMY_DATABASE_URL", "sqlite:///./esg_builder.db")
+# Async engine URL for the API (empty = SQLALCHEMY_DATABASE_URL with the aiosqlite / asyncpg driver)
+SQLALCHEMY_ASYNC_DATABASE_URL = os.environ.get("SQLALCHEMY_ASYNC_DATABASE_URL", "")
 
 # PostgreSQL settings (if using PostgreSQL)
 POSTGRES_DB = os.environ.get("POSTGRES_DB", "esg_db")
@@ -11,14 +13,158 @@ POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD", "password")
 POSTGRES_HOST = os.environ.get("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.environ.get("POSTGRES_PORT", "5432")
 
+# Engine profile. DB_ROLE picks the connection pool for the process: "api" (long-lived,
+# many request threads), "worker" (scheduler / ingestion, bounded pool) or "script"
+# (one-off and forking processes, no pooling); python -m data_collection.scheduler defaults
+# to "worker". Pool size and overflow for pooled roles.
+DB_ROLE = os.environ.get("DB_ROLE", "api")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+# SQLite tuning applied to every connection: WAL journal with synchronous=NORMAL so readers
+# never block on the writer, how long a writer waits for the lock, page cache and mmap sizes
+DB_SQLITE_TUNED = os.environ.get("DB_SQLITE_TUNED", "true").lower() == "true"
+DB_SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("DB_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_SQLITE_CACHE_MB = int(os.environ.get("DB_SQLITE_CACHE_MB", "64"))
+DB_SQLITE_MMAP_MB = int(os.environ.get("DB_SQLITE_MMAP_MB", "256"))
+
 
 
 # News API settings
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY", "e5757131ff244f7db5a79d51c458646d")
+NEWS_API_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/everything")
+# Token bucket for NewsAPI requests: sustained requests/second (0 = unlimited) and burst size
+NEWS_API_RATE_PER_SEC = float(os.environ.get("NEWS_API_RATE_PER_SEC", "1.0"))
+NEWS_API_BURST = int(os.environ.get("NEWS_API_BURST", "5"))
+# Number of companies fetched concurrently
+NEWS_FETCH_WORKERS = int(os.environ.get("NEWS_FETCH_WORKERS", "8"))
+# Incremental ingestion: page size (NewsAPI max 100), page cap per company per cycle,
+# and the per-company high-water-mark checkpoint file
+NEWS_API_PAGE_SIZE = int(os.environ.get("NEWS_API_PAGE_SIZE", "100"))
+NEWS_API_MAX_PAGES = int(os.environ.get("NEWS_API_MAX_PAGES", "5"))
+NEWS_CHECKPOINT_PATH = os.environ.get("NEWS_CHECKPOINT_PATH", "./data/news_checkpoints.json")
+NEWS_CHECKPOINT_MAX_SEEN_IDS = int(os.environ.get("NEWS_CHECKPOINT_MAX_SEEN_IDS", "500"))
+# RSS/Atom feeds (comma-separated URLs) polled for all companies at once, poll interval,
+# and per-feed polling state (conditional GET validators and recently seen entry IDs)
+FEED_URLS = [url.strip() for url in os.environ.get("FEED_URLS", "").split(",") if url.strip()]
+FEED_POLL_MINUTES = int(os.environ.get("FEED_POLL_MINUTES", "15"))
+FEED_CHECKPOINT_PATH = os.environ.get("FEED_CHECKPOINT_PATH", "./data/feed_checkpoints.json")
+FEED_CHECKPOINT_MAX_SEEN_IDS = int(os.environ.get("FEED_CHECKPOINT_MAX_SEEN_IDS", "1000"))
+# Analyzed article store: SQLite file and days kept before compaction
+ARTICLE_STORE_PATH = os.environ.get("ARTICLE_STORE_PATH", "./data/articles.db")
+ARTICLE_RETENTION_DAYS = int(os.environ.get("ARTICLE_RETENTION_DAYS", "365"))
+
+# Half-lives of a document's weight in a company's streaming ESG score, per source type
+SCORE_HALF_LIFE_NEWS_HOURS = float(os.environ.get("SCORE_HALF_LIFE_NEWS_HOURS", "168"))
+SCORE_HALF_LIFE_REPORT_HOURS = float(os.environ.get("SCORE_HALF_LIFE_REPORT_HOURS", "8760"))
+
+# NLP settings
+# Report sentiment only runs FinBERT on sentences matching the ESG lexicon plus this many neighbours
+NLP_PREFILTER_ENABLED = os.environ.get("NLP_PREFILTER_ENABLED", "true").lower() == "true"
+NLP_PREFILTER_CONTEXT_WINDOW = int(os.environ.get("NLP_PREFILTER_CONTEXT_WINDOW", "1"))
+# Extra comma-separated terms added to the ESG/controversy keywords for prefiltering
+NLP_PREFILTER_LEXICON = [term.strip().lower() for term in os.environ.get("NLP_PREFILTER_LEXICON", "").split(",") if term.strip()]
+# Persistent cache of NLP results so unchanged articles are not re-scored every cycle
+NLP_CACHE_ENABLED = os.environ.get("NLP_CACHE_ENABLED", "true").lower() == "true"
+NLP_CACHE_PATH = os.environ.get("NLP_CACHE_PATH", "./data/nlp_cache.db")
+NLP_CACHE_MAX_ENTRIES = int(os.environ.get("NLP_CACHE_MAX_ENTRIES", "100000"))
+# How long a cache write waits for another NLP worker process's lock before failing
+NLP_CACHE_BUSY_TIMEOUT_MS = int(os.environ.get("NLP_CACHE_BUSY_TIMEOUT_MS", "5000"))
+# FinBERT inference backend: "pytorch" (fp32 reference), "quantized" (int8 dynamic) or "onnx" (onnxruntime)
+NLP_SENTIMENT_BACKEND = os.environ.get("NLP_SENTIMENT_BACKEND", "pytorch")
+NLP_ONNX_EXPORT_DIR = os.environ.get("NLP_ONNX_EXPORT_DIR", "./nlp_engine/models/onnx")
+# Default sentiment model tier: "lexicon" (fastest), "distilled" or "finbert" (most accurate)
+NLP_DEFAULT_TIER = os.environ.get("NLP_DEFAULT_TIER", "finbert")
+# NLP worker processes (0 = analyze inline in the calling process). Opt-in, since every worker
+# loads its own copy of the models; set it to the core count for NLP to scale with cores
+NLP_WORKERS = int(os.environ.get("NLP_WORKERS", "0"))
+# Torch intra-op threads per worker (0 = CPU count divided by NLP_WORKERS)
+NLP_TORCH_THREADS = int(os.environ.get("NLP_TORCH_THREADS", "0"))
+NLP_WORKER_BATCH_SIZE = int(os.environ.get("NLP_WORKER_BATCH_SIZE", "16"))
+NLP_WORKER_MAX_RESTARTS = int(os.environ.get("NLP_WORKER_MAX_RESTARTS", "3"))
+
+# Near-duplicate (syndicated) article collapsing before NLP
+DEDUP_ENABLED = os.environ.get("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_SIMILARITY_THRESHOLD = float(os.environ.get("DEDUP_SIMILARITY_THRESHOLD", "0.6"))
+DEDUP_NUM_PERM = int(os.environ.get("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.environ.get("DEDUP_BANDS", "16"))
+
+# Scheduler: companies per job shard, global job worker budget, target refresh interval
+# (shortened for companies with high news velocity), dispatcher tick, and the
+# lock/state files that keep a single scheduler running across processes
+SCHEDULER_SHARD_SIZE = int(os.environ.get("SCHEDULER_SHARD_SIZE", "1"))
+SCHEDULER_MAX_WORKERS = int(os.environ.get("SCHEDULER_MAX_WORKERS", "4"))
+SCHEDULER_REFRESH_MINUTES = int(os.environ.get("SCHEDULER_REFRESH_MINUTES", "60"))
+SCHEDULER_TICK_SECONDS = int(os.environ.get("SCHEDULER_TICK_SECONDS", "60"))
+SCHEDULER_LOCK_PATH = os.environ.get("SCHEDULER_LOCK_PATH", "./data/scheduler.lock")
+SCHEDULER_STATE_PATH = os.environ.get("SCHEDULER_STATE_PATH", "./data/scheduler_state.json")
+
+# Staged collection runs: checkpointed stage outputs per cycle
+PIPELINE_RUNS_DIR = os.environ.get("PIPELINE_RUNS_DIR", "./data/pipeline_runs")
+# Streaming collection stages: bounded queue size between stages and workers per stage
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_FETCH_WORKERS = int(os.environ.get("PIPELINE_FETCH_WORKERS", "4"))
+PIPELINE_EXTRACT_WORKERS = int(os.environ.get("PIPELINE_EXTRACT_WORKERS", "2"))
+# 0 = one analyze thread per NLP worker (1 when NLP runs inline)
+PIPELINE_ANALYZE_WORKERS = int(os.environ.get("PIPELINE_ANALYZE_WORKERS", "0")) or max(1, NLP_WORKERS)
+# Seconds one company's NLP may take before it is abandoned and retried next cycle
+# (enforced on the NLP worker pool; inline analysis cannot be interrupted)
+PIPELINE_ANALYZE_TIMEOUT = float(os.environ.get("PIPELINE_ANALYZE_TIMEOUT", "600"))
+
+# Search page used to find a company's annual report PDF
+REPORT_SEARCH_URL = os.environ.get("REPORT_SEARCH_URL", "https://www.google.com/search")
+# Report crawler (Scrapy): global and per-domain concurrency, link depth from the IR page,
+# AutoThrottle target concurrency, HTTP cache and resumable job state directories,
+# whether crawled PDFs are extracted right away, robots.txt, and the crawl interval
+# of the scheduler job (0 = not scheduled)
+REPORT_CRAWL_CONCURRENCY = int(os.environ.get("REPORT_CRAWL_CONCURRENCY", "32"))
+REPORT_CRAWL_PER_DOMAIN = int(os.environ.get("REPORT_CRAWL_PER_DOMAIN", "4"))
+REPORT_CRAWL_DEPTH = int(os.environ.get("REPORT_CRAWL_DEPTH", "2"))
+REPORT_CRAWL_AUTOTHROTTLE_TARGET = float(os.environ.get("REPORT_CRAWL_AUTOTHROTTLE_TARGET", "2.0"))
+REPORT_CRAWL_HTTPCACHE_DIR = os.environ.get("REPORT_CRAWL_HTTPCACHE_DIR", "./data/crawl_cache")
+REPORT_CRAWL_JOB_DIR = os.environ.get("REPORT_CRAWL_JOB_DIR", "./data/crawl_job")
+REPORT_CRAWL_EXTRACT = os.environ.get("REPORT_CRAWL_EXTRACT", "true").lower() == "true"
+REPORT_CRAWL_OBEY_ROBOTS = os.environ.get("REPORT_CRAWL_OBEY_ROBOTS", "true").lower() == "true"
+REPORT_CRAWL_INTERVAL_HOURS = float(os.environ.get("REPORT_CRAWL_INTERVAL_HOURS", "0"))
+# Report PDFs: download size cap, bytes kept in memory before spooling to disk,
+# and per-document extraction limits (pages, seconds, worker processes, pages per task)
+REPORT_MAX_BYTES = int(os.environ.get("REPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+REPORT_SPOOL_MAX_MEMORY = int(os.environ.get("REPORT_SPOOL_MAX_MEMORY", str(16 * 1024 * 1024)))
+REPORT_MAX_PAGES = int(os.environ.get("REPORT_MAX_PAGES", "300"))
+REPORT_EXTRACT_TIMEOUT = float(os.environ.get("REPORT_EXTRACT_TIMEOUT", "120"))
+REPORT_EXTRACT_PROCESSES = int(os.environ.get("REPORT_EXTRACT_PROCESSES", "2"))
+REPORT_PAGES_PER_TASK = int(os.environ.get("REPORT_PAGES_PER_TASK", "8"))
+# Report cache: index database, PDF blob directory, and how long a ticker's report URL is reused
+REPORT_CACHE_PATH = os.environ.get("REPORT_CACHE_PATH", "./data/report_cache.db")
+REPORT_CACHE_DIR = os.environ.get("REPORT_CACHE_DIR", "./data/reports")
+REPORT_URL_TTL_HOURS = float(os.environ.get("REPORT_URL_TTL_HOURS", "168"))
 
 # Web scraping settings
 USER_AGENT = "ESG Builder Scraper/1.0"
 
+# Shared HTTP client: keep-alive pool size, per-host concurrency cap and retry policy
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_PER_HOST_CONCURRENCY = int(os.environ.get("HTTP_PER_HOST_CONCURRENCY", "4"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "30"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "20"))
+
+# Bulk importer: rows per chunk (one read + transaction each) and rejected rows kept in the result
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", "5000"))
+IMPORT_ERROR_SAMPLES = int(os.environ.get("IMPORT_ERROR_SAMPLES", "20"))
+# Uploads to the import API are spooled to disk beyond this many bytes
+IMPORT_SPOOL_MAX_MEMORY = int(os.environ.get("IMPORT_SPOOL_MAX_MEMORY", str(16 * 1024 * 1024)))
+# Largest upload the import API accepts, in bytes
+IMPORT_MAX_BYTES = int(os.environ.get("IMPORT_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Bearer token the import API requires; the endpoint is disabled while this is empty
+IMPORT_API_TOKEN = os.environ.get("IMPORT_API_TOKEN", "")
+
+# Where the recommendation and portfolio endpoints read companies, portfolios and scores:
+# "json" (data/*.json) or "database" (latest scores through the async repository)
+RECOMMENDATION_DATA_SOURCE = os.environ.get("RECOMMENDATION_DATA_SOURCE", "json")
+# With the database source, seconds the recommendation service's snapshot is reused between requests
+RECOMMENDATION_CACHE_SECONDS = float(os.environ.get("RECOMMENDATION_CACHE_SECONDS", "60"))
+
 # Application Configuration
 APP_HOST = os.environ.get("APP_HOST", "0.0.0.0")
 APP_PORT = int(os.environ.get("APP_PORT", "8000"))
\ No newline at end of file
@@ -3,10 +3,16 @@ import pandas as pd
 import plotly.express as px
 import json
 import os
+import sqlite3
+import sys
 from pathlib import Path
 from pages import add_company, delete_company
 from pages import recommendation_filters, recommendation_display
 
+# Add the project root to the Python path for the shared services
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.services.portfolio_summary import latest_scores_by_company, summarize_portfolios
+
 st.set_page_config(
     page_title="ESG Builder Dashboard",
     layout="wide",
@@ -21,6 +27,8 @@ def load_css():
 load_css()
 
 DATA_DIR = Path(__file__).parent.parent / "data"
+ARTICLE_STORE_PATH = Path(os.environ.get("ARTICLE_STORE_PATH", DATA_DIR / "articles.db"))
+NEWS_PANEL_LIMIT = 50
 
 PAGES = {
     "Dashboard": "main_page",
@@ -129,26 +137,29 @@ def main_page():
             st.error(f"Error loading portfolios: {e}")
             return []
 
+    def get_latest_scores():
+        file_path = DATA_DIR / "esg_scores.json"
+        mtime = os.path.getmtime(file_path)
+        return _get_latest_scores_cached(mtime)
+
+    @st.cache_data(ttl=600)
+    def _get_latest_scores_cached(mtime):
+        # One pass over the score history for all portfolios, instead of one per member company
+        try:
+            with open(DATA_DIR / "esg_scores.json", "r") as f:
+                return latest_scores_by_company(json.load(f))
+        except Exception as e:
+            st.error(f"Error loading ESG scores: {e}")
+            return {}
+
     portfolios = get_portfolios()
 
     if portfolios:
-        portfolio_data = []
-        for p in portfolios:
-            total_score = 0
-            company_count = 0
-            if 'companies' in p and p['companies']:
-                for c in p['companies']:
-                    scores = get_esg_scores(c['id'])
-                    if scores:
-                        total_score += scores[-1]['total_score']
-                        company_count += 1
-                
-                if company_count > 0:
-                    average_score = total_score / company_count
-                    portfolio_data.append({
-                        "Portfolio": p['name'],
-                        "Average ESG Score": average_score
-                    })
+        portfolio_data = [
+            {"Portfolio": summary["name"], "Average ESG Score": summary["average_total"]}
+            for summary in summarize_portfolios(portfolios, get_latest_scores())
+            if summary["scored_count"] > 0
+        ]
 
         if portfolio_data:
             df_portfolio = pd.DataFrame(portfolio_data)
@@ -169,10 +180,31 @@ def main_page():
     st.markdown('<h2 class="section-header">📰 ESG News Alerts</h2>', unsafe_allow_html=True)
 
     def get_news():
+        # Read only the newest items from the article store; fall back to the legacy news.json
+        if ARTICLE_STORE_PATH.exists():
+            wal_path = Path(f"{ARTICLE_STORE_PATH}-wal")
+            mtime = max(os.path.getmtime(p) for p in (ARTICLE_STORE_PATH, wal_path) if p.exists())
+            return _get_recent_news_cached(mtime)
         file_path = DATA_DIR / "news.json"
         mtime = os.path.getmtime(file_path)
         return _get_news_cached(mtime)
 
+    @st.cache_data(ttl=600)
+    def _get_recent_news_cached(mtime):
+        try:
+            conn = sqlite3.connect(f"file:{ARTICLE_STORE_PATH}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    "SELECT source, published_at, title FROM articles ORDER BY published_at DESC, id DESC LIMIT ?",
+                    (NEWS_PANEL_LIMIT,)
+                ).fetchall()
+            finally:
+                conn.close()
+            return [{"source": source, "published_at": published_at, "title": title} for source, published_at, title in rows]
+        except Exception as e:
+            st.error(f"Error loading news: {e}")
+            return []
+
     @st.cache_data(ttl=3600)
     def _get_news_cached(mtime):
         try:
@@ -0,0 +1,300 @@
+"""
+Article Store
+Append-only SQLite store for analyzed news articles, replacing the news.json rewrite.
+
+Each row keeps the full article, including its 'nlp_analysis' payload. Unique
+indexes on (company, title hash) and (company, url) make deduplication an index
+lookup (INSERT OR IGNORE) instead of a scan, and (company, published_at) /
+(published_at) indexes serve the company and time-range queries used by the
+scorer and the dashboard. compact() drops articles past the retention window
+and returns the freed pages; the scheduler runs it in the background.
+
+The store also keeps each company's time-decayed score state per source type
+(see backend.services.score_aggregator). Every newly stored article, and every
+new report, updates it in O(1) in the same transaction as the insert and flags
+the company dirty, so current scores can be read at any time without replaying
+history and the scorer only recomputes companies with new inputs.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.services.score_aggregator import DecayedScoreState, HALF_LIVES_HOURS, combine_states
+from config.settings import ARTICLE_STORE_PATH, ARTICLE_RETENTION_DAYS
+from nlp_engine.cache import normalize_text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    company TEXT NOT NULL,
+    title_hash TEXT NOT NULL,
+    url TEXT,
+    source TEXT,
+    title TEXT,
+    published_at TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_company_title ON articles (company, title_hash);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_company_url ON articles (company, url) WHERE url IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_articles_company_published ON articles (company, published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at);
+CREATE TABLE IF NOT EXISTS score_state (
+    company TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    state TEXT NOT NULL,
+    content_hash TEXT,
+    PRIMARY KEY (company, source_type)
+);
+CREATE TABLE IF NOT EXISTS dirty_companies (
+    company TEXT PRIMARY KEY,
+    marked_at REAL NOT NULL
+);
+"""
+
+def title_hash(title: Optional[str]) -> str:
+    return hashlib.sha1(normalize_text(title or "").lower().encode("utf-8")).hexdigest()
+
+
+def article_scores(article: Dict) -> Optional[Dict]:
+    """Returns the pillar scores computed for an analyzed article, if any."""
+    analysis = article.get("nlp_analysis") or {}
+    return analysis.get("scores") or None
+
+
+def published_timestamp(article: Dict, now: float) -> float:
+    """Epoch seconds of an article's publishedAt, capped at `now`; `now` if missing or unparsable."""
+    try:
+        published = datetime.fromisoformat(str(article.get("publishedAt")).replace("Z", "+00:00"))
+    except ValueError:
+        return now
+    return min(published.timestamp(), now)
+
+
+def source_name(article: Dict) -> str:
+    source = article.get("source")
+    if isinstance(source, dict):
+        source = source.get("name")
+    return source or "NewsAPI"
+
+
+class ArticleStore:
+    """Append-only, indexed store of analyzed articles backed by a SQLite file."""
+
+    def __init__(self, path: str = ARTICLE_STORE_PATH, retention_days: int = ARTICLE_RETENTION_DAYS):
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        # Must be set before the first table is created to take effect
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets the dashboard read while the scheduler appends
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def add_articles(self, articles: List[Dict], company_name: str) -> int:
+        """
+        Appends articles for a company, skipping ones already stored (same title or URL).
+        Newly inserted articles update the company's news score state, as of their
+        publication time, in the same transaction. Returns the number actually inserted.
+        """
+        now = time.time()
+        inserted = 0
+        with self._lock:
+            state = None
+            for article in articles:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles "
+                    "(company, title_hash, url, source, title, published_at, ingested_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        company_name,
+                        title_hash(article.get("title")),
+                        article.get("url") or None,
+                        source_name(article),
+                        article.get("title") or "No title",
+                        # Same UTC "Z" form as NewsAPI and feed dates, since published_at compares as text
+                        article.get("publishedAt") or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        now,
+                        json.dumps(article, default=str),
+                    ),
+                )
+                if cursor.rowcount:
+                    inserted += 1
+                    scores = article_scores(article)
+                    if scores:
+                        state = state or self._load_state(company_name, "news")[0]
+                        state.update(scores, published_timestamp(article, now), HALF_LIVES_HOURS["news"])
+            if state is not None:
+                self._save_state(company_name, "news", state)
+            self._conn.commit()
+        return inserted
+
+    def _load_state(self, company_name: str, source_type: str):
+        row = self._conn.execute(
+            "SELECT state, content_hash FROM score_state WHERE company = ? AND source_type = ?",
+            (company_name, source_type),
+        ).fetchone()
+        if row is None:
+            return DecayedScoreState(), None
+        return DecayedScoreState.from_dict(json.loads(row[0])), row[1]
+
+    def _save_state(self, company_name: str, source_type: str, state: DecayedScoreState,
+                    content_hash: Optional[str] = None):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO score_state (company, source_type, state, content_hash) VALUES (?, ?, ?, ?)",
+            (company_name, source_type, json.dumps(state.to_dict()), content_hash),
+        )
+        self._mark_dirty(company_name)
+
+    def _mark_dirty(self, company_name: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirty_companies (company, marked_at) VALUES (?, ?)", (company_name, time.time())
+        )
+
+    def set_report_scores(self, company_name: str, content_hash: str, scores: Dict) -> bool:
+        """
+        Adds a new report to the company's report score state; earlier reports decay
+        with the report half-life. Returns False (and changes nothing) if this report
+        was the last one added.
+        """
+        with self._lock:
+            state, current_hash = self._load_state(company_name, "report")
+            if current_hash == content_hash:
+                return False
+            state.update(scores, time.time(), HALF_LIVES_HOURS["report"])
+            self._save_state(company_name, "report", state, content_hash)
+            self._conn.commit()
+            return True
+
+    def score_states(self, company_name: str) -> Dict[str, DecayedScoreState]:
+        """Returns the company's score state per source type."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_type, state FROM score_state WHERE company = ?", (company_name,)
+            ).fetchall()
+        return {source_type: DecayedScoreState.from_dict(json.loads(state)) for source_type, state in rows}
+
+    def current_scores(self, company_name: str, now: Optional[float] = None) -> Optional[Dict]:
+        """The company's decayed ESG scores as of `now` (default: now), or None without analyzed inputs."""
+        return combine_states(self.score_states(company_name), now)
+
+    def dirty_companies(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT company FROM dirty_companies")]
+
+    def clear_dirty(self, company_names: List[str], before: float):
+        """Clears the dirty flag of companies not marked again since `before` (a time.time())."""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM dirty_companies WHERE company = ? AND marked_at <= ?",
+                [(name, before) for name in company_names],
+            )
+            self._conn.commit()
+
+    def query(self, company_name: Optional[str] = None, start: Optional[str] = None,
+              end: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Returns stored articles, newest first, optionally filtered by company and
+        by an ISO 8601 published_at range [start, end).
+        """
+        clauses, params = [], []
+        if company_name is not None:
+            clauses.append("company = ?")
+            params.append(company_name)
+        if start is not None:
+            clauses.append("published_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("published_at < ?")
+            params.append(end)
+
+        sql = "SELECT payload FROM articles"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY published_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def recent(self, limit: int = 50, company_name: Optional[str] = None) -> List[Dict]:
+        """Returns the newest `limit` articles (optionally for one company)."""
+        return self.query(company_name=company_name, limit=limit)
+
+    def count_since(self, company_names: List[str], since: str) -> int:
+        """Counts the given companies' articles published since `since` (ISO 8601)."""
+        if not company_names:
+            return 0
+        placeholders = ", ".join("?" for _ in company_names)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM articles WHERE company IN ({placeholders}) AND published_at >= ?",
+                (*company_names, since),
+            ).fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def compact(self) -> int:
+        """
+        Deletes articles published before the retention window and releases the freed
+        pages back to the filesystem. Returns the number of articles deleted.
+        Score states are left alone: by then those articles' weight has decayed away.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM articles WHERE published_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def import_news_json(self, path) -> int:
+        """One-off import of a legacy news.json (no company attached). Returns the number imported."""
+        try:
+            with open(path, "r") as f:
+                items = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        articles = [
+            {"source": {"name": item.get("source")}, "publishedAt": item.get("published_at"), "title": item.get("title")}
+            for item in items
+        ]
+        return self.add_articles(articles, company_name="")
+
+    def close(self):
+        self._conn.close()
+
+
+_store: Optional[ArticleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """Returns the process-wide store, seeding a new store from the legacy news.json."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            is_new = not Path(ARTICLE_STORE_PATH).exists()
+            _store = ArticleStore()
+            if is_new:
+                legacy_file = Path(__file__).parent.parent / "data" / "news.json"
+                imported = _store.import_news_json(legacy_file)
+                if imported:
+                    print(f"Imported {imported} articles from {legacy_file} into the article store.")
+        return _store
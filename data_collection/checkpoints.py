@@ -0,0 +1,171 @@
+"""
+News Ingestion Checkpoints
+Per-company high-water marks for incremental NewsAPI ingestion.
+
+For each company we keep the newest `publishedAt` seen so far plus a bounded
+list of recently seen article IDs. The next fetch only asks for articles
+published from the high-water mark on; the seen IDs filter out the items at
+the boundary timestamp that NewsAPI returns again (its `from` is inclusive).
+Checkpoints are written atomically so a restart resumes where it left off.
+
+NewsAPI pages come newest first, so a fetch that stops early (page cap or a
+request error) has read the newest articles but not the older ones. The mark
+then stays put and a backfill cursor is kept instead: the next fetch is
+bounded by the oldest publishedAt read (`to`), and the mark only moves past
+the articles read once a fetch has caught up with it.
+
+RSS/Atom feeds are polled for all companies at once, so their state is kept
+per feed instead: the HTTP validators (ETag / Last-Modified) for conditional
+GETs and a bounded list of recently seen entry IDs.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.settings import (
+    NEWS_CHECKPOINT_PATH, NEWS_CHECKPOINT_MAX_SEEN_IDS, FEED_CHECKPOINT_PATH, FEED_CHECKPOINT_MAX_SEEN_IDS
+)
+from data_collection.utils import write_json_atomic
+
+
+def article_id(article: Dict) -> str:
+    """Stable article identifier: the URL when present, otherwise a hash of title + publishedAt."""
+    url = article.get("url")
+    if url:
+        return url
+    key = f"{article.get('title') or ''}|{article.get('publishedAt') or ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class IngestionCheckpoints:
+    """Durable per-company ingestion state stored in a single JSON file."""
+
+    def __init__(self, path: str = NEWS_CHECKPOINT_PATH, max_seen_ids: int = NEWS_CHECKPOINT_MAX_SEEN_IDS):
+        self.path = Path(path)
+        self.max_seen_ids = max_seen_ids
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r") as f:
+                self.state: Dict[str, Dict] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.state = {}
+
+    def last_published_at(self, company_name: str) -> Optional[str]:
+        """Returns the company's high-water mark (ISO 8601 publishedAt), or None on first fetch."""
+        with self._lock:
+            return self.state.get(company_name, {}).get("last_published_at")
+
+    def fetch_window(self, company_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns (since, until) for the company's next fetch: its high-water mark and,
+        while older pages are still unread, the oldest publishedAt read so far.
+        """
+        with self._lock:
+            entry = self.state.get(company_name, {})
+            return entry.get("last_published_at"), (entry.get("backfill") or {}).get("until")
+
+    def filter_new(self, company_name: str, articles: List[Dict]) -> List[Dict]:
+        """Drops articles already seen for this company."""
+        with self._lock:
+            seen = set(self.state.get(company_name, {}).get("seen_ids", []))
+        return [article for article in articles if article_id(article) not in seen]
+
+    def advance(self, company_name: str, articles: List[Dict], complete: bool = True,
+                oldest_read: Optional[str] = None):
+        """
+        Records a fetch's articles as ingested (in memory; call save()). If the fetch
+        was `complete` (caught up with the high-water mark), the mark moves past them
+        and past anything read by an earlier incomplete fetch. Otherwise the mark stays
+        and the oldest publishedAt read (`oldest_read`, else the articles' oldest)
+        bounds the next fetch, so the unread older pages are fetched next.
+        """
+        with self._lock:
+            if not articles and not oldest_read and not self.state.get(company_name, {}).get("backfill"):
+                return
+            entry = self.state.setdefault(company_name, {"last_published_at": None, "seen_ids": []})
+            # ISO 8601 UTC timestamps from NewsAPI compare correctly as strings
+            published = [a["publishedAt"] for a in articles if a.get("publishedAt")]
+            backfill = entry.get("backfill") or {}
+            newest = max(published + ([backfill["newest"]] if backfill.get("newest") else []), default=None)
+            if complete:
+                if newest:
+                    entry["last_published_at"] = max(entry["last_published_at"] or "", newest)
+                entry.pop("backfill", None)
+            else:
+                bounds = published + ([oldest_read] if oldest_read else [])
+                if bounds:
+                    entry["backfill"] = {"until": min(bounds), "newest": newest}
+
+            seen_ids = entry["seen_ids"]
+            known = set(seen_ids)
+            for article in articles:
+                identifier = article_id(article)
+                if identifier not in known:
+                    seen_ids.append(identifier)
+                    known.add(identifier)
+            # Keep only the most recent IDs; older ones fall below the high-water mark anyway
+            entry["seen_ids"] = seen_ids[-self.max_seen_ids:]
+
+    def save(self):
+        with self._lock:
+            write_json_atomic(self.path, self.state)
+
+
+class FeedCheckpoints:
+    """Durable per-feed polling state (validators and seen entry IDs) stored in a single JSON file."""
+
+    def __init__(self, path: str = FEED_CHECKPOINT_PATH, max_seen_ids: int = FEED_CHECKPOINT_MAX_SEEN_IDS):
+        self.path = Path(path)
+        self.max_seen_ids = max_seen_ids
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r") as f:
+                self.state: Dict[str, Dict] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.state = {}
+
+    def validators(self, feed_url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Returns the (etag, last_modified) recorded for a feed."""
+        with self._lock:
+            entry = self.state.get(feed_url, {})
+            return entry.get("etag"), entry.get("last_modified")
+
+    def seen_ids(self, feed_url: str) -> Set[str]:
+        with self._lock:
+            return set(self.state.get(feed_url, {}).get("seen_ids", []))
+
+    def advance(self, feed_url: str, etag: Optional[str], last_modified: Optional[str], entry_ids: List[str]):
+        """Records a poll's validators and new entry IDs (in memory; call save())."""
+        with self._lock:
+            entry = self.state.setdefault(feed_url, {"etag": None, "last_modified": None, "seen_ids": []})
+            entry["etag"], entry["last_modified"] = etag, last_modified
+            known = set(entry["seen_ids"])
+            entry["seen_ids"].extend(i for i in entry_ids if i not in known)
+            entry["seen_ids"] = entry["seen_ids"][-self.max_seen_ids:]
+
+    def save(self):
+        with self._lock:
+            write_json_atomic(self.path, self.state)
+
+
+_checkpoints: Optional[IngestionCheckpoints] = None
+_feed_checkpoints: Optional[FeedCheckpoints] = None
+
+
+def get_ingestion_checkpoints() -> IngestionCheckpoints:
+    """Returns the process-wide checkpoint store at NEWS_CHECKPOINT_PATH."""
+    global _checkpoints
+    if _checkpoints is None:
+        _checkpoints = IngestionCheckpoints()
+    return _checkpoints
+
+
+def get_feed_checkpoints() -> FeedCheckpoints:
+    """Returns the process-wide feed polling state at FEED_CHECKPOINT_PATH."""
+    global _feed_checkpoints
+    if _feed_checkpoints is None:
+        _feed_checkpoints = FeedCheckpoints()
+    return _feed_checkpoints
@@ -0,0 +1,78 @@
+"""
+Company Matcher
+Finds which tracked companies a piece of text mentions, using two regexes
+compiled once over the whole company list.
+
+Names match case-insensitively on word boundaries, both in full ("Apple Inc.")
+and without legal suffixes ("Apple"). Tickers are short and often ordinary
+words (ON, ALL, IT), so they only match case-sensitively in the forms news
+uses for them: "$AAPL", "(AAPL)" and "NASDAQ: AAPL". Stored tickers may carry
+an exchange in parentheses ("TSLA (NASDAQ)"), which is dropped before indexing.
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+LEGAL_SUFFIXES = (
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc",
+    "llc", "ag", "sa", "se", "nv", "holdings", "group", "com",
+)
+EXCHANGES = ("NYSE", "NASDAQ", "Nasdaq", "LSE", "TSX", "ASX", "HKEX", "XETRA", "Euronext")
+
+_SUFFIX_PATTERN = re.compile(r"(?:[\s,.]+(?:%s)\.?)+$" % "|".join(LEGAL_SUFFIXES), re.IGNORECASE)
+_EXCHANGE_SUFFIX = re.compile(r"\s*\([^)]*\)\s*$")
+
+
+def bare_ticker(ticker: str) -> str:
+    """The ticker without a trailing exchange in parentheses: "TSLA (NASDAQ)" -> "TSLA"."""
+    return _EXCHANGE_SUFFIX.sub("", (ticker or "").strip()).strip()
+
+
+def name_aliases(name: str) -> Set[str]:
+    """The full name and, if different, the name without trailing legal suffixes."""
+    aliases = {name.strip()}
+    short = _SUFFIX_PATTERN.sub("", name.strip()).strip(" ,.")
+    if len(short) >= 3:
+        aliases.add(short)
+    return {alias for alias in aliases if alias}
+
+
+class CompanyMatcher:
+    """Precompiled name/ticker matcher over a company list (dicts with 'name' and optional 'ticker')."""
+
+    def __init__(self, companies: Iterable[Dict]):
+        self._by_alias: Dict[str, Set[str]] = {}
+        self._by_ticker: Dict[str, Set[str]] = {}
+        for company in companies:
+            for alias in name_aliases(company["name"]):
+                self._by_alias.setdefault(alias.lower(), set()).add(company["name"])
+            ticker = bare_ticker(company.get("ticker"))
+            if ticker:
+                self._by_ticker.setdefault(ticker, set()).add(company["name"])
+
+        # Longest alternatives first so "Apple Inc." wins over "Apple"
+        aliases = sorted(self._by_alias, key=len, reverse=True)
+        self._names = re.compile(
+            r"(?<!\w)(%s)(?!\w)" % "|".join(re.escape(alias) for alias in aliases), re.IGNORECASE
+        ) if aliases else None
+        tickers = sorted(self._by_ticker, key=len, reverse=True)
+        self._tickers = re.compile(
+            r"(?:\$|\((?:[A-Za-z]+:\s*)?|\b(?:%s)\s*:\s*)(%s)(?!\w)" % (
+                "|".join(EXCHANGES), "|".join(re.escape(ticker) for ticker in tickers)
+            )
+        ) if tickers else None
+
+    def match(self, text: str) -> List[str]:
+        """Returns the names of the companies mentioned in `text`, in order of first mention."""
+        found: Dict[str, None] = {}
+        if not text:
+            return []
+        if self._names is not None:
+            for m in self._names.finditer(text):
+                for name in sorted(self._by_alias[m.group(1).lower()]):
+                    found.setdefault(name)
+        if self._tickers is not None:
+            for m in self._tickers.finditer(text):
+                for name in sorted(self._by_ticker[m.group(1)]):
+                    found.setdefault(name)
+        return list(found)
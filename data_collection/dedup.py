@@ -0,0 +1,137 @@
+"""
+Near-Duplicate Article Detection
+MinHash signatures with LSH banding over article title + description.
+
+NewsAPI returns many syndicated copies of the same story with slightly
+different titles. Collapsing each cluster to one representative before NLP
+saves model time and keeps syndicated coverage from being counted several
+times in the scores. Each representative keeps a source count.
+"""
+
+import hashlib
+import re
+import struct
+from typing import Dict, List, Optional, Set
+
+from config.settings import DEDUP_SIMILARITY_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Mersenne prime modulus for the universal hash family used by MinHash
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def article_text(article: Dict) -> str:
+    """Returns the text used for near-duplicate comparison (title + description)."""
+    return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word n-gram shingles of the normalized text (single tokens for very short texts)."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with a seeded universal hash family."""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        params = hashlib.sha256(f"minhash-{seed}".encode()).digest()
+        # Derive deterministic (a, b) coefficients so signatures are stable across processes
+        self.coefficients = []
+        for i in range(num_perm):
+            digest = hashlib.sha256(params + struct.pack("<I", i)).digest()
+            a, b = struct.unpack("<QQ", digest[:16])
+            self.coefficients.append((a % (MERSENNE_PRIME - 1) + 1, b % MERSENNE_PRIME))
+
+    def signature(self, tokens: Set[str]) -> List[int]:
+        hashes = [struct.unpack("<Q", hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest())[0] for t in tokens]
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        return [
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self.coefficients
+        ]
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures. Candidates sharing any band bucket are
+    confirmed with exact Jaccard similarity on their shingles.
+    """
+
+    def __init__(self, threshold: float = DEDUP_SIMILARITY_THRESHOLD,
+                 num_perm: int = DEDUP_NUM_PERM, bands: int = DEDUP_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.buckets: List[Dict[tuple, List[int]]] = [{} for _ in range(bands)]
+        self.shingle_sets: List[Set[str]] = []
+
+    def query(self, tokens: Set[str], signature: List[int]) -> Optional[int]:
+        """Returns the id of the most similar indexed item above the threshold, if any."""
+        candidates = set()
+        for band, buckets in enumerate(self.buckets):
+            key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            candidates.update(buckets.get(key, ()))
+
+        best_id, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = jaccard(tokens, self.shingle_sets[candidate])
+            if similarity >= best_similarity:
+                best_id, best_similarity = candidate, similarity
+        return best_id
+
+    def add(self, tokens: Set[str], signature: List[int]) -> int:
+        """Indexes an item and returns its id."""
+        item_id = len(self.shingle_sets)
+        self.shingle_sets.append(tokens)
+        for band, buckets in enumerate(self.buckets):
+            key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            buckets.setdefault(key, []).append(item_id)
+        return item_id
+
+
+def collapse_near_duplicates(articles: List[Dict], threshold: float = DEDUP_SIMILARITY_THRESHOLD) -> List[Dict]:
+    """
+    Collapses clusters of near-duplicate articles to their first occurrence.
+    Each representative is a copy of the article with:
+      - 'syndication_count': number of articles in its cluster
+      - 'syndicated_sources': names of the sources that carried the story
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    representatives: List[Dict] = []
+
+    for article in articles:
+        tokens = shingles(article_text(article))
+        signature = index.hasher.signature(tokens)
+        match = index.query(tokens, signature)
+        source = article.get("source")
+        if isinstance(source, dict):
+            source = source.get("name")
+
+        if match is None:
+            index.add(tokens, signature)
+            representative = article.copy()
+            representative["syndication_count"] = 1
+            representative["syndicated_sources"] = [source] if source else []
+            representatives.append(representative)
+        else:
+            representative = representatives[match]
+            representative["syndication_count"] += 1
+            if source and source not in representative["syndicated_sources"]:
+                representative["syndicated_sources"].append(source)
+
+    return representatives
@@ -0,0 +1,187 @@
+"""
+Collection Job Dispatcher
+Runs the collection pipeline as independent per-shard jobs instead of one
+hourly pass over every company.
+
+Companies are split into shards of SCHEDULER_SHARD_SIZE. On every tick the
+dispatcher ranks due shards by priority (score staleness weighted by recent
+news velocity) and submits the highest-priority ones to a bounded worker pool,
+so a hanging download only holds up its own shard. A shard never runs twice
+at once, and a file lock keeps a single dispatcher active across processes.
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    SCHEDULER_SHARD_SIZE, SCHEDULER_MAX_WORKERS, SCHEDULER_REFRESH_MINUTES,
+    SCHEDULER_TICK_SECONDS, SCHEDULER_LOCK_PATH, SCHEDULER_STATE_PATH
+)
+from data_collection.utils import write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class SchedulerLock:
+    """Non-blocking exclusive file lock; held for the lifetime of the scheduler process."""
+
+    def __init__(self, path: str = SCHEDULER_LOCK_PATH):
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self) -> bool:
+        """Returns True if this process now holds the lock, False if another process does."""
+        if fcntl is None:
+            print("Warning: file locking is unavailable on this platform; not guarding against a second scheduler.")
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def make_shards(companies: List[Dict], shard_size: int = SCHEDULER_SHARD_SIZE) -> Dict[str, List[Dict]]:
+    """Splits companies (ordered by id) into shards keyed by a stable shard id."""
+    companies = sorted(companies, key=lambda c: c["id"])
+    shard_size = max(1, shard_size)
+    if shard_size == 1:
+        return {f"company-{c['id']}": [c] for c in companies}
+    return {
+        f"shard-{i // shard_size}": companies[i:i + shard_size]
+        for i in range(0, len(companies), shard_size)
+    }
+
+
+def shard_priority(staleness_minutes: float, articles_per_hour: float) -> float:
+    """Staleness weighted by news velocity: busy, stale shards come first."""
+    return staleness_minutes * (1 + articles_per_hour)
+
+
+def is_due(staleness_minutes: float, articles_per_hour: float,
+           refresh_minutes: int = SCHEDULER_REFRESH_MINUTES, tick_seconds: int = SCHEDULER_TICK_SECONDS) -> bool:
+    """A shard is due after the refresh interval, shortened in proportion to its news velocity."""
+    interval = max(tick_seconds / 60, refresh_minutes / (1 + articles_per_hour))
+    return staleness_minutes >= interval
+
+
+class ShardDispatcher:
+    """
+    Priority dispatcher for per-shard collection jobs.
+
+    Args:
+        run_shard: callable(cycle_id, companies) that collects and scores one shard
+        load_companies: callable returning the current company list
+        news_velocity: callable(company_names) returning recent articles per hour
+    """
+
+    def __init__(self, run_shard: Callable[[str, List[Dict]], None], load_companies: Callable[[], List[Dict]],
+                 news_velocity: Callable[[List[str]], float], max_workers: int = SCHEDULER_MAX_WORKERS,
+                 shard_size: int = SCHEDULER_SHARD_SIZE, refresh_minutes: int = SCHEDULER_REFRESH_MINUTES,
+                 state_path: str = SCHEDULER_STATE_PATH):
+        self.run_shard = run_shard
+        self.load_companies = load_companies
+        self.news_velocity = news_velocity
+        self.max_workers = max(1, max_workers)
+        self.shard_size = shard_size
+        self.refresh_minutes = refresh_minutes
+        self.state_path = Path(state_path)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="collect")
+        self._in_flight = set()
+        # shard id -> cycle id of its last unfinished run, reused so a retry resumes from checkpoints
+        self._pending_cycles: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.state_path, "r") as f:
+                # shard id -> ISO timestamp of its last completed run
+                self.last_completed: Dict[str, str] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.last_completed = {}
+
+    def staleness_minutes(self, shard_id: str, now: datetime) -> float:
+        last = self.last_completed.get(shard_id)
+        if last is None:
+            return float("inf")
+        return (now - datetime.fromisoformat(last)).total_seconds() / 60
+
+    def due_shards(self, now: Optional[datetime] = None) -> List[Tuple[float, str, List[Dict]]]:
+        """Returns (priority, shard id, companies) for due, idle shards, highest priority first."""
+        now = now or datetime.now(timezone.utc)
+        queue = []
+        with self._lock:
+            in_flight = set(self._in_flight)
+        for shard_id, companies in make_shards(self.load_companies(), self.shard_size).items():
+            if shard_id in in_flight:
+                continue
+            staleness = self.staleness_minutes(shard_id, now)
+            velocity = self.news_velocity([c["name"] for c in companies])
+            if is_due(staleness, velocity, self.refresh_minutes):
+                # heapq is a min-heap; negate so the highest priority pops first
+                heapq.heappush(queue, (-shard_priority(min(staleness, 1e9), velocity), shard_id, companies))
+        return [(-priority, shard_id, companies) for priority, shard_id, companies in
+                (heapq.heappop(queue) for _ in range(len(queue)))]
+
+    def tick(self):
+        """Submits due shards, highest priority first, up to the free worker budget."""
+        with self._lock:
+            free_slots = self.max_workers - len(self._in_flight)
+        if free_slots <= 0:
+            return
+
+        for priority, shard_id, companies in self.due_shards()[:free_slots]:
+            with self._lock:
+                self._in_flight.add(shard_id)
+                cycle_id = self._pending_cycles.setdefault(
+                    shard_id, f"{datetime.now().strftime('%Y%m%dT%H%M')}-{shard_id}"
+                )
+            print(f"Dispatching {shard_id} ({', '.join(c['name'] for c in companies)}), priority {priority:.1f}")
+            self.executor.submit(self._run, shard_id, cycle_id, companies)
+
+    def _run(self, shard_id: str, cycle_id: str, companies: List[Dict]):
+        start = time.perf_counter()
+        try:
+            self.run_shard(cycle_id, companies)
+            with self._lock:
+                self._pending_cycles.pop(shard_id, None)
+                self.last_completed[shard_id] = datetime.now(timezone.utc).isoformat()
+                write_json_atomic(self.state_path, self.last_completed)
+            print(f"Finished {shard_id} in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            # Left stale, so it is retried (and resumed) on a later tick
+            print(f"Error running {shard_id}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(shard_id)
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+def recent_velocity(store, company_names: List[str], hours: int = 24) -> float:
+    """Articles per hour published for the given companies over the last `hours`."""
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return store.count_since(company_names, since) / hours
@@ -0,0 +1,144 @@
+"""
+Pooled HTTP Client
+Shared requests.Session with keep-alive connection pooling, per-host
+concurrency caps, token-bucket rate limiting and retries with jittered
+exponential backoff. Used by the scrapers so concurrent fetches reuse
+TCP/TLS connections instead of paying a handshake per request.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    USER_AGENT, NEWS_API_URL, NEWS_API_RATE_PER_SEC, NEWS_API_BURST,
+    HTTP_MAX_CONNECTIONS, HTTP_PER_HOST_CONCURRENCY, HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_TIMEOUT
+)
+
+# Responses worth retrying: rate limited or transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`. A rate <= 0 is unlimited."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until `tokens` are available, then consumes them."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = HTTP_BACKOFF_BASE, cap: float = HTTP_BACKOFF_MAX,
+                  retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-provided Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
+
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class HttpClient:
+    """Pooled, rate-limited HTTP client shared by the collection code."""
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 per_host_concurrency: int = HTTP_PER_HOST_CONCURRENCY,
+                 rate_limits: Optional[Dict[str, TokenBucket]] = None,
+                 max_retries: int = HTTP_MAX_RETRIES, timeout: float = HTTP_TIMEOUT,
+                 backoff_base: float = HTTP_BACKOFF_BASE, backoff_max: float = HTTP_BACKOFF_MAX):
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.per_host_concurrency = per_host_concurrency
+        self.rate_limits = rate_limits or {}
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slots_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_concurrency)
+            return self._host_slots[host]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET with rate limiting, a per-host concurrency cap and retries.
+        Returns the last response (callers still call raise_for_status), or
+        re-raises the last connection error once retries are exhausted.
+        """
+        host = urlparse(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+        bucket = self.rate_limits.get(host)
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+
+            retry_after = None
+            with self._slots_for(host):
+                try:
+                    response = self.session.get(url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                        return response
+                    retry_after = parse_retry_after(response)
+                    response.close()
+
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Returns the process-wide client, rate limited to the NewsAPI quota for the NewsAPI host."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            news_host = urlparse(NEWS_API_URL).netloc
+            _client = HttpClient(rate_limits={news_host: TokenBucket(NEWS_API_RATE_PER_SEC, NEWS_API_BURST)})
+        return _client
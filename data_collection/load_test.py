@@ -0,0 +1,243 @@
+"""
+Collection Load Test
+Drives fetch_and_store_news / update_esg_scores (rescoring from stored inputs) against the local stand-in
+server (data_collection.mock_server) at several universe sizes and reports
+end-to-end throughput, pipeline stage timings and how injected errors were handled.
+
+Each universe size runs in its own subprocess with a fresh temporary data
+directory (database, article store, checkpoints, caches), because settings are
+read at import time and the stores are process-wide singletons. Client-side
+settings (HTTP_*, PIPELINE_*, NLP_*) are taken from the environment.
+
+Usage:
+    python -m data_collection.load_test --companies 10 50 200 --jobs news scores
+    python -m data_collection.load_test --companies 100 --latency-ms 50 --error-rate 0.05 --news-rate 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from data_collection.mock_server import MockCollectionServer, SyntheticCorpus
+
+PROJECT_ROOT = Path(__file__).parent.parent
+JOBS = ("news", "scores")
+
+
+def synthetic_universe(size: int) -> List[Dict]:
+    return [{"id": i, "name": f"Synthetic Co {i:04d}", "ticker": f"SYN{i:04d}"} for i in range(1, size + 1)]
+
+
+def worker_env(server: MockCollectionServer, data_dir: Path, tier: str) -> Dict[str, str]:
+    """Environment for one run: the stand-in server's URLs and every store inside `data_dir`."""
+    return {
+        **os.environ,
+        **server.settings_env(),
+        "NEWS_API_KEY": "load-test",
+        "NLP_DEFAULT_TIER": tier,
+        "SQLALCHEMY_DATABASE_URL": f"sqlite:///{data_dir / 'esg_builder.db'}",
+        "DB_ROLE": "worker",
+        "ARTICLE_STORE_PATH": str(data_dir / "articles.db"),
+        "NEWS_CHECKPOINT_PATH": str(data_dir / "news_checkpoints.json"),
+        "NLP_CACHE_PATH": str(data_dir / "nlp_cache.db"),
+        "REPORT_CACHE_PATH": str(data_dir / "report_cache.db"),
+        "REPORT_CACHE_DIR": str(data_dir / "reports"),
+        "PIPELINE_RUNS_DIR": str(data_dir / "pipeline_runs"),
+        "SCHEDULER_LOCK_PATH": str(data_dir / "scheduler.lock"),
+        "SCHEDULER_STATE_PATH": str(data_dir / "scheduler_state.json"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")])),
+    }
+
+
+def run_worker(size: int, jobs: List[str], result_path: str):
+    """Runs the jobs for a synthetic universe in this process (environment already set) and writes the result."""
+    from config.settings import PIPELINE_RUNS_DIR, NLP_DEFAULT_TIER
+    from data_collection import scheduler
+    from data_collection.article_store import get_article_store
+    from database.database import Base, SessionLocal, engine
+    from database.models import Company, ESGScore
+
+    Base.metadata.create_all(bind=engine)
+    universe = synthetic_universe(size)
+    db = SessionLocal()
+    try:
+        db.add_all(Company(id=c["id"], name=c["name"], ticker=c["ticker"]) for c in universe)
+        db.commit()
+    finally:
+        db.close()
+
+    # The scheduler reads the company list from data/companies.json; use the synthetic universe instead
+    scheduler.get_companies = lambda: universe
+
+    def scored_companies() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(ESGScore.company_id).distinct().count()
+        finally:
+            db.close()
+
+    result = {"companies": size}
+    if "news" in jobs:
+        start = time.perf_counter()
+        scheduler.fetch_and_store_news(NLP_DEFAULT_TIER)
+        elapsed = time.perf_counter() - start
+
+        runs_dir = Path(PIPELINE_RUNS_DIR)
+        stage_seconds, fetched, completed = {}, 0, False
+        for run_dir in runs_dir.iterdir() if runs_dir.exists() else []:
+            if (run_dir / "_complete.json").exists():
+                completed = True
+                with open(run_dir / "_complete.json", "r") as f:
+                    stage_seconds = json.load(f).get("stage_seconds", {})
+            if (run_dir / "fetch.json").exists():
+                with open(run_dir / "fetch.json", "r") as f:
+                    fetched = sum(len(articles) for articles in json.load(f)["articles"].values())
+        # Only the universe's articles (a new store is also seeded from the legacy news.json)
+        stored = get_article_store().count_since([c["name"] for c in universe], "")
+        result["news"] = {
+            "seconds": round(elapsed, 2),
+            "completed": completed,
+            "companies_per_sec": round(size / elapsed, 2),
+            "articles_fetched": fetched,
+            "articles_stored": stored,
+            "articles_per_sec": round(fetched / elapsed, 2),
+            "companies_scored": scored_companies(),
+            "stage_seconds": stage_seconds,
+        }
+
+    if "scores" in jobs:
+        db = SessionLocal()
+        try:
+            before = db.query(ESGScore).count()
+        finally:
+            db.close()
+        start = time.perf_counter()
+        scheduler.update_esg_scores(NLP_DEFAULT_TIER)
+        elapsed = time.perf_counter() - start
+        db = SessionLocal()
+        try:
+            scored = db.query(ESGScore).count() - before
+        finally:
+            db.close()
+        # Only companies with new inputs are rescored; any still flagged dirty failed
+        names = {c["name"] for c in universe}
+        result["scores"] = {
+            "seconds": round(elapsed, 2),
+            "companies_per_sec": round(size / elapsed, 2),
+            "companies_scored": scored,
+            "companies_failed": len(names.intersection(get_article_store().dirty_companies())),
+        }
+
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+
+def request_delta(before: Dict, after: Dict) -> Dict[str, int]:
+    counts = {key: after["requests"].get(key, 0) - before["requests"].get(key, 0) for key in after["requests"]}
+    return {key: count for key, count in counts.items() if count}
+
+
+def run_load_test(sizes: List[int], jobs: List[str], server: MockCollectionServer, tier: str = "lexicon",
+                  verbose: bool = False) -> List[Dict]:
+    """Runs every universe size in a fresh subprocess against `server`. Returns one result per size."""
+    results = []
+    for size in sizes:
+        data_dir = Path(tempfile.mkdtemp(prefix=f"esg_load_{size}_"))
+        result_path = data_dir / "result.json"
+        log_path = data_dir / "worker.log"
+        before = server.stats()
+        print(f"Running {', '.join(jobs)} for {size} companies...")
+        with open(log_path, "w") as log:
+            completed = subprocess.run(
+                [sys.executable, "-m", "data_collection.load_test", "--worker", "--companies", str(size),
+                 "--jobs", *jobs, "--result-path", str(result_path)],
+                env=worker_env(server, data_dir, tier), cwd=PROJECT_ROOT,
+                stdout=None if verbose else log, stderr=subprocess.STDOUT,
+            )
+        if completed.returncode != 0 or not result_path.exists():
+            print(f"Run for {size} companies failed (exit code {completed.returncode}); see {log_path}")
+            results.append({"companies": size, "error": f"exit code {completed.returncode}", "log": str(log_path)})
+            continue
+
+        with open(result_path, "r") as f:
+            result = json.load(f)
+        result["server_responses"] = request_delta(before, server.stats())
+        results.append(result)
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def print_report(results: List[Dict]):
+    print("\nCompanies  job     seconds  companies/s  articles/s  fetched  stored  scored  failed")
+    for result in results:
+        if "error" in result:
+            print(f"{result['companies']:>9}  error: {result['error']} ({result['log']})")
+            continue
+        news, scores = result.get("news"), result.get("scores")
+        if news:
+            print(f"{result['companies']:>9}  news    {news['seconds']:>7}  {news['companies_per_sec']:>11}"
+                  f"  {news['articles_per_sec']:>10}  {news['articles_fetched']:>7}  {news['articles_stored']:>6}"
+                  f"  {news['companies_scored']:>6}  {result['companies'] - news['companies_scored']:>6}")
+        if scores:
+            print(f"{result['companies']:>9}  scores  {scores['seconds']:>7}  {scores['companies_per_sec']:>11}"
+                  f"  {'':>10}  {'':>7}  {'':>6}  {scores['companies_scored']:>6}  {scores['companies_failed']:>6}")
+
+    print("\nCompanies  stage timings (s)")
+    for result in results:
+        if result.get("news"):
+            stages = ", ".join(f"{name}={seconds}" for name, seconds in result["news"]["stage_seconds"].items())
+            print(f"{result['companies']:>9}  {stages or 'n/a (cycle did not complete)'}")
+
+    print("\nCompanies  server responses (endpoint status: count)")
+    for result in results:
+        if "server_responses" in result:
+            responses = ", ".join(f"{key}: {count}" for key, count in result["server_responses"].items())
+            print(f"{result['companies']:>9}  {responses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test news collection and scoring against a local stand-in server.")
+    parser.add_argument("--companies", type=int, nargs="+", default=[10, 50], help="Universe sizes to run")
+    parser.add_argument("--jobs", nargs="+", choices=JOBS, default=list(JOBS))
+    parser.add_argument("--tier", default="lexicon", help="Sentiment model tier used by the runs")
+    parser.add_argument("--articles", type=int, default=30, help="Articles per company")
+    parser.add_argument("--report-pages", type=int, default=10)
+    parser.add_argument("--syndication-rate", type=float, default=0.1)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--news-rate", type=float, default=0.0, help="Server NewsAPI requests/sec before 429s (0 = unlimited)")
+    parser.add_argument("--news-burst", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the collection output of each run")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-path", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.companies[0], args.jobs, args.result_path)
+        return
+
+    corpus = SyntheticCorpus(args.articles, report_pages=args.report_pages,
+                             syndication_rate=args.syndication_rate, seed=args.seed)
+    with MockCollectionServer(corpus=corpus, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate, news_rate_per_sec=args.news_rate,
+                              news_burst=args.news_burst, seed=args.seed) as server:
+        results = run_load_test(args.companies, args.jobs, server, args.tier, args.verbose)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
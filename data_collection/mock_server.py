@@ -0,0 +1,359 @@
+"""
+Local Collection Stand-in Server
+Offline replacement for NewsAPI, the report search page and report PDF hosting,
+serving a deterministic synthetic corpus so ingestion can be tested and
+benchmarked without network access.
+
+Endpoints:
+    GET /v2/everything?q=<company>&from=&to=&page=&pageSize=   NewsAPI-style article pages
+    GET /search?q=<ticker> annual report pdf               HTML results with one report link
+    GET /reports/<ticker>-annual-report.pdf                synthetic PDF (ETag / 304 support)
+    GET /_stats                                            request counts by endpoint and status
+
+Latency (base + jitter), random 500s and a NewsAPI rate limit (429 with
+Retry-After) can be injected to exercise retries and error handling.
+
+Usage:
+    python -m data_collection.mock_server --port 8765 --latency-ms 50 --error-rate 0.02
+    NEWS_API_URL=http://127.0.0.1:8765/v2/everything REPORT_SEARCH_URL=http://localhost:8765/search ...
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+NEWS_TEMPLATES = [
+    "{company} cuts carbon emissions by {n}% and expands renewable energy use",
+    "{company} faces strike as workers demand better safety conditions",
+    "{company} board adds independent directors after governance review",
+    "Regulators fine {company} over pollution at a coastal plant",
+    "{company} publishes supply chain human rights audit",
+    "{company} issues green bond to fund energy efficiency upgrades",
+    "Shareholders question {company} executive pay and bribery probe",
+    "{company} improves diversity and employee wellbeing programmes",
+]
+
+# Filler words that make each synthetic story distinct for near-duplicate detection
+VOCABULARY = (
+    "analysts investors quarter guidance regulators plant factory suppliers audit board climate water "
+    "waste recycling emissions pension union safety training community lawsuit settlement dividend "
+    "shareholders disclosure target pledge transition offshore solar wind hydrogen battery logistics "
+    "retail customers privacy data breach fine court ruling committee compensation bonus ethics"
+).split()
+
+REPORT_SENTENCES = [
+    "We reduced scope 1 and scope 2 emissions by {n} percent this year.",
+    "Renewable energy now covers {n} percent of our operations.",
+    "Our board has {n} independent directors and an audit committee.",
+    "We invested in employee safety training across all sites.",
+    "Water use and waste fell as we upgraded our recycling facilities.",
+    "Our supply chain code of conduct covers human rights and child labor.",
+    "Diversity in senior management rose to {n} percent.",
+    "We paid no fines for environmental violations during the year.",
+]
+
+
+def make_pdf(page_texts: List[Optional[str]]) -> bytes:
+    """Builds a minimal PDF with one line of Helvetica text per page (None = blank page)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in page_texts:
+        stream = f"BT /F1 10 Tf 36 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+class SyntheticCorpus:
+    """
+    Deterministic articles and reports per company/ticker, seeded by name.
+    Articles are spread over the `days` before the corpus was created, newest first;
+    a `syndication_rate` fraction of them are syndicated copies of an earlier story.
+    """
+
+    def __init__(self, articles_per_company: int = 30, days: int = 30, report_pages: int = 10,
+                 syndication_rate: float = 0.1, seed: int = 0):
+        self.articles_per_company = articles_per_company
+        self.syndication_rate = syndication_rate
+        self.days = days
+        self.report_pages = report_pages
+        self.seed = seed
+        self.created_at = datetime.now(timezone.utc).replace(microsecond=0)
+        self._articles: Dict[str, List[Dict]] = {}
+        self._reports: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, key: str) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    def articles(self, company: str) -> List[Dict]:
+        with self._lock:
+            if company not in self._articles:
+                rng = self._rng(company)
+                slug = "-".join(company.lower().split())
+                articles = []
+                for i in range(self.articles_per_company):
+                    published = self.created_at - timedelta(seconds=rng.uniform(0, self.days * 86400))
+                    source = rng.choice(["Reuters", "Bloomberg", "FT", "AP"])
+                    if articles and rng.random() < self.syndication_rate:
+                        original = rng.choice(articles)
+                        title = f"{original['title']} - {source}"
+                        description = original["description"]
+                    else:
+                        headline = rng.choice(NEWS_TEMPLATES).format(company=company, n=rng.randint(5, 40))
+                        title = f"{headline} ({i})"
+                        description = f"{headline}: {' '.join(rng.sample(VOCABULARY, 12))}."
+                    articles.append({
+                        "source": {"id": None, "name": source},
+                        "title": title,
+                        "description": description,
+                        "url": f"https://news.example.com/{slug}/{i}",
+                        "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    })
+                self._articles[company] = sorted(articles, key=lambda a: a["publishedAt"], reverse=True)
+            return self._articles[company]
+
+    def report(self, ticker: str) -> bytes:
+        with self._lock:
+            if ticker not in self._reports:
+                rng = self._rng(ticker)
+                pages = [f"{ticker} Annual Report - page {p + 1}. " +
+                         " ".join(rng.choice(REPORT_SENTENCES).format(n=rng.randint(5, 60)) for _ in range(3))
+                         for p in range(self.report_pages)]
+                self._reports[ticker] = make_pdf(pages)
+            return self._reports[ticker]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockCollectionServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        endpoint = url.path.split("/")[1] if url.path.count("/") > 1 else url.path.strip("/")
+
+        if url.path == "/_stats":
+            return self._send(200, json.dumps(self.server.stats()).encode(), "application/json", count=False)
+
+        self.server.inject_latency()
+        if self.server.inject_error():
+            return self._send(500, b'{"status": "error", "code": "unexpectedError"}', "application/json", endpoint)
+
+        if url.path == "/v2/everything":
+            self._everything(params)
+        elif url.path == "/search":
+            self._search(params)
+        elif url.path.startswith("/reports/") and url.path.endswith("-annual-report.pdf"):
+            self._report(url.path[len("/reports/"):-len("-annual-report.pdf")])
+        else:
+            self._send(404, b"Not found", "text/plain", endpoint)
+
+    def _everything(self, params: Dict[str, str]):
+        if not self.server.take_news_token():
+            body = json.dumps({"status": "error", "code": "rateLimited",
+                               "message": "You have made too many requests recently."}).encode()
+            return self._send(429, body, "application/json", "v2", {"Retry-After": "1"})
+
+        company = params.get("q", "").strip('"')
+        articles = self.server.corpus.articles(company)
+        if params.get("from"):
+            articles = [a for a in articles if a["publishedAt"] >= params["from"]]
+        if params.get("to"):
+            articles = [a for a in articles if a["publishedAt"] <= params["to"]]
+        page_size = min(100, int(params.get("pageSize", 100)))
+        page = max(1, int(params.get("page", 1)))
+        body = {
+            "status": "ok",
+            "totalResults": len(articles),
+            "articles": articles[(page - 1) * page_size:page * page_size],
+        }
+        self._send(200, json.dumps(body).encode(), "application/json", "v2")
+
+    def _search(self, params: Dict[str, str]):
+        ticker = params.get("q", "").split(" ")[0]
+        host = self.headers.get("Host", f"localhost:{self.server.server_port}")
+        link = f"http://{host}/reports/{ticker}-annual-report.pdf"
+        body = f'<html><body><a href="/about">About</a><a href="{link}">{ticker} annual report</a></body></html>'
+        self._send(200, body.encode(), "text/html", "search")
+
+    def _report(self, ticker: str):
+        body = self.server.corpus.report(ticker)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        headers = {"ETag": etag, "Last-Modified": self.server.last_modified}
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", "application/pdf", "reports", headers)
+        self._send(200, body, "application/pdf", "reports", headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, endpoint: str = "",
+              headers: Optional[Dict[str, str]] = None, count: bool = True):
+        if count:
+            self.server.record(endpoint, status, len(body))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockCollectionServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in for NewsAPI, report search and report hosting.
+
+    Args:
+        corpus: synthetic corpus to serve
+        latency_ms / jitter_ms: added to every response (base + uniform jitter)
+        error_rate: fraction of requests answered with a 500
+        news_rate_per_sec / news_burst: server-side NewsAPI rate limit (0 disables)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, corpus: Optional[SyntheticCorpus] = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 news_rate_per_sec: float = 0.0, news_burst: int = 10, seed: int = 0):
+        super().__init__((host, port), _Handler)
+        self.corpus = corpus or SyntheticCorpus(seed=seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.news_rate_per_sec = news_rate_per_sec
+        self.news_burst = news_burst
+        self.last_modified = formatdate(self.corpus.created_at.timestamp(), usegmt=True)
+        self._rng = random.Random(seed)
+        self._tokens = float(news_burst)
+        self._tokens_updated = time.monotonic()
+        self._counts: Counter = Counter()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def settings_env(self) -> Dict[str, str]:
+        """
+        Environment overrides pointing the collection code at this server. Reports
+        are addressed via 'localhost' so they do not share the NewsAPI rate limit
+        the HTTP client keeps per host.
+        """
+        return {
+            "NEWS_API_URL": f"{self.base_url}/v2/everything",
+            "REPORT_SEARCH_URL": f"http://localhost:{self.server_port}/search",
+        }
+
+    def start(self) -> "MockCollectionServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-collection-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- fault injection ---
+
+    def inject_latency(self):
+        delay = self.latency_ms + (self._uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def inject_error(self) -> bool:
+        return self.error_rate > 0 and self._uniform(0, 1) < self.error_rate
+
+    def take_news_token(self) -> bool:
+        if self.news_rate_per_sec <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.news_burst, self._tokens + (now - self._tokens_updated) * self.news_rate_per_sec)
+            self._tokens_updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _uniform(self, low: float, high: float) -> float:
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    # --- stats ---
+
+    def record(self, endpoint: str, status: int, size: int):
+        with self._lock:
+            self._counts[f"{endpoint} {status}"] += 1
+            self._bytes += size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"requests": dict(sorted(self._counts.items())), "bytes_sent": self._bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic NewsAPI / report search / PDF corpus locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--articles", type=int, default=30, help="Articles per company")
+    parser.add_argument("--days", type=int, default=30, help="Days the articles are spread over")
+    parser.add_argument("--report-pages", type=int, default=10)
+    parser.add_argument("--syndication-rate", type=float, default=0.1, help="Fraction of articles that are syndicated copies")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--news-rate", type=float, default=0.0, help="NewsAPI requests/sec before 429s (0 = unlimited)")
+    parser.add_argument("--news-burst", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(args.articles, args.days, args.report_pages, args.syndication_rate, args.seed)
+    server = MockCollectionServer(args.host, args.port, corpus, args.latency_ms, args.jitter_ms,
+                                  args.error_rate, args.news_rate, args.news_burst, args.seed)
+    for name, value in server.settings_env().items():
+        print(f"{name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Streaming PDF Text Extraction
+Page-parallel pdfplumber extraction from a PDF file or a binary buffer.
+
+Worker processes each extract a contiguous range of pages. A PDF on disk (the
+report cache's blob) is opened by the workers directly, so the parent never
+reads it; a buffer is copied, in chunks, into shared memory once and the workers
+attach to that. iter_pdf_pages() yields page texts in order as soon as their
+range is done, and returns whether the document was extracted in full. Each
+document is capped at REPORT_MAX_PAGES pages and REPORT_EXTRACT_TIMEOUT seconds; workers stop at the first page boundary past
+the deadline, and a timed-out document retires the pool (its processes are
+terminated and the next document gets a fresh pool), so a page that hangs
+pdfplumber cannot hold a worker indefinitely.
+
+With REPORT_EXTRACT_PROCESSES=0 pages are extracted inline, one at a time.
+"""
+
+import atexit
+import io
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import BinaryIO, Generator, List, Optional, Tuple, Union
+
+import pdfplumber
+
+from config.settings import REPORT_MAX_PAGES, REPORT_EXTRACT_TIMEOUT, REPORT_EXTRACT_PROCESSES, REPORT_PAGES_PER_TASK
+
+PdfSource = Union[str, os.PathLike, BinaryIO]
+
+
+def _page_text(page) -> str:
+    # extract_text() returns None for pages without a text layer (e.g. scanned images)
+    return page.extract_text() or ""
+
+
+def _extract_page_range(source: str, size: Optional[int], start: int, end: int, deadline: float) -> List[str]:
+    """
+    Worker task: extracts pages [start, end) from a PDF file path, or from the
+    shared memory segment named `source` when `size` is given. Stops early once
+    the wall-clock `deadline` has passed.
+    """
+    if size is None:
+        pdf = source
+    else:
+        shm = shared_memory.SharedMemory(name=source)
+        try:
+            pdf = io.BytesIO(bytes(shm.buf[:size]))
+        finally:
+            shm.close()
+    pages = []
+    with pdfplumber.open(pdf) as document:
+        for i in range(start, end):
+            if time.time() > deadline:
+                break
+            pages.append(_page_text(document.pages[i]))
+    return pages
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(processes: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _retire_executor(executor: ProcessPoolExecutor):
+    """Drops `executor` as the shared pool (if it still is) and terminates its workers."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    # Queued ranges are cancelled; running ones cannot be, so their processes are killed
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def shutdown_extraction_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_extraction_pool)
+
+
+def _is_path(pdf: PdfSource) -> bool:
+    return isinstance(pdf, (str, os.PathLike))
+
+
+def _page_count(pdf: PdfSource) -> int:
+    if not _is_path(pdf):
+        pdf.seek(0)
+    with pdfplumber.open(pdf) as document:
+        return len(document.pages)
+
+
+class _SharedMemoryWriter:
+    """File-like sink that fills a shared memory segment front to back."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.offset = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.shm.buf[self.offset:self.offset + len(chunk)] = chunk
+        self.offset += len(chunk)
+        return len(chunk)
+
+
+def _copy_to_shared_memory(pdf: BinaryIO) -> Tuple[shared_memory.SharedMemory, int]:
+    """Copies a buffer into a new shared memory segment in chunks. Returns (segment, size)."""
+    size = pdf.seek(0, io.SEEK_END)
+    pdf.seek(0)
+    # The segment may be rounded up to a page size; workers read exactly `size` bytes
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    writer = _SharedMemoryWriter(shm)
+    try:
+        shutil.copyfileobj(pdf, writer, 1024 * 1024)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, writer.offset
+
+
+def iter_pdf_pages(pdf: PdfSource, max_pages: int = REPORT_MAX_PAGES, timeout: float = REPORT_EXTRACT_TIMEOUT,
+                   processes: int = REPORT_EXTRACT_PROCESSES,
+                   pages_per_task: int = REPORT_PAGES_PER_TASK) -> Generator[str, None, bool]:
+    """
+    Yields the text of each page, in order, from a PDF path or binary buffer.
+    Stops after `max_pages` pages, or when `timeout` seconds have passed for this
+    document (pages not yet extracted are skipped and a warning is printed).
+    The generator returns True if every page was extracted, False if the page cap
+    or the timeout cut the text short.
+    """
+    deadline = time.monotonic() + timeout
+
+    if processes <= 0:
+        if not _is_path(pdf):
+            pdf.seek(0)
+        with pdfplumber.open(pdf) as document:
+            for index, page in enumerate(document.pages[:max_pages]):
+                if time.monotonic() > deadline:
+                    print(f"Warning: PDF extraction timed out after {index} pages.")
+                    return False
+                yield _page_text(page)
+            return len(document.pages) <= max_pages
+
+    total_pages = _page_count(pdf)
+    page_count = min(total_pages, max_pages)
+    if page_count == 0:
+        return True
+
+    shm = None
+    if _is_path(pdf):
+        source, size = os.fspath(pdf), None
+    else:
+        shm, size = _copy_to_shared_memory(pdf)
+        source = shm.name
+    # Workers run in other processes, so they get the deadline as wall-clock time
+    wall_deadline = time.time() + max(0.0, deadline - time.monotonic())
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+    def submit(executor, pending):
+        return [executor.submit(_extract_page_range, source, size, start, end, wall_deadline) for start, end in pending]
+
+    executor = _get_executor(processes)
+    futures = []
+    restarted = False
+    try:
+        futures = submit(executor, ranges)
+        index = 0
+        while index < len(futures):
+            start, end = ranges[index]
+            try:
+                pages = futures[index].result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                print(f"Warning: PDF extraction timed out after {start} of {page_count} pages.")
+                _retire_executor(executor)
+                return False
+            except BrokenProcessPool:
+                # Another document's timeout retired the pool under us; retry the rest once on a fresh one
+                if restarted:
+                    raise
+                restarted = True
+                executor = _get_executor(processes)
+                futures[index:] = submit(executor, ranges[index:])
+                continue
+            yield from pages
+            if len(pages) < end - start:
+                print(f"Warning: PDF extraction timed out after {start + len(pages)} of {page_count} pages.")
+                return False
+            index += 1
+        return total_pages <= max_pages
+    finally:
+        # Covers timeouts and consumers that stop iterating early
+        for future in futures:
+            future.cancel()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+def extract_pdf_text(pdf: PdfSource, **kwargs) -> Tuple[str, bool]:
+    """
+    Extracts the whole (capped) document text, joining pages in linear time.
+    Returns (text, complete), where complete is False if the text was truncated
+    by the page cap or the timeout.
+
+    The text is returned whole rather than streamed page by page into NLP:
+    analyze_report_text() needs the entire document for the sentence prefilter's
+    context window, the entity/controversy/category counts and the single report
+    score, and the report cache stores one text per report.
+    """
+    pages = []
+    extraction = iter_pdf_pages(pdf, **kwargs)
+    while True:
+        try:
+            pages.append(next(extraction))
+        except StopIteration as stop:
+            return "\n".join(pages), stop.value
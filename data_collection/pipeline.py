@@ -0,0 +1,387 @@
+"""
+Collection Pipeline
+One staged pipeline per scheduler cycle: fetch -> analyze -> persist -> aggregate.
+
+Each company's news is fetched and analyzed exactly once per cycle and the
+analyzed articles are handed from stage to stage, instead of being fetched
+and scored again by the score update. Every stage writes its output to a
+checkpoint under data/pipeline_runs/<cycle_id>/, so a cycle interrupted
+mid-way resumes from the last completed stage when run again with the same
+cycle id (by default, the current hour).
+"""
+
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from data_collection.checkpoints import (
+    IngestionCheckpoints, FeedCheckpoints, get_ingestion_checkpoints, get_feed_checkpoints
+)
+from data_collection.scrapers.news_scraper import fetch_news_for_companies, fetch_new_news_for_companies, analyze_articles
+from data_collection.scrapers.feed_scraper import fetch_feed_articles
+from data_collection.scrapers.reports_scraper import find_annual_report_url, download_report, extract_text_from_pdf
+from data_collection.report_cache import get_report_cache
+from data_collection.streaming import Stage, StreamingPipeline
+from data_collection.article_store import ArticleStore, get_article_store
+from data_collection.utils import write_json_atomic
+from database.database import SessionLocal
+from database.models import ESGScore
+from config.settings import (
+    PIPELINE_RUNS_DIR, PIPELINE_FETCH_WORKERS, PIPELINE_EXTRACT_WORKERS, PIPELINE_ANALYZE_WORKERS,
+    PIPELINE_ANALYZE_TIMEOUT, FEED_URLS
+)
+from nlp_engine.worker_pool import analyze_documents
+
+RUNS_DIR = Path(PIPELINE_RUNS_DIR)
+# Run directories older than this are pruned
+RUN_RETENTION_HOURS = 24
+
+
+class StageCheckpoints:
+    """Stores and reloads stage outputs for one pipeline run, and times the stages it runs."""
+
+    def __init__(self, cycle_id: str, runs_dir: Path = RUNS_DIR):
+        self.cycle_id = cycle_id
+        self.run_dir = Path(runs_dir) / cycle_id
+        # stage name -> seconds taken in this process (stages loaded from a checkpoint are not timed)
+        self.timings: Dict[str, float] = {}
+
+    def run_stage(self, name: str, stage: Callable, *args):
+        """Returns the stage's checkpointed output, or runs the stage and checkpoints it."""
+        path = self.run_dir / f"{name}.json"
+        if path.exists():
+            print(f"[{self.cycle_id}] Stage '{name}': loaded from checkpoint.")
+            with open(path, "r") as f:
+                return json.load(f)
+
+        print(f"[{self.cycle_id}] Stage '{name}': running...")
+        start = time.perf_counter()
+        output = stage(*args)
+        self.timings[name] = round(time.perf_counter() - start, 3)
+        write_json_atomic(path, output)
+        print(f"[{self.cycle_id}] Stage '{name}': done in {self.timings[name]}s.")
+        return output
+
+    def mark_complete(self):
+        write_json_atomic(self.run_dir / "_complete.json",
+                          {"completed_at": datetime.now().isoformat(), "stage_seconds": self.timings})
+
+    def is_complete(self) -> bool:
+        return (self.run_dir / "_complete.json").exists()
+
+
+def fetch_stage(companies: List[Dict], checkpoints: Optional[IngestionCheckpoints] = None) -> Dict[str, Dict]:
+    """
+    Fetches raw news for every company concurrently. Returns the articles keyed by
+    company id and, with ingestion checkpoints (only articles newer than each
+    company's high-water mark are fetched), each company's pagination status
+    ({"complete", "oldest_read"}) used to advance its checkpoint.
+    """
+    names = [c["name"] for c in companies]
+    if checkpoints is None:
+        raw_news = fetch_news_for_companies(names)
+        return {"articles": {str(c["id"]): raw_news.get(c["name"], []) for c in companies}, "status": {}}
+
+    fetched = fetch_new_news_for_companies(names, checkpoints)
+    articles, status = {}, {}
+    for company in companies:
+        result = fetched.get(company["name"]) or {"articles": [], "complete": False, "oldest_read": None}
+        articles[str(company["id"])] = result.pop("articles")
+        status[str(company["id"])] = result
+    return {"articles": articles, "status": status}
+
+
+def feed_fetch_stage(companies: List[Dict], feed_urls: List[str],
+                     checkpoints: Optional[FeedCheckpoints] = None) -> Dict[str, Dict]:
+    """
+    Polls the RSS/Atom feeds once for all companies. Returns the matched articles
+    keyed by company id (companies without matches are left out) and the per-feed
+    poll results used to advance the feed checkpoints.
+    """
+    polled = fetch_feed_articles(companies, feed_urls, checkpoints=checkpoints)
+    articles = {
+        str(c["id"]): polled["articles"][c["name"]] for c in companies if polled["articles"].get(c["name"])
+    }
+    return {"articles": articles, "feeds": polled["feeds"]}
+
+
+def analyze_stage(companies: List[Dict], raw_news: Dict[str, List[Dict]], tier: Optional[str] = None,
+                  reports: bool = True) -> Dict[str, Dict]:
+    """
+    Analyzes each company's fetched news and (unless `reports` is False) its annual report.
+    Companies stream through report download -> text extraction -> NLP stages, each
+    with its own workers and a bounded queue, so downloads and extraction overlap
+    with NLP without buffering every report in memory. Reports go through the
+    report cache: unchanged reports skip extraction and NLP entirely, unless their
+    last extraction was truncated by the page cap or timeout.
+    The report's full text is dropped from the output; only its analysis is kept.
+    Extraction hands NLP the whole text rather than streaming pages into it, since
+    a report is analyzed and scored as one document (see extract_pdf_text()).
+    Each company's NLP (news and report together) gets PIPELINE_ANALYZE_TIMEOUT
+    seconds on the worker pool; past it the company fails like any analysis error.
+    A company whose analysis failed gets an empty entry marked "failed", so
+    persist_stage() neither stores it nor advances its checkpoint.
+    """
+    cache = get_report_cache()
+
+    def download(item):
+        ticker = item["company"]["ticker"]
+        try:
+            url = cache.resolve_url(ticker, find_annual_report_url)
+            if not url:
+                print(f"Could not find annual report for {ticker}")
+                return item
+            item["content_hash"], pdf = cache.fetch(url, download_report)
+            # fetch() has stored the blob; extraction reads it from disk, so the buffer can go now
+            if pdf is not None:
+                pdf.close()
+            item["report"] = cache.get_analysis(item["content_hash"], tier)
+        except Exception as e:
+            print(f"Error downloading report for {ticker}: {e}")
+        return item
+
+    def extract(item):
+        if item.get("content_hash") and item.get("report") is None:
+            try:
+                item["text"], item["text_complete"] = cache.get_text(item["content_hash"], extract_text_from_pdf)
+            except Exception as e:
+                print(f"Error extracting report for {item['company']['ticker']}: {e}")
+        return item
+
+    def analyze(item):
+        company = item["company"]
+        deadline = time.monotonic() + PIPELINE_ANALYZE_TIMEOUT
+        articles = raw_news.get(str(company["id"]), [])
+        news = analyze_articles(articles, tier=tier, timeout=PIPELINE_ANALYZE_TIMEOUT) if articles else []
+        text = item.pop("text", None)
+        report = item.get("report")
+        if report is None and text:
+            report = analyze_documents([text], tier=tier, timeout=deadline - time.monotonic())[0]
+            # The analysis of truncated text is not cached, so the full report is analyzed later
+            if item.get("text_complete"):
+                cache.set_analysis(item["content_hash"], report, tier)
+        print(f"Analyzed {len(news)} articles for {company['name']} (report: {'yes' if report else 'no'}).")
+        return {"key": str(company["id"]), "news": news, "report": report, "report_hash": item.get("content_hash")}
+
+    analyzed = {}
+    failed = set()
+
+    def on_error(stage_name, item, error):
+        print(f"Error in pipeline stage '{stage_name}' for {item['company']['name']}: {error}")
+        failed.add(str(item["company"]["id"]))
+
+    stages = [Stage("analyze", analyze, workers=PIPELINE_ANALYZE_WORKERS)]
+    if reports:
+        stages = [
+            Stage("download", download, workers=PIPELINE_FETCH_WORKERS),
+            Stage("extract", extract, workers=PIPELINE_EXTRACT_WORKERS),
+        ] + stages
+    pipeline = StreamingPipeline(
+        stages,
+        sink=lambda result: analyzed.__setitem__(result.pop("key"), result),
+        on_error=on_error,
+    )
+    pipeline.run({"company": company} for company in companies)
+    print(f"Analyze stage metrics: {pipeline.metrics()}")
+
+    for company in companies:
+        key = str(company["id"])
+        if key in failed or key not in analyzed:
+            analyzed[key] = {"news": [], "report": None, "report_hash": None, "failed": True}
+    return analyzed
+
+
+def persist_stage(companies: List[Dict], analyzed: Dict[str, Dict], raw_news: Dict[str, List[Dict]],
+                  checkpoints: Optional[IngestionCheckpoints] = None, store: Optional[ArticleStore] = None,
+                  fetch_status: Optional[Dict[str, Dict]] = None) -> Dict[str, int]:
+    """
+    Appends each company's analyzed articles to the article store and records its
+    current report's scores (both update the running sums and mark the company
+    dirty only when something is new), then advances and saves the ingestion
+    checkpoints past everything fetched this cycle (including collapsed duplicates).
+    `fetch_status` is fetch_stage()'s pagination status: a company whose fetch did
+    not catch up keeps its high-water mark, so its unread older pages come next.
+    Companies whose analysis failed are skipped, checkpoint included, so their
+    articles are fetched again next cycle; so is a company whose articles could not
+    be stored, without affecting the others.
+    Returns the number of newly stored articles per company, or None for a company
+    that was not stored.
+    """
+    store = store or get_article_store()
+    saved = {}
+    for company in companies:
+        key = str(company["id"])
+        inputs = analyzed.get(key, {})
+        if inputs.get("failed"):
+            saved[key] = None
+            print(f"Not storing {company['name']}: its analysis failed; its articles are fetched again next cycle.")
+            continue
+        articles = inputs.get("news", [])
+        try:
+            saved[key] = store.add_articles(articles, company["name"]) if articles else 0
+            report = inputs.get("report")
+            if report and report.get("scores") and inputs.get("report_hash"):
+                store.set_report_scores(company["name"], inputs["report_hash"], report["scores"])
+        except Exception as e:
+            saved[key] = None
+            print(f"Error storing {company['name']}: {e}; its articles are fetched again next cycle.")
+            continue
+        print(f"Stored {saved[key]} new articles for {company['name']}.")
+        if checkpoints is not None:
+            checkpoints.advance(company["name"], raw_news.get(key, []), **(fetch_status or {}).get(key, {}))
+
+    # Only committed once the articles are stored, so a crash before this refetches them
+    if checkpoints is not None:
+        checkpoints.save()
+    return saved
+
+
+def aggregate_stage(companies: List[Dict], store: Optional[ArticleStore] = None) -> Dict[str, Dict]:
+    """
+    Recomputes scores only for the shard's companies flagged dirty (new articles or
+    a new report since their last score), from their time-decayed score state in
+    the store, and stores them in one transaction. Companies without new inputs, or without any
+    analyzed input at all, get no new ESGScore row. A company whose scores cannot be
+    computed is skipped and stays dirty, so it is retried next time.
+    """
+    store = store or get_article_store()
+    started_at = time.time()
+    dirty = set(store.dirty_companies())
+    scores_by_company = {}
+    failed = set()
+    for company in companies:
+        if company["name"] not in dirty:
+            continue
+        try:
+            scores = store.current_scores(company["name"])
+        except Exception as e:
+            print(f"Could not calculate scores for {company['name']}: {e}")
+            failed.add(company["name"])
+            continue
+        if scores:
+            scores_by_company[str(company["id"])] = {
+                **scores, "rating_date": datetime.now().date(), "source": "NLP Analysis"
+            }
+
+    db = SessionLocal()
+    try:
+        for company in companies:
+            scores = scores_by_company.get(str(company["id"]))
+            if scores is None:
+                continue
+            db.add(ESGScore(
+                company_id=company["id"],
+                environmental_score=scores["environmental_score"],
+                social_score=scores["social_score"],
+                governance_score=scores["governance_score"],
+                total_score=scores["total_score"],
+                rating_date=scores["rating_date"],
+                source=scores["source"]
+            ))
+            print(f"Updated scores for {company['name']}: E={scores['environmental_score']}, S={scores['social_score']}, G={scores['governance_score']}, Total={scores['total_score']}")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise RuntimeError(f"Error storing ESG scores: {e}") from e
+    finally:
+        db.close()
+
+    store.clear_dirty([c["name"] for c in companies if c["name"] in dirty - failed], before=started_at)
+    print(f"Rescored {len(scores_by_company)} of {len(companies)} companies; the rest had no new inputs.")
+
+    # Dates are stored as ISO strings in the checkpoint
+    return {
+        key: {**scores, "rating_date": scores["rating_date"].isoformat()}
+        for key, scores in scores_by_company.items()
+    }
+
+
+def prune_old_runs(runs_dir: Path = RUNS_DIR, max_age_hours: float = RUN_RETENTION_HOURS):
+    """Deletes run directories not written to for `max_age_hours`."""
+    if not runs_dir.exists():
+        return
+    cutoff = time.time() - max_age_hours * 3600
+    for run_dir in runs_dir.iterdir():
+        if run_dir.is_dir() and run_dir.stat().st_mtime < cutoff:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def run_collection_cycle(companies: List[Dict], tier: Optional[str] = None,
+                         cycle_id: Optional[str] = None, runs_dir: Path = RUNS_DIR,
+                         checkpoints: Optional[IngestionCheckpoints] = None) -> Optional[Dict[str, Dict]]:
+    """
+    Runs fetch -> analyze -> persist -> aggregate for the given companies.
+    Re-running with the same cycle_id skips stages that already completed.
+    News is fetched incrementally from the ingestion checkpoints (the shared store by default).
+    Returns the scores per company id, or None if the cycle was already complete.
+    """
+    cycle_id = cycle_id or datetime.now().strftime("%Y%m%dT%H")
+    stages = StageCheckpoints(cycle_id, runs_dir)
+    if stages.is_complete():
+        print(f"[{cycle_id}] Cycle already completed. Skipping.")
+        return None
+
+    ingestion = checkpoints or get_ingestion_checkpoints()
+    fetched = stages.run_stage("fetch", fetch_stage, companies, ingestion)
+    raw_news = fetched["articles"]
+    analyzed = stages.run_stage("analyze", analyze_stage, companies, raw_news, tier)
+    stages.run_stage("persist", persist_stage, companies, analyzed, raw_news, ingestion, None, fetched["status"])
+    scores = stages.run_stage("aggregate", aggregate_stage, companies)
+
+    stages.mark_complete()
+    prune_old_runs(Path(runs_dir))
+    return scores
+
+
+def advance_feed_checkpoints(checkpoints: FeedCheckpoints, feeds: Dict[str, Dict], failed_companies: set):
+    """
+    Marks each polled feed's new entries as seen, except those matched to a company
+    in `failed_companies` (not stored). A feed with such entries keeps its old
+    validators, so the next poll downloads it again instead of getting a 304.
+    """
+    for feed_url, polled in feeds.items():
+        unstored = {
+            entry_id for entry_id, names in polled.get("matches", {}).items() if failed_companies.intersection(names)
+        }
+        etag, last_modified = polled["etag"], polled["last_modified"]
+        if unstored:
+            print(f"{len(unstored)} entries of {feed_url} were not stored; they are ingested again next poll.")
+            etag, last_modified = checkpoints.validators(feed_url)
+        checkpoints.advance(feed_url, etag, last_modified, [i for i in polled["entry_ids"] if i not in unstored])
+    checkpoints.save()
+
+
+def run_feed_cycle(companies: List[Dict], feed_urls: List[str] = FEED_URLS, tier: Optional[str] = None,
+                   cycle_id: Optional[str] = None, runs_dir: Path = RUNS_DIR,
+                   checkpoints: Optional[FeedCheckpoints] = None) -> Optional[Dict[str, Dict]]:
+    """
+    Polls the feeds once for all companies, then runs the companies they mention
+    through the same analyze -> persist -> aggregate stages (news only, no reports).
+    Feed checkpoints are only advanced once the matched articles are stored, and
+    only past the entries whose articles were: see advance_feed_checkpoints().
+    Returns the scores per company id, or None if the cycle was already complete.
+    """
+    cycle_id = cycle_id or f"feeds-{datetime.now().strftime('%Y%m%dT%H%M')}"
+    stages = StageCheckpoints(cycle_id, runs_dir)
+    if stages.is_complete():
+        print(f"[{cycle_id}] Cycle already completed. Skipping.")
+        return None
+
+    checkpoints = checkpoints or get_feed_checkpoints()
+    fetched = stages.run_stage("fetch", feed_fetch_stage, companies, feed_urls, checkpoints)
+    matched = [c for c in companies if str(c["id"]) in fetched["articles"]]
+    scores, failed = {}, set()
+    if matched:
+        analyzed = stages.run_stage("analyze", analyze_stage, matched, fetched["articles"], tier, False)
+        saved = stages.run_stage("persist", persist_stage, matched, analyzed, fetched["articles"])
+        failed = {c["name"] for c in matched if saved.get(str(c["id"])) is None}
+    advance_feed_checkpoints(checkpoints, fetched["feeds"], failed)
+    if matched:
+        scores = stages.run_stage("aggregate", aggregate_stage, matched)
+
+    stages.mark_complete()
+    prune_old_runs(Path(runs_dir))
+    return scores
@@ -0,0 +1,239 @@
+"""
+Report Cache
+Content-addressed cache for annual reports: PDF, extracted text and NLP result.
+
+Annual reports change at most yearly, so in steady state a report costs one
+conditional GET (answered 304 Not Modified) and two SQLite lookups:
+  - ticker -> report URL, re-resolved after REPORT_URL_TTL_HOURS
+  - URL -> ETag / Last-Modified / SHA-256 of the last downloaded bytes
+  - content hash -> PDF blob on disk (data/reports/<hash>.pdf) and extracted text
+  - (content hash, analysis key) -> NLP result, where the key names the sentiment
+    model, lexicon version and prefilter setting, so changing any of them re-analyzes
+A report is only re-extracted and re-analyzed when its bytes change. Text cut
+short by the extraction page cap or timeout is not cached, nor is its analysis,
+so the report is extracted in full on a later run.
+
+Besides the per-ticker search, reports can be fed in from outside (the report
+crawler): store_download() records a downloaded PDF and its validators, and
+set_url() points a ticker at it.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from config.settings import REPORT_CACHE_PATH, REPORT_CACHE_DIR, REPORT_URL_TTL_HOURS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_urls (
+    ticker TEXT PRIMARY KEY, url TEXT, resolved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_sources (
+    url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL, checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_texts (
+    content_hash TEXT PRIMARY KEY, text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_analyses (
+    content_hash TEXT NOT NULL, analysis_key TEXT NOT NULL, result TEXT NOT NULL,
+    PRIMARY KEY (content_hash, analysis_key)
+);
+"""
+
+
+def analysis_key(tier: Optional[str] = None) -> str:
+    """Identifies the models and settings behind a report analysis."""
+    from nlp_engine.analysis import LEXICON_VERSION, resolve_tier, sentiment_model_id
+    from config.settings import NLP_PREFILTER_ENABLED
+    return f"{sentiment_model_id(resolve_tier(tier))}|{LEXICON_VERSION}|prefilter={NLP_PREFILTER_ENABLED}"
+
+
+class ReportCache:
+    """SQLite-indexed, content-addressed store of report PDFs, texts and analyses."""
+
+    def __init__(self, path: str = REPORT_CACHE_PATH, blob_dir: str = REPORT_CACHE_DIR,
+                 url_ttl_hours: float = REPORT_URL_TTL_HOURS):
+        self.path = Path(path)
+        self.blob_dir = Path(blob_dir)
+        self.url_ttl_seconds = url_ttl_hours * 3600
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # --- ticker -> URL ---
+
+    def resolve_url(self, ticker: str, find_url: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Returns the cached report URL for a ticker, searching again once it is older than the TTL."""
+        with self._lock:
+            row = self._conn.execute("SELECT url, resolved_at FROM report_urls WHERE ticker = ?", (ticker,)).fetchone()
+        if row and time.time() - row[1] < self.url_ttl_seconds:
+            return row[0]
+
+        url = find_url(ticker)
+        self.set_url(ticker, url)
+        return url
+
+    def cached_url(self, ticker: str) -> Optional[str]:
+        """Returns the ticker's recorded report URL regardless of its age."""
+        with self._lock:
+            row = self._conn.execute("SELECT url FROM report_urls WHERE ticker = ?", (ticker,)).fetchone()
+        return row[0] if row else None
+
+    def set_url(self, ticker: str, url: Optional[str]):
+        """Records a report URL found for a ticker elsewhere (e.g. by the crawler), resetting its TTL."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_urls (ticker, url, resolved_at) VALUES (?, ?, ?)",
+                (ticker, url, time.time()),
+            )
+            self._conn.commit()
+
+    # --- URL -> content ---
+
+    def blob_path(self, content_hash: str) -> Path:
+        return self.blob_dir / f"{content_hash}.pdf"
+
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Returns (etag, last_modified, content_hash) recorded for a URL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash FROM report_sources WHERE url = ?", (url,)
+            ).fetchone()
+        return row if row else (None, None, None)
+
+    def fetch(self, url: str, download: Callable[..., Dict]) -> Tuple[str, Optional[BinaryIO]]:
+        """
+        Conditionally downloads a report. Returns (content_hash, pdf) where pdf is a
+        buffer of new bytes, or None when the cached copy is still current.
+
+        `download(url, etag=..., last_modified=...)` must return a dict with
+        'not_modified', and otherwise 'pdf', 'content_hash', 'etag', 'last_modified'.
+        """
+        etag, last_modified, content_hash = self.validators(url)
+        # Only send validators if we still hold what they describe
+        have_copy = content_hash is not None and (self.has_text(content_hash) or self.blob_path(content_hash).exists())
+        result = download(url, etag=etag if have_copy else None, last_modified=last_modified if have_copy else None)
+
+        if result["not_modified"]:
+            self._record_source(url, etag, last_modified, content_hash)
+            return content_hash, None
+
+        new_hash = result["content_hash"]
+        self._record_source(url, result.get("etag"), result.get("last_modified"), new_hash)
+        pdf = result["pdf"]
+        if not self.blob_path(new_hash).exists():
+            self._store_blob(new_hash, pdf)
+        return new_hash, pdf
+
+    def store_download(self, url: str, pdf: Union[bytes, BinaryIO], etag: Optional[str] = None,
+                       last_modified: Optional[str] = None) -> str:
+        """Records a report downloaded outside fetch() and its validators. Returns its content hash."""
+        if isinstance(pdf, bytes):
+            pdf = io.BytesIO(pdf)
+        digest = hashlib.sha256()
+        pdf.seek(0)
+        for chunk in iter(lambda: pdf.read(64 * 1024), b""):
+            digest.update(chunk)
+        content_hash = digest.hexdigest()
+        if not self.blob_path(content_hash).exists():
+            self._store_blob(content_hash, pdf)
+        self._record_source(url, etag, last_modified, content_hash)
+        return content_hash
+
+    def _record_source(self, url, etag, last_modified, content_hash):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_sources (url, etag, last_modified, content_hash, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, time.time()),
+            )
+            self._conn.commit()
+
+    def _store_blob(self, content_hash: str, pdf: BinaryIO):
+        tmp_path = self.blob_path(content_hash).with_suffix(".tmp")
+        pdf.seek(0)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(pdf, f)
+        os.replace(tmp_path, self.blob_path(content_hash))
+        pdf.seek(0)
+
+    # --- content -> text -> analysis ---
+
+    def has_text(self, content_hash: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM report_texts WHERE content_hash = ?", (content_hash,)
+            ).fetchone() is not None
+
+    def get_text(self, content_hash: str, extract: Callable[[Union[Path, BinaryIO]], Tuple[str, bool]],
+                 pdf: Optional[BinaryIO] = None) -> Tuple[str, bool]:
+        """
+        Returns (text, complete) for a report, extracting it on a miss. Extraction reads
+        the stored blob by path when there is one, so extraction workers open the file
+        themselves; `pdf` is only read when the blob is missing, and is always closed.
+        `extract` returns (text, complete); truncated text is returned but not cached.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM report_texts WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row:
+            if pdf is not None:
+                pdf.close()
+            return row[0], True
+
+        blob = self.blob_path(content_hash)
+        if blob.exists() or pdf is None:
+            if pdf is not None:
+                pdf.close()
+            text, complete = extract(blob)
+        else:
+            text, complete = extract(pdf)
+        if not complete:
+            return text, False
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO report_texts (content_hash, text) VALUES (?, ?)", (content_hash, text))
+            self._conn.commit()
+        return text, True
+
+    def get_analysis(self, content_hash: str, tier: Optional[str] = None) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM report_analyses WHERE content_hash = ? AND analysis_key = ?",
+                (content_hash, analysis_key(tier)),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_analysis(self, content_hash: str, result: Dict, tier: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_analyses (content_hash, analysis_key, result) VALUES (?, ?, ?)",
+                (content_hash, analysis_key(tier), json.dumps(result, default=str)),
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+_cache: Optional[ReportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+    """Returns the process-wide report cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReportCache()
+        return _cache
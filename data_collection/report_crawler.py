@@ -0,0 +1,259 @@
+"""
+Report Crawler
+Scrapy crawler that discovers and downloads annual and sustainability report
+PDFs for the whole company universe concurrently, instead of one synchronous
+search per ticker.
+
+Each company is crawled from its investor-relations page, the 'ir_url' entry
+in companies.json. Companies without one are skipped and listed: search engine
+result pages are disallowed by their robots.txt and link through redirects, so
+they are no substitute for a seed. Seeds that cannot be crawled (robots.txt,
+HTTP errors) are reported, and the crawl exits with an error when none could.
+Links that look like IR, filing or sustainability pages are followed on the
+seed's domain up to REPORT_CRAWL_DEPTH; PDF links that look like annual or
+sustainability reports are downloaded. Scrapy supplies the concurrency controls:
+  - AutoThrottle adapts the delay to each site's latency
+  - CONCURRENT_REQUESTS_PER_DOMAIN caps the load on any one site
+  - the RFC 2616 HTTP cache revalidates pages with ETag / Last-Modified
+  - JOBDIR persists the request queue, so an interrupted crawl resumes
+PDFs bypass the HTTP cache, since the report cache already keeps them: they are
+revalidated with the validators the report cache recorded, and a 304 keeps the
+stored copy.
+
+Downloaded PDFs go into the report cache (blob, validators and, optionally,
+extracted text). Each ticker's report URL is pointed at the newest report
+found, so the collection pipeline picks it up without searching again.
+
+Usage:
+    python -m data_collection.report_crawler [--tickers AAPL MSFT] [--companies-file data/companies.json]
+"""
+
+import argparse
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import scrapy
+from scrapy.crawler import CrawlerProcess
+from twisted.internet.threads import deferToThread
+
+from config.settings import (
+    USER_AGENT, REPORT_MAX_BYTES, REPORT_CRAWL_CONCURRENCY, REPORT_CRAWL_PER_DOMAIN,
+    REPORT_CRAWL_DEPTH, REPORT_CRAWL_AUTOTHROTTLE_TARGET, REPORT_CRAWL_HTTPCACHE_DIR, REPORT_CRAWL_JOB_DIR,
+    REPORT_CRAWL_EXTRACT, REPORT_CRAWL_OBEY_ROBOTS
+)
+
+COMPANIES_FILE = Path(__file__).parent.parent / "data" / "companies.json"
+
+SUSTAINABILITY_KEYWORDS = ("sustainab", "esg", "impact", "responsib", "climate", "csr")
+ANNUAL_KEYWORDS = ("annual", "10-k", "10k", "integrated")
+# Pages worth following from an IR seed
+PAGE_KEYWORDS = SUSTAINABILITY_KEYWORDS + ANNUAL_KEYWORDS + (
+    "investor", "report", "financial", "filing", "results", "governance", "publication", "download",
+)
+YEAR_PATTERN = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+
+
+def report_kind(text: str) -> Optional[str]:
+    """'sustainability', 'annual' or None for a link's URL and text."""
+    text = text.lower()
+    if any(keyword in text for keyword in SUSTAINABILITY_KEYWORDS):
+        return "sustainability"
+    if any(keyword in text for keyword in ANNUAL_KEYWORDS):
+        return "annual"
+    return None
+
+
+def report_rank(url: str) -> Tuple[int, int]:
+    """Orders candidate report URLs: newest year first, then sustainability over annual reports."""
+    years = [int(year) for year in YEAR_PATTERN.findall(url)]
+    return max(years, default=0), 1 if report_kind(url) == "sustainability" else 0
+
+
+def is_pdf_url(url: str) -> bool:
+    return urlparse(url).path.lower().endswith(".pdf")
+
+
+class ReportSpider(scrapy.Spider):
+    """Crawls each company's IR pages for report PDFs. Companies need an 'ir_url'."""
+
+    name = "reports"
+
+    def __init__(self, companies: List[Dict], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.companies = [c for c in companies if c.get("ir_url")]
+        self._cache = None
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from data_collection.report_cache import get_report_cache
+            self._cache = get_report_cache()
+        return self._cache
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for company in self.companies:
+            meta = {
+                "company": {"name": company["name"], "ticker": company["ticker"]},
+                "seed_domain": urlparse(company["ir_url"]).netloc,
+            }
+            yield scrapy.Request(company["ir_url"], callback=self.parse_page, errback=self.seed_failed, meta=meta)
+
+    def seed_failed(self, failure):
+        request = failure.request
+        print(f"Could not crawl {request.meta['company']['ticker']} from {request.url}: {failure.getErrorMessage()}")
+        self.crawler.stats.inc_value("reports/seed_failed")
+
+    def report_request(self, url: str, company: Dict) -> scrapy.Request:
+        """Requests a report PDF outside the HTTP cache, conditional on the report cache's copy."""
+        etag, last_modified, content_hash = self.cache.validators(url)
+        headers = {}
+        if content_hash and self.cache.blob_path(content_hash).exists():
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        # Reports first: they are what the crawl is for
+        return scrapy.Request(url, callback=self.parse_report, priority=10, headers=headers,
+                              meta={"company": company, "dont_cache": True, "handle_httpstatus_list": [304]})
+
+    def parse_page(self, response):
+        if not isinstance(response, scrapy.http.TextResponse):
+            return
+        company = response.meta["company"]
+        seed_domain = response.meta.get("seed_domain")
+        for link in response.css("a[href]"):
+            url = response.urljoin(link.attrib["href"])
+            text = " ".join(link.css("::text").getall()).strip()
+            if is_pdf_url(url):
+                if report_kind(f"{url} {text}"):
+                    yield self.report_request(url, company)
+            elif seed_domain and urlparse(url).netloc == seed_domain and \
+                    any(keyword in f"{urlparse(url).path} {text}".lower() for keyword in PAGE_KEYWORDS):
+                yield scrapy.Request(url, callback=self.parse_page,
+                                     meta={"company": company, "seed_domain": seed_domain})
+
+    def parse_report(self, response):
+        if response.status == 304:
+            yield {"ticker": response.meta["company"]["ticker"], "url": response.url, "not_modified": True}
+            return
+        if not response.body.startswith(b"%PDF"):
+            self.logger.info(f"Skipping {response.url}: not a PDF")
+            return
+        header = lambda name: response.headers.get(name, b"").decode("latin-1") or None
+        yield {
+            "ticker": response.meta["company"]["ticker"],
+            "url": response.url,
+            "body": response.body,
+            "etag": header("ETag"),
+            "last_modified": header("Last-Modified"),
+        }
+
+
+class ReportCachePipeline:
+    """Stores crawled reports in the report cache off the reactor thread and points tickers at the newest."""
+
+    def __init__(self, extract: bool = REPORT_CRAWL_EXTRACT):
+        from data_collection.report_cache import get_report_cache
+        self.cache = get_report_cache()
+        self.extract = extract
+        self.stored: Dict[str, List[str]] = {}
+
+    def process_item(self, item, spider=None):
+        # Hashing, disk writes and extraction would otherwise stall every download
+        return deferToThread(self._store, item)
+
+    def _store(self, item: Dict) -> Dict:
+        if item.get("not_modified"):
+            content_hash = self.cache.validators(item["url"])[2]
+        else:
+            content_hash = self.cache.store_download(item["url"], item["body"], item["etag"], item["last_modified"])
+        current = self.cache.cached_url(item["ticker"])
+        if current is None or report_rank(item["url"]) >= report_rank(current):
+            self.cache.set_url(item["ticker"], item["url"])
+        if self.extract and not self.cache.has_text(content_hash):
+            from data_collection.scrapers.reports_scraper import extract_text_from_pdf
+            self.cache.get_text(content_hash, extract_text_from_pdf)
+        self.stored.setdefault(item["ticker"], []).append(item["url"])
+        return {"ticker": item["ticker"], "url": item["url"], "content_hash": content_hash}
+
+    def close_spider(self, spider=None):
+        for ticker, urls in sorted(self.stored.items()):
+            print(f"{ticker}: {len(urls)} reports stored, using {self.cache.cached_url(ticker)}")
+
+
+def crawl_settings(job_dir: str = REPORT_CRAWL_JOB_DIR) -> Dict:
+    return {
+        "USER_AGENT": USER_AGENT,
+        "ROBOTSTXT_OBEY": REPORT_CRAWL_OBEY_ROBOTS,
+        "CONCURRENT_REQUESTS": REPORT_CRAWL_CONCURRENCY,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": REPORT_CRAWL_PER_DOMAIN,
+        "DEPTH_LIMIT": REPORT_CRAWL_DEPTH,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_TARGET_CONCURRENCY": REPORT_CRAWL_AUTOTHROTTLE_TARGET,
+        "HTTPCACHE_ENABLED": True,
+        "HTTPCACHE_DIR": str(Path(REPORT_CRAWL_HTTPCACHE_DIR).resolve()),
+        "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.RFC2616Policy",
+        "JOBDIR": job_dir,
+        "DOWNLOAD_MAXSIZE": REPORT_MAX_BYTES,
+        "ITEM_PIPELINES": {f"{__name__}.ReportCachePipeline": 100},
+        "LOG_LEVEL": "INFO",
+    }
+
+
+def crawl_reports(companies: List[Dict], job_dir: str = REPORT_CRAWL_JOB_DIR) -> Dict:
+    """
+    Crawls reports for the given companies and blocks until done. Returns the crawl stats.
+    An interrupted crawl leaves its state in `job_dir` and the next call resumes it;
+    a finished crawl removes it so the next call starts afresh.
+    Twisted's reactor cannot be restarted, so call this at most once per process.
+    """
+    process = CrawlerProcess(crawl_settings(job_dir))
+    crawler = process.create_crawler(ReportSpider)
+    process.crawl(crawler, companies=companies)
+    process.start()
+    stats = crawler.stats.get_stats()
+    if stats.get("finish_reason") == "finished":
+        shutil.rmtree(job_dir, ignore_errors=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl IR pages for annual and sustainability report PDFs.")
+    parser.add_argument("--companies-file", default=str(COMPANIES_FILE))
+    parser.add_argument("--tickers", nargs="+", default=None, help="Only crawl these tickers")
+    parser.add_argument("--job-dir", default=REPORT_CRAWL_JOB_DIR, help="Crawl state directory (resume by reusing it)")
+    args = parser.parse_args()
+
+    with open(args.companies_file, "r") as f:
+        companies = [c for c in json.load(f) if c.get("ticker")]
+    if args.tickers:
+        companies = [c for c in companies if c["ticker"] in args.tickers]
+
+    missing = [c["ticker"] for c in companies if not c.get("ir_url")]
+    if missing:
+        print(f"Skipping {len(missing)} companies without an 'ir_url' in {args.companies_file}: {', '.join(missing)}")
+    seeds = len(companies) - len(missing)
+    if not seeds:
+        print("No company has an 'ir_url' to crawl from. Add investor-relations URLs to the companies file.")
+        sys.exit(1)
+
+    stats = crawl_reports(companies, args.job_dir)
+    print(f"Crawl finished: {stats.get('item_scraped_count', 0)} reports stored, "
+          f"{stats.get('downloader/request_count', 0)} requests, "
+          f"{stats.get('httpcache/hit', 0)} HTTP cache hits, reason: {stats.get('finish_reason')}")
+    if stats.get("reports/seed_failed", 0) >= seeds:
+        print("None of the seed pages could be crawled (see the errors above).")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
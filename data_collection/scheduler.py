@@ -1,14 +1,31 @@
+import os
+
+if __name__ == '__main__':
+    # Run standalone, the scheduler is an ingestion worker: bounded connection pool
+    os.environ.setdefault("DB_ROLE", "worker")
+
 from apscheduler.schedulers.background import BackgroundScheduler
-from data_collection.scrapers.news_scraper import get_news_for_company
-from data_collection.utils import save_articles_to_json
-from backend.services.scoring_service import calculate_dynamic_esg_score
-from database.database import SessionLocal
-from database.models import ESGScore, Company
+from data_collection.pipeline import run_collection_cycle, run_feed_cycle, aggregate_stage
+from data_collection.article_store import get_article_store
+from data_collection.dispatcher import SchedulerLock, ShardDispatcher, recent_velocity
+from config.settings import (
+    NLP_CACHE_ENABLED, NLP_WORKERS, SCHEDULER_TICK_SECONDS, FEED_URLS, FEED_POLL_MINUTES, REPORT_CRAWL_INTERVAL_HOURS
+)
+from nlp_engine.cache import get_analysis_cache
+import argparse
 import json
+import subprocess
+import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Held for the life of the process once the scheduler starts
+_scheduler_lock = None
+_dispatcher = None
+
 def get_companies():
     """
     Gets companies from the companies.json file.
@@ -29,9 +46,12 @@ def get_company_names():
     companies = get_companies()
     return [c["name"] for c in companies]
 
-def update_esg_scores():
+def update_esg_scores(tier=None):
     """
-    Updates ESG scores for all companies using NLP analysis.
+    Rescores every company with new inputs in the article store (new articles or a
+    new report since its last score) through the pipeline's aggregate stage, without
+    fetching anything. A company whose scores cannot be computed is skipped and the
+    others are still stored. `tier` is unused: stored inputs are already analyzed.
     """
     print("Starting ESG score update cycle...")
     companies = get_companies()
@@ -41,71 +61,129 @@ def update_esg_scores():
         print("No companies found. Skipping score update.")
         return
 
-    db = SessionLocal()
     try:
-        for company_data in companies:
-            company_id = company_data["id"]
-            ticker = company_data["ticker"]
-            name = company_data["name"]
-
-            print(f"Calculating NLP-based ESG scores for: {name} ({ticker})")
-            scores = calculate_dynamic_esg_score(ticker, name)
-
-            if scores:
-                # Create new ESG score record
-                esg_score = ESGScore(
-                    company_id=company_id,
-                    environmental_score=scores["environmental_score"],
-                    social_score=scores["social_score"],
-                    governance_score=scores["governance_score"],
-                    total_score=scores["total_score"],
-                    rating_date=scores["rating_date"],
-                    source=scores["source"]
-                )
-                db.add(esg_score)
-                print(f"Updated scores for {name}: E={scores['environmental_score']}, S={scores['social_score']}, G={scores['governance_score']}, Total={scores['total_score']}")
-            else:
-                print(f"Could not calculate scores for {name}")
-
-        db.commit()
-        print("ESG score update cycle completed.")
+        scores = aggregate_stage(companies)
+        print(f"ESG score update cycle completed: {len(scores)} companies rescored.")
     except Exception as e:
         print(f"Error updating ESG scores: {e}")
-        db.rollback()
-    finally:
-        db.close()
 
-def fetch_and_store_news():
+def fetch_and_store_news(tier=None):
     """
-    Fetches news for all companies and stores the articles in news.json.
-    Also updates ESG scores based on new data.
+    Fetches news for all companies, stores the articles in the article store and
+    updates ESG scores, as one staged pipeline (fetch -> analyze -> persist -> aggregate).
+    News and reports are fetched and analyzed once per cycle.
+    `tier` selects the sentiment model tier for this job (defaults to NLP_DEFAULT_TIER).
     """
     print("Starting news fetch and score update cycle...")
-    company_names = get_company_names()
-    print(f"Found {len(company_names)} companies to process: {company_names}")
-    if not company_names:
+    companies = get_companies()
+    print(f"Found {len(companies)} companies to process: {[c['name'] for c in companies]}")
+    if not companies:
         print("No companies found. Skipping news fetch.")
         return
 
-    for company_name in company_names:
-        print(f"Fetching news for: {company_name}")
-        articles = get_news_for_company(company_name)
-        print(f"Found {len(articles)} articles for {company_name}.")
-        if articles:
-            save_articles_to_json(articles, company_name)
-
-    # Update ESG scores after fetching news
-    update_esg_scores()
+    try:
+        run_collection_cycle(companies, tier=tier)
+    except Exception as e:
+        # Completed stages are checkpointed; the next run this hour resumes from there
+        print(f"Collection cycle failed: {e}")
+    if NLP_CACHE_ENABLED and not NLP_WORKERS:
+        # With a worker pool the cache is read in the workers, so local stats would be empty
+        print(f"NLP cache stats: {get_analysis_cache().stats()}")
     print("Finished news fetch and score update cycle.")
 
-def start_scheduler():
+def ingest_feeds(tier=None):
+    """
+    Polls the configured RSS/Atom feeds once for all companies and analyzes, stores
+    and rescores the companies their new entries mention.
+    """
+    companies = get_companies()
+    if not companies or not FEED_URLS:
+        return
+    try:
+        scores = run_feed_cycle(companies, tier=tier)
+        print(f"Feed cycle finished: {len(scores or {})} companies rescored.")
+    except Exception as e:
+        # Feed checkpoints were not advanced, so the entries are picked up on the next poll
+        print(f"Feed cycle failed: {e}")
+
+def crawl_reports():
+    """
+    Crawls IR pages for report PDFs across all companies and stores them in the report cache.
+    Runs in a subprocess because Scrapy's reactor cannot be restarted within a process.
+    """
+    print("Starting report crawl...")
+    result = subprocess.run([sys.executable, "-m", "data_collection.report_crawler"], cwd=DATA_DIR.parent)
+    if result.returncode != 0:
+        # The crawl state is kept, so the next run resumes it
+        print(f"Report crawl failed with exit code {result.returncode}.")
+
+def compact_article_store():
+    """
+    Drops stored articles past the retention window and reclaims their space.
+    """
+    try:
+        deleted = get_article_store().compact()
+        print(f"Article store compacted: {deleted} expired articles removed.")
+    except Exception as e:
+        print(f"Error compacting article store: {e}")
+
+def run_shard(cycle_id, companies, tier=None):
+    """
+    Collects and scores one shard of companies as its own pipeline run.
+    """
+    run_collection_cycle(companies, tier=tier, cycle_id=cycle_id)
+
+def start_scheduler(tier=None):
     """
-    Starts the scheduler to fetch news every hour.
+    Starts the scheduler. Each company shard is collected as its own job, most stale
+    and newsworthy shards first, within the SCHEDULER_MAX_WORKERS budget.
+    Returns the scheduler, or None if another process already runs one.
     """
+    global _scheduler_lock, _dispatcher
+    lock = SchedulerLock()
+    if not lock.acquire():
+        print(f"Another scheduler holds {lock.path}. Not starting a second one.")
+        return None
+
+    store = get_article_store()
+    _scheduler_lock = lock
+    _dispatcher = dispatcher = ShardDispatcher(
+        run_shard=lambda cycle_id, companies: run_shard(cycle_id, companies, tier=tier),
+        load_companies=get_companies,
+        news_velocity=lambda names: recent_velocity(store, names),
+    )
+
     scheduler = BackgroundScheduler()
-    # Run the job once on startup
-    scheduler.add_job(fetch_and_store_news, 'date')
-    # Then run it every hour
-    scheduler.add_job(fetch_and_store_news, 'interval', hours=1)
+    # Dispatch due shards on startup and then every tick; never overlap ticks, and
+    # collapse missed ticks into one
+    scheduler.add_job(dispatcher.tick, 'interval', seconds=SCHEDULER_TICK_SECONDS,
+                      next_run_time=datetime.now(), max_instances=1, coalesce=True)
+    # One poll of the RSS/Atom feeds covers every company
+    if FEED_URLS:
+        scheduler.add_job(lambda: ingest_feeds(tier), 'interval', minutes=FEED_POLL_MINUTES,
+                          next_run_time=datetime.now(), max_instances=1, coalesce=True)
+    if REPORT_CRAWL_INTERVAL_HOURS > 0:
+        scheduler.add_job(crawl_reports, 'interval', hours=REPORT_CRAWL_INTERVAL_HOURS, max_instances=1, coalesce=True)
+    # Compact the article store once a day in the background
+    scheduler.add_job(compact_article_store, 'interval', days=1, max_instances=1, coalesce=True)
     scheduler.start()
-    print("Scheduler started. News will be fetched on startup and then every hour.")
\ No newline at end of file
+    print(f"Scheduler started. Due company shards are dispatched every {SCHEDULER_TICK_SECONDS}s.")
+    return scheduler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the collection scheduler in the foreground.")
+    parser.add_argument("--tier", default=None, help="Sentiment model tier (defaults to NLP_DEFAULT_TIER)")
+    args = parser.parse_args()
+
+    scheduler = start_scheduler(tier=args.tier)
+    if scheduler is None:
+        sys.exit(1)
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        scheduler.shutdown()
+        print("Scheduler stopped.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import feedparser
+
+from config.settings import FEED_URLS, NEWS_FETCH_WORKERS
+from data_collection.checkpoints import article_id
+from data_collection.company_matcher import CompanyMatcher
+from data_collection.http_client import get_http_client
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+SPACE_PATTERN = re.compile(r"\s+")
+
+def strip_html(text):
+    """Removes markup from a feed summary and collapses whitespace."""
+    return SPACE_PATTERN.sub(" ", TAG_PATTERN.sub(" ", text or "")).strip()
+
+def fetch_feed(feed_url, etag=None, last_modified=None):
+    """
+    Conditionally downloads an RSS/Atom feed over the shared HTTP client.
+    Returns (parsed feed or None if not modified, etag, last_modified).
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    response = get_http_client().get(feed_url, headers=headers)
+    if response.status_code == 304:
+        return None, etag, last_modified
+    response.raise_for_status()
+    parsed = feedparser.parse(response.content)
+    return parsed, response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+def iter_feed_articles(feed_url, parsed):
+    """
+    Yields (entry id, article) for each entry of a parsed feed, as NewsAPI-shaped
+    article dicts so they go through the same NLP and storage path.
+    """
+    feed_title = parsed.feed.get("title") or urlparse(feed_url).netloc
+    for entry in parsed.entries:
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        article = {
+            "source": {"id": None, "name": feed_title},
+            "title": strip_html(entry.get("title")),
+            "description": strip_html(entry.get("summary")),
+            "url": entry.get("link"),
+            # feedparser normalizes dates to UTC struct_time
+            "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", published) if published else None,
+        }
+        yield entry.get("id") or article_id(article), article
+
+def fetch_feed_articles(companies, feed_urls=FEED_URLS, checkpoints=None, max_workers=NEWS_FETCH_WORKERS):
+    """
+    Polls every feed once (concurrently, with conditional GETs) and matches new
+    entries to companies by name or ticker, so one poll covers all companies.
+
+    Returns {"articles": {company name: [articles]}, "feeds": {feed url: poll}}
+    where each poll holds the 'etag', 'last_modified' and new 'entry_ids' to pass
+    to checkpoints.advance() once the articles are stored, and 'matches'
+    ({entry id: [company names]}) to tell which entries' articles that takes.
+    With `checkpoints` (a FeedCheckpoints), validators are sent and already-seen
+    entries skipped.
+    """
+    matcher = CompanyMatcher(companies)
+
+    def poll(feed_url):
+        etag, last_modified = checkpoints.validators(feed_url) if checkpoints else (None, None)
+        seen = checkpoints.seen_ids(feed_url) if checkpoints else set()
+        try:
+            parsed, etag, last_modified = fetch_feed(feed_url, etag, last_modified)
+        except Exception as e:
+            print(f"Error fetching feed {feed_url}: {e}")
+            return feed_url, None, []
+        if parsed is None:
+            return feed_url, {"etag": etag, "last_modified": last_modified, "entry_ids": [], "matches": {}}, []
+        if parsed.bozo and not parsed.entries:
+            print(f"Error parsing feed {feed_url}: {parsed.get('bozo_exception')}")
+            return feed_url, None, []
+
+        entry_ids, matches, entry_matches = [], [], {}
+        for entry_id, article in iter_feed_articles(feed_url, parsed):
+            if entry_id in seen:
+                continue
+            entry_ids.append(entry_id)
+            for company_name in matcher.match(f"{article['title']} {article['description']}"):
+                matches.append((company_name, article))
+                entry_matches.setdefault(entry_id, []).append(company_name)
+        polled = {"etag": etag, "last_modified": last_modified, "entry_ids": entry_ids, "matches": entry_matches}
+        return feed_url, polled, matches
+
+    articles, feeds = {}, {}
+    if not feed_urls:
+        return {"articles": articles, "feeds": feeds}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feed_urls)))) as executor:
+        for feed_url, polled, matches in executor.map(poll, feed_urls):
+            # Failed polls are left out, so their state is not advanced and they are retried
+            if polled is not None:
+                feeds[feed_url] = polled
+            for company_name, article in matches:
+                articles.setdefault(company_name, []).append(article)
+            if polled is not None:
+                print(f"Polled feed {feed_url}: {len(polled['entry_ids'])} new entries, {len(matches)} company matches.")
+    return {"articles": articles, "feeds": feeds}
@@ -1,59 +1,140 @@
 import requests
-from config.settings import NEWS_API_KEY
-from nlp_engine.analysis import analyze_sentiment, extract_esg_entities, detect_controversy, calculate_esg_score_from_nlp
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    NEWS_API_KEY, NEWS_API_URL, NEWS_FETCH_WORKERS, DEDUP_ENABLED,
+    NEWS_API_PAGE_SIZE, NEWS_API_MAX_PAGES
+)
+from data_collection.dedup import collapse_near_duplicates
+from data_collection.http_client import get_http_client
+from nlp_engine.worker_pool import analyze_texts
 
-def get_news_for_company(company_name):
+def fetch_news_range(company_name, since=None, until=None, max_pages=NEWS_API_MAX_PAGES):
     """
-    Fetches news articles for a given company using the NewsAPI.org service.
-    Analyzes each article with NLP and computes ESG scores.
+    Fetches raw news articles for a given company from the NewsAPI.org service.
+    Uses the shared pooled HTTP client (keep-alive, rate limiting, retries).
+
+    With `since` (ISO 8601 publishedAt), only articles published from then on (and,
+    with `until`, up to then) are requested, newest first, paginating until caught up
+    or `max_pages` is reached. Without it, only the newest page is fetched.
+
+    Returns (articles, complete). complete is False when pagination stopped before
+    reaching `since` (page cap or a request error), i.e. older matching articles
+    were not read.
     """
     if not NEWS_API_KEY or NEWS_API_KEY == "[Your Key Here]":
         print("Warning: NewsAPI key is not configured. Skipping news fetch.")
-        return []
+        return [], False
 
-    url = "https://newsapi.org/v2/everything"
     params = {
         "q": company_name,
         "apiKey": NEWS_API_KEY,
         "language": "en",
         "sortBy": "publishedAt",
-        "pageSize": 20,
+        "pageSize": NEWS_API_PAGE_SIZE,
     }
+    if since:
+        params["from"] = since
+        if until:
+            params["to"] = until
+    pages = max(1, max_pages) if since else 1
 
+    articles = []
+    complete = False
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        articles = data.get("articles", [])
-
-        # Analyze each article with NLP
-        analyzed_articles = []
-        for article in articles:
-            title = article.get('title', '')
-            description = article.get('description', '') or ''
-            content = title + ' ' + description  # Combine title and description for analysis
-
-            # Perform NLP analysis
-            sentiment = analyze_sentiment(content)
-            entities = extract_esg_entities(content)
-            controversies = detect_controversy(content)
-            scores = calculate_esg_score_from_nlp(sentiment, entities, controversies)
-
-            # Add analysis results to article
-            analyzed_article = article.copy()
-            analyzed_article['nlp_analysis'] = {
-                'sentiment': sentiment,
-                'entities': entities,
-                'controversies': controversies,
-                'scores': scores
-            }
-            analyzed_articles.append(analyzed_article)
-
-        return analyzed_articles
-
+        for page in range(1, pages + 1):
+            response = get_http_client().get(NEWS_API_URL, params={**params, "page": page})
+            response.raise_for_status()
+            data = response.json()
+            page_articles = data.get("articles", [])
+            articles.extend(page_articles)
+            # Caught up: short page or everything matching the query has been read
+            if len(page_articles) < NEWS_API_PAGE_SIZE or len(articles) >= data.get("totalResults", 0):
+                complete = True
+                break
+        else:
+            if since:
+                print(f"Warning: {company_name} has more than {pages} pages of new articles; the older ones are fetched next cycle (raise NEWS_API_MAX_PAGES).")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching news for {company_name}: {e}")
+
+    # A first fetch (no since) deliberately only reads the newest page
+    return articles, complete or not since
+
+def fetch_news_articles(company_name, since=None, max_pages=NEWS_API_MAX_PAGES):
+    """Fetches raw news articles for a company (see fetch_news_range), without the completeness flag."""
+    return fetch_news_range(company_name, since, max_pages=max_pages)[0]
+
+def fetch_news_for_companies(company_names, max_workers=NEWS_FETCH_WORKERS):
+    """
+    Fetches raw news for many companies concurrently over the shared connection pool.
+    Returns a dict mapping company name to its list of articles.
+    """
+    if not company_names:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(company_names)))) as executor:
+        results = executor.map(fetch_news_articles, company_names)
+        return dict(zip(company_names, results))
+
+def fetch_new_news_for_companies(company_names, checkpoints, max_workers=NEWS_FETCH_WORKERS,
+                                 max_pages=NEWS_API_MAX_PAGES):
+    """
+    Fetches each company's news from its ingestion checkpoint (an IngestionCheckpoints),
+    concurrently, and drops already-seen articles. Returns a dict mapping company name
+    to {"articles", "complete", "oldest_read"}: pass the last two to checkpoints.advance()
+    with the articles once they are persisted. The checkpoints are not advanced here.
+    """
+    if not company_names:
+        return {}
+
+    def fetch(company_name):
+        since, until = checkpoints.fetch_window(company_name)
+        articles, complete = fetch_news_range(company_name, since, until, max_pages)
+        published = [a["publishedAt"] for a in articles if a.get("publishedAt")]
+        return {
+            "articles": checkpoints.filter_new(company_name, articles),
+            "complete": complete,
+            "oldest_read": min(published) if published else None,
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(company_names)))) as executor:
+        results = executor.map(fetch, company_names)
+        return dict(zip(company_names, results))
+
+def analyze_articles(articles, tier=None, timeout=None):
+    """
+    Analyzes raw articles with NLP and computes ESG scores.
+    Near-duplicate (syndicated) copies are collapsed first so each story is scored once.
+    `timeout` limits the NLP worker pool call (see analyze_texts).
+    """
+    # Collapse syndicated copies so each story is analyzed and scored once
+    if DEDUP_ENABLED:
+        articles = collapse_near_duplicates(articles)
+
+    # Combine title and description for analysis
+    contents = [
+        (article.get('title', '') or '') + ' ' + (article.get('description', '') or '')
+        for article in articles
+    ]
+
+    # Analyze all articles in one submission (worker pool when enabled; NLP cache skips seen articles)
+    analyzed_articles = []
+    for article, analysis in zip(articles, analyze_texts(contents, tier=tier, timeout=timeout)):
+        analyzed_article = article.copy()
+        analyzed_article['nlp_analysis'] = analysis
+        analyzed_articles.append(analyzed_article)
+
+    return analyzed_articles
+
+def get_news_for_company(company_name, tier=None):
+    """
+    Fetches news articles for a given company using the NewsAPI.org service.
+    Analyzes each article with NLP (using the given sentiment tier) and computes ESG scores.
+    """
+    articles = fetch_news_articles(company_name)
+    if not articles:
         return []
+    return analyze_articles(articles, tier=tier)
 
 if __name__ == '__main__':
     # Example usage:
@@ -65,4 +146,4 @@ if __name__ == '__main__':
         for i, article in enumerate(articles, 1):
             print(f"{i}. {article['title']}")
     else:
-        print(f"Could not retrieve news for {company}.")
\ No newline at end of file
+        print(f"Could not retrieve news for {company}.")
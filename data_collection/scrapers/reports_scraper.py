@@ -1,30 +1,69 @@
-import requests
-import pdfplumber
 from bs4 import BeautifulSoup
+import hashlib
 import re
-from config.settings import USER_AGENT
-from nlp_engine.analysis import extract_esg_entities, classify_esg_category, detect_controversy, analyze_sentiment, calculate_esg_score_from_nlp
+import tempfile
+from config.settings import REPORT_MAX_BYTES, REPORT_SPOOL_MAX_MEMORY, REPORT_SEARCH_URL
+from data_collection.http_client import get_http_client
+from data_collection.pdf_extraction import extract_pdf_text
+from data_collection.report_cache import get_report_cache
+from nlp_engine.worker_pool import analyze_documents
 
-def download_pdf(url, filename):
+def download_report(url, etag=None, last_modified=None, max_bytes=REPORT_MAX_BYTES):
     """
-    Downloads a PDF from the given URL and saves it to the specified filename.
+    Conditionally downloads a PDF. Sends If-None-Match / If-Modified-Since when
+    validators are given; a 304 returns {'not_modified': True}.
+
+    Otherwise the body is streamed into a spooled buffer (in memory up to
+    REPORT_SPOOL_MAX_MEMORY bytes, then an anonymous file; nothing is written to
+    the working directory) while its SHA-256 is computed, and the result holds
+    'pdf', 'content_hash', 'etag' and 'last_modified'.
+    Raises ValueError for downloads over `max_bytes`.
     """
-    headers = {'User-Agent': USER_AGENT}
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    with open(filename, 'wb') as f:
-        f.write(response.content)
-    return filename
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    response = get_http_client().get(url, headers=headers, stream=True)
+    try:
+        if response.status_code == 304:
+            return {"not_modified": True}
+        response.raise_for_status()
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_MEMORY)
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                buffer.close()
+                raise ValueError(f"Report at {url} exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            buffer.write(chunk)
+        buffer.seek(0)
+        return {
+            "not_modified": False,
+            "pdf": buffer,
+            "content_hash": digest.hexdigest(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+    finally:
+        response.close()
 
-def extract_text_from_pdf(pdf_path):
+def extract_text_from_pdf(pdf):
     """
-    Extracts text from a PDF file using pdfplumber.
+    Extracts text from a PDF path or binary buffer, page-parallel, with the page cap
+    and timeout from settings. Pages without a text layer contribute empty text.
+    Returns (text, complete); complete is False if the cap or timeout truncated it.
+    A buffer is closed afterwards.
     """
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text
+    try:
+        return extract_pdf_text(pdf)
+    finally:
+        if hasattr(pdf, "close"):
+            pdf.close()
 
 def find_annual_report_url(company_ticker):
     """
@@ -34,9 +73,7 @@ def find_annual_report_url(company_ticker):
     """
     # Example for EDGAR: https://www.sec.gov/edgar/searchedgar/companies.htm
     # But for simplicity, search for company investor page
-    search_url = f"https://www.google.com/search?q={company_ticker}+annual+report+pdf"
-    headers = {'User-Agent': USER_AGENT}
-    response = requests.get(search_url, headers=headers)
+    response = get_http_client().get(REPORT_SEARCH_URL, params={"q": f"{company_ticker} annual report pdf"})
     soup = BeautifulSoup(response.text, 'html.parser')
     # Find first PDF link
     for link in soup.find_all('a', href=True):
@@ -44,42 +81,34 @@ def find_annual_report_url(company_ticker):
             return link['href']
     return None
 
-def scrape_esg_reports(company_ticker):
+def scrape_esg_reports(company_ticker, tier=None):
     """
     Main function to scrape ESG reports for a company.
-    Downloads the annual report, extracts text, and analyzes ESG information.
+    Downloads the annual report, extracts text, and analyzes ESG information
+    using the given sentiment tier (NLP_DEFAULT_TIER if None). The report URL,
+    PDF, text and analysis are cached; unchanged reports are not re-analyzed.
     Returns a dictionary with extracted text and analysis results.
     """
-    report_url = find_annual_report_url(company_ticker)
-    if not report_url:
-        print(f"Could not find annual report for {company_ticker}")
-        return None
-
-    pdf_filename = f"temp_{company_ticker}_report.pdf"
+    cache = get_report_cache()
     try:
-        download_pdf(report_url, pdf_filename)
-        text = extract_text_from_pdf(pdf_filename)
-        # Clean up
-        import os
-        os.remove(pdf_filename)
+        report_url = cache.resolve_url(company_ticker, find_annual_report_url)
+        if not report_url:
+            print(f"Could not find annual report for {company_ticker}")
+            return None
 
-        # Analyze the text
-        entities = extract_esg_entities(text)
-        sentiment = analyze_sentiment(text)  # Overall sentiment, but better to analyze sections
-        controversies = detect_controversy(text)
-        category = classify_esg_category(text)
+        # Conditional download; unchanged reports are served from the report cache
+        content_hash, pdf = cache.fetch(report_url, download_report)
+        text, complete = cache.get_text(content_hash, extract_text_from_pdf, pdf)
 
-        # Calculate ESG scores based on NLP analysis
-        scores = calculate_esg_score_from_nlp(sentiment, entities, controversies)
+        analysis = cache.get_analysis(content_hash, tier)
+        if analysis is None:
+            # Analyze the text (on the NLP worker pool when enabled) and score it.
+            # Sentiment is sentence-level; with prefiltering only ESG-relevant sentences reach FinBERT.
+            analysis = analyze_documents([text], tier=tier)[0]
+            if complete:
+                cache.set_analysis(content_hash, analysis, tier)
 
-        return {
-            "text": text,
-            "entities": entities,
-            "sentiment": sentiment,
-            "controversies": controversies,
-            "primary_category": category,
-            "scores": scores
-        }
+        return {"text": text, "url": report_url, "content_hash": content_hash, **analysis}
     except Exception as e:
         print(f"Error scraping report for {company_ticker}: {e}")
         return None
@@ -92,6 +121,8 @@ if __name__ == '__main__':
         print("Extracted text length:", len(result['text']))
         print("Entities:", result['entities'])
         print("Sentiment:", result['sentiment'])
+        if result['sentiment'] and 'prefilter' in result['sentiment']:
+            print("Prefilter skipped ratio:", result['sentiment']['prefilter']['skipped_ratio'])
         print("Controversies:", result['controversies'])
         print("Primary Category:", result['primary_category'])
     else:
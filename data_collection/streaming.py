@@ -0,0 +1,194 @@
+"""
+Streaming Stage Pipeline
+Bounded producer/consumer pipeline for the collection path.
+
+Each stage runs its function on its own pool of worker threads and hands
+results to the next stage through a bounded queue. When a downstream stage
+(typically NLP) falls behind, its input queue fills up, upstream workers block
+on put(), and eventually submit() blocks the producer: memory stays bounded
+by the queue sizes instead of growing with the backlog.
+
+close() lets every item already submitted drain through all stages before the
+workers exit; abort() drops queued items but still lets in-flight calls finish.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import PIPELINE_QUEUE_SIZE
+
+# Marks the end of the stream on a stage's input queue
+_END = object()
+
+
+class Stage:
+    """
+    One pipeline stage.
+
+    Args:
+        name: stage name used in metrics
+        func: callable(item) -> result. None drops the item; with fan_out the
+              result is an iterable whose elements are forwarded one by one
+        workers: number of threads running func
+        queue_size: capacity of this stage's input queue
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                 queue_size: int = PIPELINE_QUEUE_SIZE, fan_out: bool = False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self.fan_out = fan_out
+
+        self.processed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+        self.in_flight = 0
+        self._active_workers = 0
+        self._lock = threading.Lock()
+
+
+class StreamingPipeline:
+    """
+    Runs items through a chain of stages with per-stage concurrency and bounded queues.
+    Results of the last stage are passed to `sink` (called from worker threads) or,
+    without a sink, collected and returned by join().
+    """
+
+    def __init__(self, stages: List[Stage], sink: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.sink = sink
+        self.on_error = on_error
+        self.results: List[Any] = []
+        self._results_lock = threading.Lock()
+        self._aborted = threading.Event()
+        self._closed = False
+        self._started_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+        self._threads: List[threading.Thread] = []
+
+        for index, stage in enumerate(stages):
+            stage._active_workers = stage.workers
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, item: Any, timeout: Optional[float] = None):
+        """Feeds an item into the first stage, blocking while its queue is full (backpressure)."""
+        if self._closed:
+            raise RuntimeError("Pipeline is closed")
+        self.stages[0].queue.put(item, timeout=timeout)
+
+    def close(self):
+        """Signals the end of input; submitted items still drain through every stage."""
+        if self._closed:
+            return
+        self._closed = True
+        first = self.stages[0]
+        for _ in range(first.workers):
+            first.queue.put(_END)
+
+    def abort(self):
+        """Stops taking queued items. Calls already running finish, nothing new starts."""
+        self._aborted.set()
+        self.close()
+
+    def join(self, timeout: Optional[float] = None) -> List[Any]:
+        """Waits for all stages to drain and returns the collected results (when no sink is set)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._finished_at is None and not any(t.is_alive() for t in self._threads):
+            self._finished_at = time.perf_counter()
+        return self.results
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Submits every item, closes the pipeline and waits for it to drain."""
+        try:
+            for item in items:
+                self.submit(item)
+        finally:
+            self.close()
+        return self.join()
+
+    def _emit(self, index: int, result: Any):
+        if index + 1 < len(self.stages):
+            self.stages[index + 1].queue.put(result)
+        elif self.sink is not None:
+            self.sink(result)
+        else:
+            with self._results_lock:
+                self.results.append(result)
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        while True:
+            item = stage.queue.get()
+            if item is _END:
+                break
+            if self._aborted.is_set():
+                with stage._lock:
+                    stage.dropped += 1
+                continue
+
+            with stage._lock:
+                stage.in_flight += 1
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+                outputs = list(result) if stage.fan_out and result is not None else [result]
+                for output in outputs:
+                    if output is None:
+                        with stage._lock:
+                            stage.dropped += 1
+                    else:
+                        self._emit(index, output)
+                with stage._lock:
+                    stage.processed += 1
+            except Exception as e:
+                with stage._lock:
+                    stage.errors += 1
+                if self.on_error is not None:
+                    self.on_error(stage.name, item, e)
+                else:
+                    print(f"Error in pipeline stage '{stage.name}': {e}")
+            finally:
+                with stage._lock:
+                    stage.in_flight -= 1
+                    stage.busy_seconds += time.perf_counter() - start
+
+        # The last worker of a stage to finish passes the end of stream downstream
+        with stage._lock:
+            stage._active_workers -= 1
+            last_worker = stage._active_workers == 0
+        if last_worker and index + 1 < len(self.stages):
+            downstream = self.stages[index + 1]
+            for _ in range(downstream.workers):
+                downstream.queue.put(_END)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-stage counters, throughput (items/sec since start), utilization and current queue depth."""
+        elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        report = {}
+        for stage in self.stages:
+            with stage._lock:
+                report[stage.name] = {
+                    "workers": stage.workers,
+                    "processed": stage.processed,
+                    "errors": stage.errors,
+                    "dropped": stage.dropped,
+                    "in_flight": stage.in_flight,
+                    "queue_depth": stage.queue.qsize(),
+                    "queue_size": stage.queue.maxsize,
+                    "throughput_per_sec": round(stage.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                    "utilization": round(stage.busy_seconds / (elapsed * stage.workers), 4) if elapsed > 0 else 0.0,
+                }
+        return report
@@ -0,0 +1,78 @@
+"""
+Async Database Access
+An AsyncEngine and session factory for the FastAPI backend, so DB-backed
+endpoints await their queries instead of blocking the event loop. It uses the
+same database and engine profile (role pools, SQLite pragmas) as
+database.database, with the aiosqlite driver for SQLite and asyncpg for
+PostgreSQL.
+
+The engine is created on first use, so processes that never touch it (the
+scheduler, scripts) do not need the async drivers installed.
+"""
+
+import threading
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from config.settings import SQLALCHEMY_DATABASE_URL, SQLALCHEMY_ASYNC_DATABASE_URL, DB_ROLE, DB_SQLITE_TUNED
+from database.database import install_sqlite_pragmas, pool_options
+
+# Sync driver prefixes and their async counterparts
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str = SQLALCHEMY_DATABASE_URL) -> str:
+    """The async-driver form of a database URL (already-async URLs are returned unchanged)."""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        raise ValueError(f"Not a database URL: {url!r}")
+    if scheme in ASYNC_DRIVERS.values():
+        return url
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {scheme!r}; set SQLALCHEMY_ASYNC_DATABASE_URL")
+    return f"{ASYNC_DRIVERS[scheme]}://{rest}"
+
+
+def make_async_engine(url: Optional[str] = None, role: str = DB_ROLE, tuned: bool = DB_SQLITE_TUNED) -> AsyncEngine:
+    """Creates an AsyncEngine with the pool for `role` and, for SQLite, the tuned pragmas."""
+    url = url or SQLALCHEMY_ASYNC_DATABASE_URL or async_database_url()
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_pre_ping=True, **pool_options(url, role, asyncio=True))
+
+    engine = create_async_engine(url, **pool_options(url, role, asyncio=True))
+    if tuned:
+        install_sqlite_pragmas(engine.sync_engine)
+    return engine
+
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Process-wide async engine."""
+    global _engine, _sessionmaker
+    with _lock:
+        if _engine is None:
+            _engine = make_async_engine()
+            _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+        return _engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    get_async_engine()
+    return _sessionmaker
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency yielding an AsyncSession that is closed after the request."""
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,295 @@
+"""
+SQLite Concurrency Benchmark
+Measures read latency in N reader processes while one writer process ingests
+ESG scores, for the plain engine ("default") and the tuned profile ("tuned":
+WAL, synchronous=NORMAL, busy_timeout, page cache and mmap). Both profiles use
+the same pools (readers as "api", the writer as "worker"), so only the pragmas
+differ. Each profile runs against a fresh temporary database.
+
+With --mode async it instead compares the API's access paths under concurrent
+requests on one event loop: the sync repository called inline (blocking the
+loop), the sync repository in a thread pool, and the async repository. Besides
+throughput and latency it reports event loop lag, i.e. how long other requests
+would have been stalled.
+
+Usage:
+    python -m database.benchmark --readers 4 --seconds 10
+    python -m database.benchmark --profiles tuned --readers 8 --batch-size 200
+    python -m database.benchmark --mode async --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, make_engine
+from database.models import Company, ESGScore
+from database.repository import Repository
+
+ACCESS_PATHS = ("sync", "sync-threadpool", "async")
+
+PROFILES = {"default": False, "tuned": True}
+
+
+def seed_database(url: str, tuned: bool, companies: int, scores_per_company: int = 1):
+    """Creates the tables with `companies` companies and `scores_per_company` scores each."""
+    engine = make_engine(url, role="script", tuned=tuned)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add_all(Company(id=i, name=f"Benchmark Co {i:04d}", ticker=f"BEN{i:04d}") for i in range(1, companies + 1))
+        db.add_all(ESGScore(company_id=i, environmental_score=50, social_score=50, governance_score=50,
+                            total_score=50, rating_date=date.today(), source="Benchmark")
+                   for i in range(1, companies + 1) for _ in range(scores_per_company))
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_reader(url: str, tuned: bool, companies: int, seconds: float, start, results, seed: int):
+    """Reads a random company's latest score in a loop, as the API does, timing each read."""
+    engine = make_engine(url, role="api", tuned=tuned)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        db = Session()
+        began = time.perf_counter()
+        try:
+            db.query(ESGScore).filter(ESGScore.company_id == rng.randint(1, companies)) \
+                .order_by(ESGScore.rating_date.desc(), ESGScore.id.desc()).first()
+            latencies.append((time.perf_counter() - began) * 1000)
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+    engine.dispose()
+    results.put({"role": "reader", "latencies_ms": latencies, "errors": errors})
+
+
+def run_writer(url: str, tuned: bool, companies: int, seconds: float, batch_size: int, start, results, seed: int):
+    """Inserts batches of scores in one transaction each, as score persistence does, timing each commit."""
+    engine = make_engine(url, role="worker", tuned=tuned)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(seed)
+    latencies, errors, rows = [], 0, 0
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        db = Session()
+        began = time.perf_counter()
+        try:
+            db.add_all(ESGScore(company_id=rng.randint(1, companies), environmental_score=rng.uniform(0, 100),
+                                social_score=rng.uniform(0, 100), governance_score=rng.uniform(0, 100),
+                                total_score=rng.uniform(0, 100), rating_date=date.today(), source="Benchmark")
+                       for _ in range(batch_size))
+            db.commit()
+            latencies.append((time.perf_counter() - began) * 1000)
+            rows += batch_size
+        except OperationalError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    engine.dispose()
+    results.put({"role": "writer", "latencies_ms": latencies, "errors": errors, "rows": rows})
+
+
+def run_profile(profile: str, readers: int, seconds: float, companies: int, batch_size: int) -> Dict:
+    """Runs `readers` reader processes and one writer against a fresh database with the given profile."""
+    tuned = PROFILES[profile]
+    data_dir = Path(tempfile.mkdtemp(prefix=f"esg_db_bench_{profile}_"))
+    url = f"sqlite:///{data_dir / 'benchmark.db'}"
+    try:
+        seed_database(url, tuned, companies)
+        context = multiprocessing.get_context("spawn")
+        start, results = context.Event(), context.Queue()
+        processes = [context.Process(target=run_reader, args=(url, tuned, companies, seconds, start, results, i))
+                     for i in range(readers)]
+        processes.append(context.Process(target=run_writer,
+                                         args=(url, tuned, companies, seconds, batch_size, start, results, readers)))
+        for process in processes:
+            process.start()
+        start.set()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    reads = sorted(latency for o in outcomes if o["role"] == "reader" for latency in o["latencies_ms"])
+    writer = next(o for o in outcomes if o["role"] == "writer")
+    commits = sorted(writer["latencies_ms"])
+    return {
+        "profile": profile,
+        "readers": readers,
+        "reads_per_sec": round(len(reads) / seconds, 1),
+        "read_p50_ms": round(percentile(reads, 0.50), 2),
+        "read_p95_ms": round(percentile(reads, 0.95), 2),
+        "read_p99_ms": round(percentile(reads, 0.99), 2),
+        "read_max_ms": round(reads[-1], 2) if reads else 0.0,
+        "read_errors": sum(o["errors"] for o in outcomes if o["role"] == "reader"),
+        "rows_written_per_sec": round(writer["rows"] / seconds, 1),
+        "commit_p50_ms": round(statistics.median(commits), 2) if commits else 0.0,
+        "commit_p95_ms": round(percentile(commits, 0.95), 2),
+        "write_errors": writer["errors"],
+    }
+
+
+async def run_access_path(path: str, url: str, companies: int, requests: int, concurrency: int,
+                          lookup_size: int) -> Dict:
+    """
+    Serves `requests` simulated API requests, `concurrency` at a time, each reading
+    `lookup_size` random companies and their latest scores through one access path.
+    """
+    # The async drivers are only needed for this mode
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from database.async_database import async_database_url, make_async_engine
+    from database.repository import AsyncRepository
+
+    rng = random.Random(0)
+    if path == "async":
+        engine = make_async_engine(async_database_url(url), role="api")
+        async_session = async_sessionmaker(engine)
+    else:
+        engine = make_engine(url, role="api")
+        Session = sessionmaker(bind=engine)
+
+    def sync_request(company_ids):
+        db = Session()
+        try:
+            repository = Repository(db)
+            return repository.list_companies(company_ids), repository.latest_scores(company_ids)
+        finally:
+            db.close()
+
+    async def handle(company_ids):
+        if path == "sync":
+            return sync_request(company_ids)
+        if path == "sync-threadpool":
+            return await asyncio.to_thread(sync_request, company_ids)
+        async with async_session() as db:
+            repository = AsyncRepository(db)
+            return await repository.list_companies(company_ids), await repository.latest_scores(company_ids)
+
+    latencies, lags = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def request():
+        async with semaphore:
+            began = time.perf_counter()
+            await handle([rng.randint(1, companies) for _ in range(lookup_size)])
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    async def monitor_lag(interval: float = 0.01):
+        # How late a 10ms timer fires is how long the loop was blocked for everyone else
+        while not done.is_set():
+            began = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, (time.perf_counter() - began - interval) * 1000))
+
+    monitor = asyncio.create_task(monitor_lag())
+    began = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - began
+    done.set()
+    await monitor
+    if path == "async":
+        await engine.dispose()
+    else:
+        engine.dispose()
+
+    latencies.sort()
+    lags.sort()
+    return {
+        "path": path,
+        "requests_per_sec": round(requests / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2),
+        "loop_lag_p95_ms": round(percentile(lags, 0.95), 2),
+        "loop_lag_max_ms": round(lags[-1], 2) if lags else 0.0,
+    }
+
+
+def run_access_paths(paths: List[str], companies: int, requests: int, concurrency: int, lookup_size: int) -> List[Dict]:
+    """Runs each access path against the same freshly seeded database."""
+    data_dir = Path(tempfile.mkdtemp(prefix="esg_db_bench_async_"))
+    url = f"sqlite:///{data_dir / 'benchmark.db'}"
+    try:
+        seed_database(url, True, companies, scores_per_company=5)
+        return [asyncio.run(run_access_path(path, url, companies, requests, concurrency, lookup_size)) for path in paths]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def print_access_paths(results: List[Dict]):
+    print("\nPath             requests/s  p50 ms  p95 ms  loop lag p95 ms  loop lag max ms")
+    for r in results:
+        print(f"{r['path']:<15}  {r['requests_per_sec']:>10}  {r['latency_p50_ms']:>6}  {r['latency_p95_ms']:>6}"
+              f"  {r['loop_lag_p95_ms']:>15}  {r['loop_lag_max_ms']:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite read latency under concurrent ingestion.")
+    parser.add_argument("--mode", choices=["profiles", "async"], default="profiles",
+                        help="profiles: readers + writer per engine profile; async: API access paths on one event loop")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--paths", nargs="+", choices=ACCESS_PATHS, default=list(ACCESS_PATHS))
+    parser.add_argument("--requests", type=int, default=2000, help="Simulated API requests per access path")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--lookup-size", type=int, default=20, help="Companies read per request")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader processes")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each profile's run")
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100, help="Scores inserted per writer transaction")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.mode == "async":
+        print(f"Running {args.requests} requests per access path, {args.concurrency} concurrent...")
+        results = run_access_paths(args.paths, args.companies, args.requests, args.concurrency, args.lookup_size)
+        print_access_paths(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    results = []
+    for profile in args.profiles:
+        print(f"Running {profile} profile: {args.readers} readers + 1 writer for {args.seconds:.0f}s...")
+        results.append(run_profile(profile, args.readers, args.seconds, args.companies, args.batch_size))
+
+    print("\nProfile   reads/s  p50 ms  p95 ms  p99 ms  max ms  read errors  rows/s  commit p95 ms  write errors")
+    for r in results:
+        print(f"{r['profile']:<8}  {r['reads_per_sec']:>7}  {r['read_p50_ms']:>6}  {r['read_p95_ms']:>6}"
+              f"  {r['read_p99_ms']:>6}  {r['read_max_ms']:>6}  {r['read_errors']:>11}  {r['rows_written_per_sec']:>6}"
+              f"  {r['commit_p95_ms']:>13}  {r['write_errors']:>12}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,28 @@ import os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+if __name__ == '__main__':
+    # One-off script: no connection pooling
+    os.environ.setdefault("DB_ROLE", "script")
 
 from database.database import Base, engine
 from database.models import Company, ESGScore, Portfolio
 
-print("Creating database and tables for SQLite...")
-Base.metadata.create_all(bind=engine)
-print("Database and tables created successfully.")
\ No newline at end of file
+
+def create_all_tables(bind=engine):
+    """
+    Creates missing tables, then any index missing from an existing table:
+    create_all() skips tables that already exist, so indexes added to the
+    models later (e.g. the latest-score index on esg_scores) would never be
+    built on existing databases.
+    """
+    Base.metadata.create_all(bind=bind)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+if __name__ == '__main__':
+    print("Creating database and tables for SQLite...")
+    create_all_tables()
+    print("Database and tables created successfully.")
@@ -1,12 +1,75 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config.settings import SQLALCHEMY_DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from config.settings import (
+    SQLALCHEMY_DATABASE_URL, DB_ROLE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_SQLITE_TUNED,
+    DB_SQLITE_BUSY_TIMEOUT_MS, DB_SQLITE_CACHE_MB, DB_SQLITE_MMAP_MB
+)
+
+ROLES = ("api", "worker", "script")
+
+def sqlite_pragmas():
+    """
+    Per-connection SQLite settings. WAL lets readers run alongside the single writer
+    (the backend workers, scheduler and dashboard all share one file), and with WAL
+    synchronous=NORMAL is still crash-safe, only fsyncing at checkpoints.
+    """
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": DB_SQLITE_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB
+        "cache_size": -DB_SQLITE_CACHE_MB * 1024,
+        "mmap_size": DB_SQLITE_MMAP_MB * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+
+def pool_options(url, role, asyncio=False):
+    """
+    Pool class (and sizing) for a process role:
+      - api: QueuePool, reusing warm connections across request threads
+      - worker: QueuePool without overflow, so write-heavy threads queue for a
+        connection rather than pile onto SQLite's single write lock
+      - script: NullPool, nothing held open after a short-lived or forking process is done
+    In-memory SQLite is one database per connection, so it always shares one (StaticPool).
+    Async engines use the asyncio-aware queue pool.
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown DB_ROLE {role!r}, expected one of {', '.join(ROLES)}")
+    if url.startswith("sqlite") and (url.endswith(":memory:") or url.split("://")[-1] in ("", "/")):
+        return {"poolclass": StaticPool}
+    if role == "script":
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": AsyncAdaptedQueuePool if asyncio else QueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW if role == "api" else 0,
+    }
+
+def install_sqlite_pragmas(sync_engine):
+    """Applies sqlite_pragmas() to every new connection of `sync_engine` (for async engines, its .sync_engine)."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+def make_engine(url=SQLALCHEMY_DATABASE_URL, role=DB_ROLE, tuned=DB_SQLITE_TUNED):
+    """Creates an engine with the pool for `role` and, for SQLite, the tuned pragmas."""
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True, **pool_options(url, role))
+
+    new_engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_options(url, role))
+    if tuned:
+        install_sqlite_pragmas(new_engine)
+    return new_engine
 
 # --- Database Setup (now using SQLite) ---
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
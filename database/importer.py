@@ -0,0 +1,543 @@
+"""
+Bulk Importer
+Streams vendor files of companies or ESG score history into the database (or
+the data/*.json store) in fixed-size chunks, so memory stays flat however
+large the file is.
+
+Each chunk is read (CSV, JSONL or Parquet; .gz for CSV/JSONL), validated row
+by row, resolved against an in-memory company index (ticker / name -> id) and
+bulk-upserted in one transaction:
+  - companies match on ticker, or on name for rows and companies without one
+  - scores match on (company, rating_date, source); later rows win
+
+Rejected rows are counted, sampled in the result and optionally streamed to an
+errors file (JSONL). Progress is reported after every chunk.
+
+The JSON store rewrites data/companies.json / esg_scores.json when the import
+finishes, so it holds those files in memory; use the database for large imports.
+
+Usage:
+    python -m database.importer companies vendor_universe.csv
+    python -m database.importer scores score_history.parquet --chunk-size 10000 --errors-file rejected.jsonl
+    python -m database.importer scores history.jsonl.gz --target json
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import math
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import insert, select
+
+from config.settings import IMPORT_CHUNK_SIZE, IMPORT_ERROR_SAMPLES
+from data_collection.utils import DATA_DIR, write_json_atomic
+from database.models import Company, ESGScore
+
+KINDS = ("companies", "scores")
+FORMATS = ("csv", "jsonl", "parquet")
+TARGETS = ("db", "json")
+SCORE_FIELDS = ("environmental_score", "social_score", "governance_score", "total_score")
+DEFAULT_SOURCE = "Import"
+# Key of the placeholder row yielded for a line that could not be parsed, so it is rejected like any invalid row
+UNPARSABLE = "_unparsable"
+
+Source = Union[str, Path, BinaryIO]
+
+
+# --- Reading ---
+
+def detect_format(name: str) -> str:
+    """csv, jsonl or parquet from a file name (a trailing .gz is ignored)."""
+    suffixes = [s.lower() for s in Path(name).suffixes if s.lower() != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix in (".csv", ".tsv"):
+        return "csv"
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Cannot tell the format of {name!r}; pass one of {', '.join(FORMATS)}")
+
+
+def iter_chunks(raw: BinaryIO, fmt: str, chunk_size: int, compressed: bool = False) -> Iterator[List[Dict]]:
+    """Yields lists of up to `chunk_size` row dicts from a binary file."""
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet imports need pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(raw).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    stream = gzip.GzipFile(fileobj=raw, mode="rb") if compressed else raw
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        rows = csv.DictReader(text)
+    elif fmt == "jsonl":
+        rows = _jsonl_rows(text)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _jsonl_rows(lines: Iterator[str]) -> Iterator[Dict]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield {UNPARSABLE: f"invalid JSON: {e}"}
+            continue
+        yield row if isinstance(row, dict) else {UNPARSABLE: "line is not a JSON object"}
+
+
+# --- Validation ---
+
+def _text(row: Dict, *names: str) -> Optional[str]:
+    for name in names:
+        value = row.get(name)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
+
+
+def _score(row: Dict, field: str) -> Optional[float]:
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number: {value!r}")
+    if math.isnan(score):
+        return None
+    if not 0 <= score <= 100:
+        raise ValueError(f"{field} out of range 0-100: {score}")
+    return round(score, 2)
+
+
+def _rating_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value is None or not str(value).strip():
+        raise ValueError("rating_date is missing")
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ValueError(f"rating_date is not an ISO date: {value!r}")
+
+
+def validate_company(row: Dict) -> Dict:
+    """A company record from a row; raises ValueError if it is not usable."""
+    if UNPARSABLE in row:
+        raise ValueError(row[UNPARSABLE])
+    name = _text(row, "name", "company")
+    if not name:
+        raise ValueError("name is missing")
+    ticker = _text(row, "ticker")
+    return {
+        "name": name,
+        "ticker": ticker.upper() if ticker else None,
+        "sector": _text(row, "sector"),
+        "region": _text(row, "region"),
+    }
+
+
+def validate_score(row: Dict, index: "CompanyIndex") -> Dict:
+    """A score record (with the resolved company_id) from a row; raises ValueError if it is not usable."""
+    if UNPARSABLE in row:
+        raise ValueError(row[UNPARSABLE])
+    company_id = index.resolve(row)
+    if company_id is None:
+        reference = _text(row, "company_id", "ticker", "company", "name")
+        raise ValueError(f"unknown company: {reference!r}" if reference else "no company_id, ticker or company")
+
+    record = {"company_id": company_id, "rating_date": _rating_date(row.get("rating_date")),
+              "source": _text(row, "source") or DEFAULT_SOURCE}
+    for field in SCORE_FIELDS:
+        record[field] = _score(row, field)
+    pillars = [record[f] for f in SCORE_FIELDS[:3]]
+    if record["total_score"] is None:
+        if None in pillars:
+            raise ValueError("total_score is missing and cannot be derived from the three pillar scores")
+        record["total_score"] = round(sum(pillars) / 3, 2)
+    return record
+
+
+# --- Company index ---
+
+class CompanyIndex:
+    """
+    In-memory ticker / name -> company id lookup, kept current as the import adds companies.
+    Companies new to the store get negative provisional ids until the store assigns the
+    real ones (see assign), so ids never come from a snapshot another writer may have outgrown.
+    """
+
+    def __init__(self):
+        self.by_ticker: Dict[str, int] = {}
+        self.by_name: Dict[str, int] = {}
+        self.ids = set()
+        self.tickers: Dict[int, Optional[str]] = {}
+        self.last_provisional_id = 0
+        # Provisional id -> the (name key, ticker) entries added under it
+        self.provisional: Dict[int, List[Tuple[str, Optional[str]]]] = {}
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return " ".join(name.casefold().split())
+
+    def add(self, company_id: int, name: str, ticker: Optional[str]):
+        ticker = ticker.upper() if ticker else None
+        self.ids.add(company_id)
+        self.tickers[company_id] = ticker
+        if ticker:
+            self.by_ticker[ticker] = company_id
+        self.by_name.setdefault(self._key(name), company_id)
+        if company_id in self.provisional:
+            self.provisional[company_id].append((self._key(name), ticker))
+
+    def new_id(self) -> int:
+        """A provisional id for a company the store has not inserted yet."""
+        self.last_provisional_id -= 1
+        self.provisional[self.last_provisional_id] = []
+        return self.last_provisional_id
+
+    def assign(self, provisional_id: int, company_id: int):
+        """Replaces a provisional id with the id the store gave the company."""
+        self.ids.discard(provisional_id)
+        self.ids.add(company_id)
+        self.tickers[company_id] = self.tickers.pop(provisional_id, None)
+        for name_key, ticker in self.provisional.pop(provisional_id, []):
+            if ticker and self.by_ticker.get(ticker) == provisional_id:
+                self.by_ticker[ticker] = company_id
+            if self.by_name.get(name_key) == provisional_id:
+                self.by_name[name_key] = company_id
+
+    def match(self, name: str, ticker: Optional[str]) -> Optional[int]:
+        """The company a company row refers to: by ticker, else by name if that company has no ticker."""
+        if ticker and ticker in self.by_ticker:
+            return self.by_ticker[ticker]
+        company_id = self.by_name.get(self._key(name))
+        if company_id is not None and not self.tickers.get(company_id):
+            return company_id
+        return company_id if ticker is None else None
+
+    def resolve(self, row: Dict) -> Optional[int]:
+        """The company a score row refers to, by company_id, ticker or company name."""
+        company_id = row.get("company_id")
+        if company_id not in (None, ""):
+            try:
+                company_id = int(company_id)
+            except (TypeError, ValueError):
+                return None
+            return company_id if company_id in self.ids else None
+        ticker = _text(row, "ticker")
+        if ticker:
+            return self.by_ticker.get(ticker.upper())
+        name = _text(row, "company", "name")
+        return self.by_name.get(self._key(name)) if name else None
+
+
+# --- Stores ---
+
+class DatabaseStore:
+    """Bulk upserts into the companies / esg_scores tables, one transaction per chunk."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def load_index(self) -> CompanyIndex:
+        index = CompanyIndex()
+        db = self.session_factory()
+        try:
+            # Missing tables are created; indexes on existing ones come from database/create_tables.py
+            bind = db.get_bind()
+            for table in (Company.__table__, ESGScore.__table__):
+                table.create(bind=bind, checkfirst=True)
+            for company_id, name, ticker in db.execute(select(Company.id, Company.name, Company.ticker)):
+                index.add(company_id, name, ticker)
+        finally:
+            db.close()
+        return index
+
+    def upsert_companies(self, inserts: List[Dict], updates: List[Dict]) -> Dict[int, int]:
+        """Inserts new companies (ids assigned by the database) and updates by id. Returns provisional -> new id."""
+        db = self.session_factory()
+        try:
+            assigned = {}
+            if inserts:
+                rows = [{k: v for k, v in record.items() if k != "id"} for record in inserts]
+                company_ids = db.execute(
+                    insert(Company).returning(Company.id, sort_by_parameter_order=True), rows
+                ).scalars().all()
+                assigned = {record["id"]: company_id for record, company_id in zip(inserts, company_ids)}
+            db.bulk_update_mappings(Company, updates)
+            db.commit()
+            return assigned
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def upsert_scores(self, records: List[Dict]) -> Tuple[int, int]:
+        """Inserts or updates score records by (company_id, rating_date, source). Returns (inserted, updated)."""
+        db = self.session_factory()
+        try:
+            # One lookup per rating date, so the (company_id, rating_date) index is probed once per
+            # row rather than for every company x date pair of the chunk
+            company_ids_by_date: Dict[date, set] = {}
+            for record in records:
+                company_ids_by_date.setdefault(record["rating_date"], set()).add(record["company_id"])
+            existing = {}
+            for rating_date, company_ids in company_ids_by_date.items():
+                for score_id, company_id, source in db.execute(
+                    select(ESGScore.id, ESGScore.company_id, ESGScore.source).where(
+                        ESGScore.rating_date == rating_date, ESGScore.company_id.in_(company_ids)
+                    )
+                ):
+                    existing[(company_id, rating_date, source)] = score_id
+            inserts, updates = [], []
+            for record in records:
+                score_id = existing.get((record["company_id"], record["rating_date"], record["source"]))
+                if score_id is None:
+                    inserts.append(record)
+                else:
+                    updates.append({**record, "id": score_id})
+            db.bulk_insert_mappings(ESGScore, inserts)
+            db.bulk_update_mappings(ESGScore, updates)
+            db.commit()
+            return len(inserts), len(updates)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        pass
+
+
+class JsonStore:
+    """Upserts into data/companies.json and data/esg_scores.json, written atomically on close()."""
+
+    def __init__(self, data_dir: Union[str, Path] = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self.companies: Optional[Dict[int, Dict]] = None
+        self.scores: Optional[Dict[Tuple, Dict]] = None
+
+    def _load(self, name: str) -> List[Dict]:
+        try:
+            with open(self.data_dir / name, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def load_index(self) -> CompanyIndex:
+        self.companies = {c["id"]: c for c in self._load("companies.json")}
+        index = CompanyIndex()
+        for company in self.companies.values():
+            index.add(company["id"], company["name"], company.get("ticker"))
+        return index
+
+    def upsert_companies(self, inserts: List[Dict], updates: List[Dict]) -> Dict[int, int]:
+        assigned = {}
+        next_id = max(self.companies, default=0) + 1
+        for company_id, record in enumerate(inserts, start=next_id):
+            assigned[record["id"]] = company_id
+            self.companies[company_id] = {**record, "id": company_id}
+        for record in updates:
+            self.companies[record["id"]].update(record)
+        return assigned
+
+    def upsert_scores(self, records: List[Dict]) -> Tuple[int, int]:
+        if self.scores is None:
+            self.scores = {(s["company_id"], s["rating_date"], s.get("source")): s for s in self._load("esg_scores.json")}
+        inserted = updated = 0
+        for record in records:
+            record = {**record, "rating_date": record["rating_date"].isoformat()}
+            key = (record["company_id"], record["rating_date"], record["source"])
+            if key in self.scores:
+                updated += 1
+            else:
+                inserted += 1
+            self.scores[key] = record
+        return inserted, updated
+
+    def close(self):
+        if self.companies is not None:
+            write_json_atomic(self.data_dir / "companies.json", list(self.companies.values()))
+        if self.scores is not None:
+            write_json_atomic(self.data_dir / "esg_scores.json", list(self.scores.values()))
+
+
+def get_store(target: str):
+    if target == "db":
+        return DatabaseStore()
+    if target == "json":
+        return JsonStore()
+    raise ValueError(f"Unknown import target {target!r}, expected one of {', '.join(TARGETS)}")
+
+
+# --- Import ---
+
+def company_chunk(rows: List[Dict], first_row: int, index: CompanyIndex,
+                  reject: Callable) -> Tuple[List[Dict], List[Dict]]:
+    """Validates company rows and splits them into inserts (provisional ids) and updates by id."""
+    inserts: Dict[int, Dict] = {}
+    updates: Dict[int, Dict] = {}
+    for row_number, row in enumerate(rows, start=first_row):
+        try:
+            record = validate_company(row)
+        except ValueError as e:
+            reject(row_number, row, e)
+            continue
+        company_id = index.match(record["name"], record["ticker"])
+        # Blank optional fields do not overwrite what is already stored
+        fields = {k: v for k, v in record.items() if v is not None}
+        if company_id is None:
+            company_id = index.new_id()
+            inserts[company_id] = {"id": company_id, **record}
+        elif company_id in inserts:
+            inserts[company_id].update(fields)
+        else:
+            updates.setdefault(company_id, {"id": company_id}).update(fields)
+        index.add(company_id, record["name"], record["ticker"] or index.tickers.get(company_id))
+    return list(inserts.values()), list(updates.values())
+
+
+def score_chunk(rows: List[Dict], first_row: int, index: CompanyIndex, reject: Callable) -> List[Dict]:
+    """Validates score rows; within a chunk the last row for a (company, date, source) wins."""
+    records = {}
+    for row_number, row in enumerate(rows, start=first_row):
+        try:
+            record = validate_score(row, index)
+        except ValueError as e:
+            reject(row_number, row, e)
+            continue
+        records[(record["company_id"], record["rating_date"], record["source"])] = record
+    return list(records.values())
+
+
+def file_size(raw: BinaryIO) -> Optional[int]:
+    """Size of a seekable file (for progress), else None."""
+    try:
+        position = raw.tell()
+        size = raw.seek(0, io.SEEK_END)
+        raw.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def print_progress(stats: Dict):
+    done = f" ({stats['percent']:.0f}%)" if stats.get("percent") is not None else ""
+    print(f"Imported {stats['kind']}: {stats['rows']} rows{done}, {stats['inserted']} inserted, "
+          f"{stats['updated']} updated, {stats['rejected']} rejected, {stats['rows_per_sec']} rows/s")
+
+
+def run_import(kind: str, source: Source, fmt: Optional[str] = None, store=None, chunk_size: int = IMPORT_CHUNK_SIZE,
+               errors_path: Optional[str] = None, progress: Optional[Callable[[Dict], None]] = print_progress,
+               compressed: Optional[bool] = None) -> Dict:
+    """
+    Imports companies or scores from a file path or binary file object into `store`
+    (a DatabaseStore by default). `fmt` and `compressed` (gzip) default to what the
+    file name says. Returns the final stats, with up to IMPORT_ERROR_SAMPLES
+    rejected rows under 'errors'.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind {kind!r}, expected one of {', '.join(KINDS)}")
+    name = str(source) if isinstance(source, (str, Path)) else getattr(source, "name", "")
+    fmt = fmt or detect_format(name)
+    store = store or DatabaseStore()
+    raw = open(source, "rb") if isinstance(source, (str, Path)) else source
+    total_bytes = file_size(raw)
+    errors_file = open(errors_path, "w") if errors_path else None
+
+    stats = {"kind": kind, "rows": 0, "inserted": 0, "updated": 0, "rejected": 0, "errors": []}
+
+    def reject(row_number, row, error):
+        stats["rejected"] += 1
+        entry = {"row": row_number, "error": str(error)}
+        if len(stats["errors"]) < IMPORT_ERROR_SAMPLES:
+            stats["errors"].append(entry)
+        if errors_file:
+            errors_file.write(json.dumps({**entry, "data": row}, default=str) + "\n")
+
+    started = time.perf_counter()
+    try:
+        index = store.load_index()
+        if compressed is None:
+            compressed = name.lower().endswith(".gz")
+        for chunk_rows in iter_chunks(raw, fmt, chunk_size, compressed):
+            # Row numbers count data rows from 1, in file order
+            first_row = stats["rows"] + 1
+            if kind == "companies":
+                inserts, updates = company_chunk(chunk_rows, first_row, index, reject)
+                for provisional_id, company_id in store.upsert_companies(inserts, updates).items():
+                    index.assign(provisional_id, company_id)
+                inserted, updated = len(inserts), len(updates)
+            else:
+                records = score_chunk(chunk_rows, first_row, index, reject)
+                inserted, updated = store.upsert_scores(records) if records else (0, 0)
+            stats["rows"] += len(chunk_rows)
+            stats["inserted"] += inserted
+            stats["updated"] += updated
+            elapsed = time.perf_counter() - started
+            stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else None
+            stats["percent"] = min(100.0, 100 * raw.tell() / total_bytes) if total_bytes and fmt != "parquet" else None
+            if progress:
+                progress(stats)
+        store.close()
+    finally:
+        if errors_file:
+            errors_file.close()
+        if isinstance(source, (str, Path)):
+            raw.close()
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] > 0 else None
+    stats.pop("percent", None)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a companies or ESG score history file into the store.")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help="CSV, JSONL or Parquet file (.gz for CSV/JSONL)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Default: from the file extension")
+    parser.add_argument("--target", choices=TARGETS, default="db", help="db (SQLAlchemy database) or json (data/*.json)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per chunk / transaction")
+    parser.add_argument("--errors-file", default=None, help="Write rejected rows with their errors to this JSONL file")
+    args = parser.parse_args()
+
+    stats = run_import(args.kind, args.path, args.format, get_store(args.target), args.chunk_size, args.errors_file)
+    print(f"Import finished in {stats['seconds']}s: {stats['rows']} rows, {stats['inserted']} inserted, "
+          f"{stats['updated']} updated, {stats['rejected']} rejected.")
+    for error in stats["errors"]:
+        print(f"  row {error['row']}: {error['error']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, TIMESTAMP, Table
+from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, TIMESTAMP, Table, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -24,6 +24,8 @@ class Company(Base):
 
 class ESGScore(Base):
     __tablename__ = "esg_scores"
+    # Score history lookups are per company and date (latest score, import upserts)
+    __table_args__ = (Index("ix_esg_scores_company_id_rating_date", "company_id", "rating_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"))
@@ -0,0 +1,196 @@
+"""
+Repositories
+Read queries for companies, latest ESG scores and portfolios, with a sync
+(Session) and an async (AsyncSession) repository running the same statements.
+Both return plain dicts shaped like the records in data/*.json, so services can
+read from either source.
+
+Portfolio reads take a constant number of queries however many portfolios and
+members there are: portfolios, their companies (selectinload) and the members'
+latest scores (one window-function query), instead of a lazy load per
+portfolio and per company.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from backend.services.portfolio_summary import SCORE_FIELDS, portfolio_details, summarize_portfolios
+from database.models import Company, ESGScore, Portfolio, portfolio_companies
+
+
+def company_to_dict(company: Company) -> Dict:
+    return {
+        "id": company.id,
+        "name": company.name,
+        "ticker": company.ticker,
+        "sector": company.sector,
+        "region": company.region,
+    }
+
+
+def score_to_dict(score: ESGScore) -> Dict:
+    record = {"company_id": score.company_id, "rating_date": score.rating_date.isoformat(), "source": score.source}
+    for field in SCORE_FIELDS:
+        value = getattr(score, field)
+        record[field] = float(value) if value is not None else None
+    return record
+
+
+def portfolio_to_dict(portfolio: Portfolio) -> Dict:
+    return {
+        "id": portfolio.id,
+        "name": portfolio.name,
+        "description": portfolio.description,
+        "companies": [{"id": company.id} for company in portfolio.companies],
+    }
+
+
+def portfolio_records(portfolios: Iterable[Portfolio]) -> Tuple[List[Dict], Dict[int, Dict]]:
+    """Portfolio records and their (already loaded) member companies by id."""
+    portfolios = list(portfolios)
+    companies_by_id = {c.id: company_to_dict(c) for p in portfolios for c in p.companies}
+    return [portfolio_to_dict(p) for p in portfolios], companies_by_id
+
+
+def companies_query(company_ids: Optional[Iterable[int]] = None):
+    query = select(Company).order_by(Company.id)
+    if company_ids is not None:
+        query = query.where(Company.id.in_(list(company_ids)))
+    return query
+
+
+def latest_scores_query(company_ids: Optional[Iterable[int]] = None):
+    """
+    Each company's most recent score (latest rating_date, then latest row) in one query.
+    `company_ids` may also be a select of company ids, e.g. portfolio_members_query().
+    """
+    ranked = select(
+        ESGScore.id,
+        func.row_number().over(
+            partition_by=ESGScore.company_id, order_by=(ESGScore.rating_date.desc(), ESGScore.id.desc())
+        ).label("position"),
+    )
+    if company_ids is not None:
+        ranked = ranked.where(ESGScore.company_id.in_(
+            company_ids if isinstance(company_ids, Select) else list(company_ids)
+        ))
+    ranked = ranked.subquery()
+    return select(ESGScore).join(ranked, ESGScore.id == ranked.c.id).where(ranked.c.position == 1)
+
+
+def company_values_query(column):
+    """Distinct non-empty values of a Company column (e.g. Company.sector), sorted."""
+    return select(column).where(column.isnot(None), column != "").distinct().order_by(column)
+
+
+def portfolios_query(portfolio_ids: Optional[Iterable[int]] = None):
+    # Relationships cannot lazy-load under asyncio, so members are loaded up front
+    query = select(Portfolio).options(selectinload(Portfolio.companies)).order_by(Portfolio.id)
+    if portfolio_ids is not None:
+        query = query.where(Portfolio.id.in_(list(portfolio_ids)))
+    return query
+
+
+def portfolio_members_query(portfolio_ids: Optional[Iterable[int]] = None):
+    """Ids of the companies in any portfolio (or in one of `portfolio_ids`)."""
+    query = select(portfolio_companies.c.company_id)
+    if portfolio_ids is not None:
+        query = query.where(portfolio_companies.c.portfolio_id.in_(list(portfolio_ids)))
+    return query
+
+
+def one_portfolio(portfolio_id: Optional[int]) -> Optional[List[int]]:
+    return None if portfolio_id is None else [portfolio_id]
+
+
+class Repository:
+    """Read queries over a sync Session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_companies(self, company_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        return [company_to_dict(c) for c in self.db.execute(companies_query(company_ids)).scalars()]
+
+    def get_company(self, company_id: int) -> Optional[Dict]:
+        companies = self.list_companies([company_id])
+        return companies[0] if companies else None
+
+    def latest_scores(self, company_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+        """{company id: latest score record}"""
+        return {s.company_id: score_to_dict(s) for s in self.db.execute(latest_scores_query(company_ids)).scalars()}
+
+    def sectors(self) -> List[str]:
+        return list(self.db.execute(company_values_query(Company.sector)).scalars())
+
+    def regions(self) -> List[str]:
+        return list(self.db.execute(company_values_query(Company.region)).scalars())
+
+    def list_portfolios(self) -> List[Dict]:
+        return [portfolio_to_dict(p) for p in self.db.execute(portfolios_query()).scalars()]
+
+    def get_portfolio(self, portfolio_id: int) -> Optional[Dict]:
+        portfolio = self.db.execute(portfolios_query([portfolio_id])).scalars().first()
+        return portfolio_to_dict(portfolio) if portfolio else None
+
+    def list_portfolios_with_scores(self, portfolio_id: Optional[int] = None) -> List[Dict]:
+        """Portfolios with their companies expanded, each with its 'latest_score' (three queries)."""
+        ids = one_portfolio(portfolio_id)
+        portfolios, companies_by_id = portfolio_records(self.db.execute(portfolios_query(ids)).scalars())
+        return portfolio_details(portfolios, companies_by_id, self.latest_scores(portfolio_members_query(ids)))
+
+    def portfolio_summaries(self, portfolio_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        """ESG summary (average latest pillar scores) of every portfolio, or of `portfolio_ids` (three queries)."""
+        ids = list(portfolio_ids) if portfolio_ids is not None else None
+        portfolios, _ = portfolio_records(self.db.execute(portfolios_query(ids)).scalars())
+        return summarize_portfolios(portfolios, self.latest_scores(portfolio_members_query(ids)))
+
+
+class AsyncRepository:
+    """The same read queries over an AsyncSession, for the FastAPI backend."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_companies(self, company_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        return [company_to_dict(c) for c in (await self.db.execute(companies_query(company_ids))).scalars()]
+
+    async def get_company(self, company_id: int) -> Optional[Dict]:
+        companies = await self.list_companies([company_id])
+        return companies[0] if companies else None
+
+    async def latest_scores(self, company_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+        """{company id: latest score record}"""
+        result = await self.db.execute(latest_scores_query(company_ids))
+        return {s.company_id: score_to_dict(s) for s in result.scalars()}
+
+    async def sectors(self) -> List[str]:
+        return list((await self.db.execute(company_values_query(Company.sector))).scalars())
+
+    async def regions(self) -> List[str]:
+        return list((await self.db.execute(company_values_query(Company.region))).scalars())
+
+    async def list_portfolios(self) -> List[Dict]:
+        return [portfolio_to_dict(p) for p in (await self.db.execute(portfolios_query())).scalars()]
+
+    async def get_portfolio(self, portfolio_id: int) -> Optional[Dict]:
+        portfolio = (await self.db.execute(portfolios_query([portfolio_id]))).scalars().first()
+        return portfolio_to_dict(portfolio) if portfolio else None
+
+    async def list_portfolios_with_scores(self, portfolio_id: Optional[int] = None) -> List[Dict]:
+        """Portfolios with their companies expanded, each with its 'latest_score' (three queries)."""
+        ids = one_portfolio(portfolio_id)
+        result = await self.db.execute(portfolios_query(ids))
+        portfolios, companies_by_id = portfolio_records(result.scalars())
+        latest_scores = await self.latest_scores(portfolio_members_query(ids))
+        return portfolio_details(portfolios, companies_by_id, latest_scores)
+
+    async def portfolio_summaries(self, portfolio_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        """ESG summary (average latest pillar scores) of every portfolio, or of `portfolio_ids` (three queries)."""
+        ids = list(portfolio_ids) if portfolio_ids is not None else None
+        portfolios, _ = portfolio_records((await self.db.execute(portfolios_query(ids))).scalars())
+        return summarize_portfolios(portfolios, await self.latest_scores(portfolio_members_query(ids)))
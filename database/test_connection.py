@@ -4,6 +4,8 @@ from sqlalchemy.exc import OperationalError
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# One-off script: no connection pooling
+os.environ.setdefault("DB_ROLE", "script")
 
 from database.database import engine, SessionLocal
 from config.settings import SQLALCHEMY_DATABASE_URL
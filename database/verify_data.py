@@ -4,27 +4,39 @@ from sqlalchemy.orm import sessionmaker
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# One-off script: no connection pooling
+os.environ.setdefault("DB_ROLE", "script")
 
 from database.database import engine
-from database.models import Portfolio
+from database.repository import Repository
+from backend.services.portfolio_summary import summarize_portfolios
 
 def verify_portfolio_data():
-    """Connects to the database and prints portfolio data."""
+    """Connects to the database and prints portfolio data with each company's latest ESG score."""
     Session = sessionmaker(bind=engine)
     session = Session()
 
     print("--- Verifying Portfolios in Database ---")
-    portfolios = session.query(Portfolio).all()
+    # Portfolios, companies and latest scores load in three queries, not one per portfolio and company
+    repository = Repository(session)
+    portfolios = repository.list_portfolios_with_scores()
 
     if not portfolios:
         print("!!! No portfolios found in the database. !!!")
     else:
+        latest_scores = {c["id"]: c["latest_score"] for p in portfolios for c in p["companies"] if c["latest_score"]}
+        summaries = {s["id"]: s for s in summarize_portfolios(portfolios, latest_scores)}
         print(f"Found {len(portfolios)} portfolios:")
         for p in portfolios:
-            company_names = [c.name for c in p.companies]
-            print(f"  - Portfolio ID: {p.id}, Name: {p.name}, Companies: {len(company_names)}")
+            summary = summaries[p["id"]]
+            print(f"  - Portfolio ID: {p['id']}, Name: {p['name']}, Companies: {len(p['companies'])}, "
+                  f"Scored: {summary['scored_count']}, Average ESG: {summary['average_total']}")
+            for c in p["companies"]:
+                score = c["latest_score"]
+                latest = f"{score['total_score']} ({score['rating_date']})" if score else "no score"
+                print(f"      {c['ticker'] or '-'}: {c['name']}, latest ESG {latest}")
 
     session.close()
 
 if __name__ == "__main__":
-    verify_portfolio_data()
\ No newline at end of file
+    verify_portfolio_data()
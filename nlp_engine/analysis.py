@@ -1,21 +1,115 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
+import re
+import json
+import hashlib
+from config.settings import (
+    NLP_PREFILTER_ENABLED, NLP_PREFILTER_CONTEXT_WINDOW, NLP_PREFILTER_LEXICON,
+    NLP_CACHE_ENABLED, NLP_SENTIMENT_BACKEND, NLP_DEFAULT_TIER
+)
+from nlp_engine.cache import get_analysis_cache
+from nlp_engine.backends import load_sentiment_pipeline, resolve_backend
 
-# Load the sentiment analysis model
-# Using ProsusAI/finbert for ESG sentiment analysis
-sentiment_analyzer = pipeline("sentiment-analysis", model="ProsusAI/finbert")
+SENTIMENT_MODEL_NAME = "ProsusAI/finbert"
+DISTILLED_MODEL_NAME = "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+SPACY_MODEL_NAME = "en_core_web_sm"
 
+# Sentiment model tiers, fastest/roughest first:
+# - lexicon:   word-list polarity, no model (bulk backfills of old headlines)
+# - distilled: small distilled transformer fine-tuned on financial news
+# - finbert:   full ProsusAI/finbert (fresh filings, highest quality)
+TIERS = ("lexicon", "distilled", "finbert")
+TIER_MODELS = {"distilled": DISTILLED_MODEL_NAME, "finbert": SENTIMENT_MODEL_NAME}
 
-def analyze_sentiment(text):
+POSITIVE_TERMS = {
+    "achieve", "achieved", "advance", "award", "beat", "benefit", "boost", "gain", "gains", "growth",
+    "improve", "improved", "improvement", "innovation", "invest", "investment", "launch", "lead", "leading",
+    "outperform", "profit", "profitable", "progress", "record", "reduce", "reduced", "renewable", "rise",
+    "strong", "success", "successful", "surge", "sustainable", "upgrade", "welcome", "welcomed"
+}
+NEGATIVE_TERMS = {
+    "accused", "breach", "bribery", "concern", "concerns", "corruption", "crisis", "cut", "decline",
+    "deficit", "delay", "downgrade", "fail", "failed", "failure", "fine", "fined", "fraud", "halt",
+    "investigation", "lawsuit", "layoffs", "loss", "losses", "penalty", "plunge", "pollution", "probe",
+    "recall", "risk", "scandal", "scrutiny", "strike", "violation", "warning", "weak", "writedown"
+}
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+# Loaded on first use per tier, so lexicon-only jobs never load a transformer
+_sentiment_pipelines = {}
+# Backend each loaded tier actually runs on (onnx may have fallen back to pytorch)
+_sentiment_backends = {}
+
+
+def get_sentiment_pipeline(tier="finbert"):
+    """
+    Returns the transformer pipeline for a model tier, loading it on the configured backend on first use.
+    """
+    if tier not in TIER_MODELS:
+        raise ValueError(f"Tier '{tier}' has no model. Model tiers: {list(TIER_MODELS)}")
+    if tier not in _sentiment_pipelines:
+        _sentiment_pipelines[tier], _sentiment_backends[tier] = load_sentiment_pipeline(
+            TIER_MODELS[tier], NLP_SENTIMENT_BACKEND
+        )
+    return _sentiment_pipelines[tier]
+
+
+def sentiment_backend(tier):
+    """The backend a model tier runs on: the one it was loaded with, else the one loading it would use."""
+    return _sentiment_backends.get(tier) or resolve_backend(NLP_SENTIMENT_BACKEND)
+
+
+def resolve_tier(tier=None):
+    """Returns the requested tier, or NLP_DEFAULT_TIER; raises ValueError for unknown tiers."""
+    tier = tier or NLP_DEFAULT_TIER
+    if tier not in TIERS:
+        raise ValueError(f"Unknown sentiment tier '{tier}'. Must be one of: {list(TIERS)}")
+    return tier
+
+
+def analyze_sentiment_lexicon(text):
+    """
+    Scores sentiment by counting positive and negative finance terms.
+    The score is 0.5 plus half the polarity margin, so it stays in the same
+    0.5-1.0 confidence range the transformer tiers usually report.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    positive = sum(word in POSITIVE_TERMS for word in words)
+    negative = sum(word in NEGATIVE_TERMS for word in words)
+
+    if positive == negative:
+        return {"label": "neutral", "score": 1.0}
+
+    margin = abs(positive - negative) / (positive + negative)
+    label = "positive" if positive > negative else "negative"
+    return {"label": label, "score": round(0.5 + 0.5 * margin, 4)}
+
+
+def analyze_sentiment_batch(texts, tier=None, batch_size=16):
+    """
+    Analyzes many texts with one model tier; each result is tagged with the tier used.
     """
-    Analyzes the sentiment of a given text using the fine-tuned FinBERT model.
+    tier = resolve_tier(tier)
+    if tier == "lexicon":
+        results = [analyze_sentiment_lexicon(text) for text in texts]
+    else:
+        results = get_sentiment_pipeline(tier)(list(texts), batch_size=batch_size, truncation=True)
+
+    return [{"label": r["label"].lower(), "score": r["score"], "tier": tier} for r in results]
+
+
+def analyze_sentiment(text, tier=None):
+    """
+    Analyzes the sentiment of a given text using the requested model tier
+    (NLP_DEFAULT_TIER, the fine-tuned FinBERT model, unless overridden).
+    The result is tagged with the tier used.
     """
     if not text:
         return None
     
     try:
-        result = sentiment_analyzer(text)
-        return result[0]
+        return analyze_sentiment_batch([text], tier=tier)[0]
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error during sentiment analysis: {e}")
         return None
@@ -44,12 +138,12 @@ import spacy
 
 # It's recommended to download the model separately, e.g., python -m spacy download en_core_web_sm
 try:
-    nlp = spacy.load("en_core_web_sm")
+    nlp = spacy.load(SPACY_MODEL_NAME)
 except OSError:
-    print("Downloading spaCy model 'en_core_web_sm'...")
+    print(f"Downloading spaCy model '{SPACY_MODEL_NAME}'...")
     from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+    download(SPACY_MODEL_NAME)
+    nlp = spacy.load(SPACY_MODEL_NAME)
 
 # Define ESG-related keywords
 ESG_KEYWORDS = {
@@ -150,6 +244,11 @@ CONTROVERSY_KEYWORDS = {
     "governance": ["corruption", "bribery", "insider trading", "accounting fraud"]
 }
 
+# Version of the keyword lexicons; part of the NLP cache key so editing a list invalidates old results
+LEXICON_VERSION = hashlib.sha256(
+    json.dumps([ESG_KEYWORDS, CONTROVERSY_KEYWORDS], sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
 def detect_controversy(text):
     """
     Detects potential ESG controversies in a given text.
@@ -164,6 +263,124 @@ def detect_controversy(text):
     
     return found_controversies
 
+# Sentence boundaries: terminal punctuation followed by whitespace, or a blank line.
+# A regex is used instead of spaCy's parser, which costs almost as much as FinBERT itself.
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+def split_sentences(text):
+    """
+    Splits a document into sentences using a lightweight punctuation rule.
+    """
+    if not text:
+        return []
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence and sentence.strip()]
+
+def build_prefilter_lexicon(*keyword_maps):
+    """
+    Flattens one or more category -> keywords maps into a list of lowercase terms.
+    Defaults to ESG_KEYWORDS and CONTROVERSY_KEYWORDS plus any NLP_PREFILTER_LEXICON terms.
+    """
+    if not keyword_maps:
+        keyword_maps = (ESG_KEYWORDS, CONTROVERSY_KEYWORDS)
+        terms = set(NLP_PREFILTER_LEXICON)
+    else:
+        terms = set()
+
+    for keyword_map in keyword_maps:
+        for keywords in keyword_map.values():
+            terms.update(keyword.lower() for keyword in keywords)
+
+    return sorted(terms)
+
+def select_esg_sentences(sentences, lexicon=None, context_window=NLP_PREFILTER_CONTEXT_WINDOW):
+    """
+    Returns the indexes of sentences that mention a lexicon term,
+    together with `context_window` neighbouring sentences on each side.
+    """
+    if lexicon is None:
+        lexicon = build_prefilter_lexicon()
+    if not lexicon or not sentences:
+        return []
+
+    # Longest terms first so overlapping keywords resolve to the most specific match
+    pattern = re.compile("|".join(re.escape(term.lower()) for term in sorted(lexicon, key=len, reverse=True)))
+
+    selected = set()
+    for index, sentence in enumerate(sentences):
+        if pattern.search(sentence.lower()):
+            start = max(0, index - context_window)
+            end = min(len(sentences), index + context_window + 1)
+            selected.update(range(start, end))
+
+    return sorted(selected)
+
+def aggregate_sentence_sentiments(results):
+    """
+    Combines sentence-level sentiment results into one document-level result.
+    The winning label is the one with the largest summed confidence; its score is
+    that sum divided by the number of sentences.
+    """
+    if not results:
+        return None
+
+    totals = {}
+    for result in results:
+        label = result.get('label', '').lower()
+        totals[label] = totals.get(label, 0) + result.get('score', 0)
+
+    label = max(totals, key=totals.get)
+    return {"label": label, "score": totals[label] / len(results)}
+
+def analyze_document_sentiment(text, prefilter=True, lexicon=None,
+                               context_window=NLP_PREFILTER_CONTEXT_WINDOW, batch_size=16, tier=None):
+    """
+    Analyzes a long document (e.g. an annual report) sentence by sentence.
+
+    With prefilter enabled only sentences hitting the ESG/controversy lexicon, plus their
+    context window, are sent to FinBERT. With prefilter disabled every sentence is analyzed,
+    which gives the full-document baseline for comparing accuracy against throughput.
+
+    Returns the usual {'label', 'score', 'tier'} dictionary with an extra 'prefilter' entry
+    reporting how much of the document was skipped, or None if the text is empty.
+    """
+    tier = resolve_tier(tier)
+    sentences = split_sentences(text)
+    if not sentences:
+        return None
+
+    if prefilter:
+        indexes = select_esg_sentences(sentences, lexicon=lexicon, context_window=context_window)
+    else:
+        indexes = range(len(sentences))
+    selected = [sentences[i] for i in indexes]
+
+    total_chars = sum(len(sentence) for sentence in sentences)
+    analyzed_chars = sum(len(sentence) for sentence in selected)
+    stats = {
+        "enabled": prefilter,
+        "total_sentences": len(sentences),
+        "analyzed_sentences": len(selected),
+        "skipped_sentences": len(sentences) - len(selected),
+        "total_chars": total_chars,
+        "analyzed_chars": analyzed_chars,
+        "skipped_ratio": round(1 - analyzed_chars / total_chars, 4) if total_chars else 0.0,
+    }
+
+    if not selected:
+        # Nothing ESG-relevant in the document: report neutral without running the model
+        return {"label": "neutral", "score": 0.0, "tier": tier, "prefilter": stats}
+
+    try:
+        results = analyze_sentiment_batch(selected, tier=tier, batch_size=batch_size)
+    except Exception as e:
+        print(f"Error during document sentiment analysis: {e}")
+        return None
+
+    sentiment = aggregate_sentence_sentiments(results)
+    sentiment["tier"] = tier
+    sentiment["prefilter"] = stats
+    return sentiment
+
 def calculate_esg_score_from_nlp(sentiment_result, entities, controversies):
     """
     Calculates ESG scores based on NLP analysis results.
@@ -221,3 +438,58 @@ def calculate_esg_score_from_nlp(sentiment_result, entities, controversies):
         "governance_score": round(scores["governance"], 2),
         "total_score": total_score
     }
+
+def sentiment_model_id(tier):
+    """Identifies the sentiment model behind a tier for cache keys."""
+    if tier == "lexicon":
+        return "lexicon:" + hashlib.sha256(
+            json.dumps([sorted(POSITIVE_TERMS), sorted(NEGATIVE_TERMS)]).encode("utf-8")
+        ).hexdigest()[:12]
+    return f"{TIER_MODELS[tier]}:{sentiment_backend(tier)}"
+
+def analyze_text(text, use_cache=NLP_CACHE_ENABLED, tier=None):
+    """
+    Runs sentiment, entity and controversy analysis on a text and scores it.
+    `tier` selects the sentiment model tier (defaults to NLP_DEFAULT_TIER).
+    Results are served from the persistent NLP cache when the same text was
+    already analyzed with the same models and lexicon.
+    Returns a dictionary with sentiment, entities, controversies and scores.
+    """
+    tier = resolve_tier(tier)
+    cache = get_analysis_cache() if use_cache else None
+
+    def cached(kind, model_name, analyze):
+        if cache is None:
+            return analyze(text)
+        return cache.get_or_compute(kind, text, analyze, model_name, LEXICON_VERSION)
+
+    sentiment = cached("sentiment", sentiment_model_id(tier), lambda t: analyze_sentiment(t, tier=tier))
+    entities = cached("entities", SPACY_MODEL_NAME, extract_esg_entities)
+    controversies = cached("controversies", "keywords", detect_controversy)
+
+    return {
+        'sentiment': sentiment,
+        'entities': entities,
+        'controversies': controversies,
+        'scores': calculate_esg_score_from_nlp(sentiment, entities, controversies)
+    }
+
+def analyze_report_text(text, prefilter=NLP_PREFILTER_ENABLED, tier=None):
+    """
+    Runs the full analysis for a long document such as an annual report.
+    Sentiment is computed sentence by sentence (see analyze_document_sentiment)
+    with the requested model tier.
+    Returns a dictionary with entities, sentiment, controversies, primary category and scores.
+    """
+    entities = extract_esg_entities(text)
+    sentiment = analyze_document_sentiment(text, prefilter=prefilter, tier=tier)
+    controversies = detect_controversy(text)
+    category = classify_esg_category(text)
+
+    return {
+        "entities": entities,
+        "sentiment": sentiment,
+        "controversies": controversies,
+        "primary_category": category,
+        "scores": calculate_esg_score_from_nlp(sentiment, entities, controversies)
+    }
@@ -0,0 +1,99 @@
+"""
+Sentiment Inference Backends
+Loaders for the FinBERT sentiment pipeline on CPU-only hosts.
+
+- pytorch:   fp32 eager PyTorch, the reference implementation.
+- quantized: int8 dynamic quantization of the Linear layers (no extra dependencies).
+- onnx:      ONNX graph run by onnxruntime, exported once and reused from disk.
+             Requires `optimum[onnxruntime]`.
+
+Every backend returns a transformers pipeline, so results keep the
+[{'label': ..., 'score': ...}] format used by analyze_sentiment. Loaders report
+the backend actually loaded, since onnx falls back to pytorch when its
+dependencies are missing.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import torch
+from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+from config.settings import NLP_ONNX_EXPORT_DIR
+
+BACKENDS = ("pytorch", "quantized", "onnx")
+
+
+def load_pytorch_pipeline(model_name):
+    """Loads the reference fp32 PyTorch pipeline."""
+    return pipeline("sentiment-analysis", model=model_name)
+
+
+def load_quantized_pipeline(model_name):
+    """Loads the model and applies int8 dynamic quantization to its Linear layers."""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    quantized_model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("sentiment-analysis", model=quantized_model, tokenizer=tokenizer)
+
+
+def load_onnx_pipeline(model_name, export_dir=NLP_ONNX_EXPORT_DIR):
+    """
+    Loads an ONNX Runtime pipeline, exporting the model on first use.
+    The exported graph is saved under `export_dir` so later processes skip the export.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    model_dir = Path(export_dir) / model_name.replace("/", "__")
+    if (model_dir / "model.onnx").exists():
+        model = ORTModelForSequenceClassification.from_pretrained(model_dir)
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    else:
+        print(f"Exporting {model_name} to ONNX in {model_dir}...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(model_dir)
+        tokenizer.save_pretrained(model_dir)
+
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def onnx_available():
+    """True if optimum's onnxruntime integration can be imported."""
+    try:
+        return importlib.util.find_spec("optimum.onnxruntime") is not None
+    except ImportError:
+        return False
+
+
+def resolve_backend(backend="pytorch"):
+    """
+    The backend load_sentiment_pipeline() will use for `backend`: onnx resolves to
+    pytorch when onnxruntime/optimum is not installed.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}'. Must be one of: {list(BACKENDS)}")
+    if backend == "onnx" and not onnx_available():
+        return "pytorch"
+    return backend
+
+
+def load_sentiment_pipeline(model_name, backend="pytorch"):
+    """
+    Loads the sentiment pipeline for the requested backend.
+    Returns (pipeline, backend actually loaded): onnx falls back to the PyTorch
+    reference if onnxruntime/optimum is not installed.
+    """
+    resolved = resolve_backend(backend)
+    if resolved == "quantized":
+        return load_quantized_pipeline(model_name), "quantized"
+    if resolved == "onnx":
+        try:
+            return load_onnx_pipeline(model_name), "onnx"
+        except ImportError as e:
+            print(f"ONNX backend unavailable ({e}); falling back to the PyTorch backend.")
+            return load_pytorch_pipeline(model_name), "pytorch"
+    if resolved != backend:
+        print("ONNX backend unavailable (optimum[onnxruntime] is not installed); falling back to the PyTorch backend.")
+    return load_pytorch_pipeline(model_name), "pytorch"
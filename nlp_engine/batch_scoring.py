@@ -0,0 +1,129 @@
+"""
+Batch ESG Scoring
+Vectorized NumPy version of calculate_esg_score_from_nlp and the per-company
+averaging in calculate_dynamic_esg_score, for backfills over millions of articles.
+
+The arithmetic is done in the same order as the scalar functions and rounding
+reproduces Python's round(), so results match the scalar path exactly.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Mirrors the constants used in nlp_engine.analysis.calculate_esg_score_from_nlp
+BASE_SCORE = 50
+SENTIMENT_POINTS = 20
+ENTITY_POINTS = 5
+CONTROVERSY_PENALTY = 10
+
+CATEGORIES = ("environmental", "social", "governance")
+SCORE_KEYS = ("environmental_score", "social_score", "governance_score", "total_score")
+
+
+def round_like_python(values: np.ndarray, decimals: int = 2) -> np.ndarray:
+    """
+    Rounds like Python's built-in round().
+    np.round scales by 10**decimals first, which can land on the wrong side of a .5 tie.
+    Values that sit on a tie after scaling are re-rounded with round() one by one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    scaled = values * 10 ** decimals
+    ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if ties.any():
+        index = np.nonzero(ties)
+        rounded[index] = [round(float(value), decimals) for value in values[index]]
+    return rounded
+
+
+def encode_sentiment_labels(labels: Sequence[Optional[str]]) -> np.ndarray:
+    """
+    Maps sentiment labels to +1 (positive), -1 (negative) or 0 (anything else, including None).
+    Only the distinct labels are inspected in Python; the mapping itself is vectorized.
+    """
+    if isinstance(labels, np.ndarray):
+        labels = labels.astype(str)
+    else:
+        labels = np.asarray(["" if label is None else str(label) for label in labels], dtype=str)
+    unique_labels, inverse = np.unique(labels, return_inverse=True)
+    signs = np.array([{"positive": 1, "negative": -1}.get(label.lower(), 0) for label in unique_labels], dtype=np.int8)
+    return signs[inverse.reshape(-1)]
+
+
+def calculate_esg_scores_batch(sentiment_labels: Sequence[Optional[str]], sentiment_scores: Sequence[float],
+                               entity_counts: np.ndarray, controversy_counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Scores N documents at once.
+
+    Args:
+        sentiment_labels: N sentiment labels ("positive", "negative", "neutral" or None)
+        sentiment_scores: N sentiment confidences
+        entity_counts: (N, 3) ESG entity counts per category (environmental, social, governance)
+        controversy_counts: (N, 3) controversy counts per category
+
+    Returns:
+        dict: arrays of environmental, social, governance and total scores, as in calculate_esg_score_from_nlp
+    """
+    signs = encode_sentiment_labels(sentiment_labels)
+    sentiment = np.asarray(sentiment_scores, dtype=np.float64) * SENTIMENT_POINTS
+    entity_counts = np.asarray(entity_counts, dtype=np.int64).reshape(-1, len(CATEGORIES))
+    controversy_counts = np.asarray(controversy_counts, dtype=np.int64).reshape(-1, len(CATEGORIES))
+
+    # Same operation order as the scalar version: base +/- sentiment, + entities, - controversies
+    base = np.where(signs > 0, BASE_SCORE + sentiment, np.where(signs < 0, BASE_SCORE - sentiment, float(BASE_SCORE)))
+    pillars = base[:, None] + entity_counts * ENTITY_POINTS
+    pillars = pillars - controversy_counts * CONTROVERSY_PENALTY
+    pillars = np.clip(pillars, 0, 100)
+
+    environmental, social, governance = pillars[:, 0], pillars[:, 1], pillars[:, 2]
+    return {
+        "environmental_score": round_like_python(environmental),
+        "social_score": round_like_python(social),
+        "governance_score": round_like_python(governance),
+        "total_score": round_like_python((environmental + social + governance) / 3),
+    }
+
+
+def analyses_to_arrays(analyses: Iterable[Dict]) -> Tuple[List[Optional[str]], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts stored NLP analyses ({'sentiment', 'entities', 'controversies'}) into the
+    arrays expected by calculate_esg_scores_batch.
+    """
+    labels, scores, entities, controversies = [], [], [], []
+    for analysis in analyses:
+        sentiment = analysis.get("sentiment") or {}
+        labels.append(sentiment.get("label"))
+        scores.append(sentiment.get("score", 0) if sentiment else 0)
+        entity_map = analysis.get("entities") or {}
+        controversy_map = analysis.get("controversies") or {}
+        entities.append([len(entity_map.get(category, [])) for category in CATEGORIES])
+        controversies.append([len(controversy_map.get(category, [])) for category in CATEGORIES])
+
+    return (
+        labels,
+        np.asarray(scores, dtype=np.float64),
+        np.asarray(entities, dtype=np.int64).reshape(-1, len(CATEGORIES)),
+        np.asarray(controversies, dtype=np.int64).reshape(-1, len(CATEGORIES)),
+    )
+
+
+def aggregate_scores_by_company(company_ids: Sequence, scores: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Averages document scores per company with grouped reductions, matching the
+    simple average in calculate_dynamic_esg_score (sums in input order, then round to 2).
+
+    Returns:
+        tuple: (sorted unique company ids, dict of per-company average arrays)
+    """
+    unique_ids, inverse = np.unique(np.asarray(company_ids), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse, minlength=len(unique_ids))
+
+    averages = {}
+    for key in SCORE_KEYS:
+        # bincount accumulates weights sequentially, like the scalar += loop
+        sums = np.bincount(inverse, weights=scores[key], minlength=len(unique_ids))
+        averages[key] = round_like_python(sums / counts)
+
+    return unique_ids, averages
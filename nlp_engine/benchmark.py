@@ -0,0 +1,195 @@
+"""
+Sentiment Backend and Tier Benchmark
+Parity check and latency/throughput benchmark for the FinBERT inference backends,
+and an evaluation harness for the accuracy-vs-speed sentiment model tiers.
+
+Usage:
+    python -m nlp_engine.benchmark --backends pytorch quantized onnx
+    python -m nlp_engine.benchmark --mode tiers [--texts-file data/news.json]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from nlp_engine.backends import BACKENDS, load_sentiment_pipeline
+
+# Small hand-labeled ESG/financial sample used for parity and accuracy checks
+LABELED_SAMPLE: List[Tuple[str, str]] = [
+    ("The company cut its carbon emissions by 30% and beat its renewable energy targets.", "positive"),
+    ("Record profits were driven by strong demand for its electric vehicles.", "positive"),
+    ("The board approved a new diversity policy that was welcomed by shareholders.", "positive"),
+    ("Green bond issuance was oversubscribed three times, lowering funding costs.", "positive"),
+    ("Employee satisfaction scores improved for the third consecutive year.", "positive"),
+    ("The firm raised its dividend after a year of solid cash generation.", "positive"),
+    ("Investors applauded the transparent reporting on supply chain human rights.", "positive"),
+    ("Waste management upgrades reduced operating costs across all plants.", "positive"),
+    ("Regulators fined the company for a pollution scandal at its main refinery.", "negative"),
+    ("Shares plunged after an accounting fraud was uncovered by auditors.", "negative"),
+    ("A labor strike halted production and cut quarterly revenue sharply.", "negative"),
+    ("The CEO resigned amid a bribery investigation in three countries.", "negative"),
+    ("Reports of child labor in the supply chain triggered a consumer boycott.", "negative"),
+    ("The company was accused of greenwashing its sustainability claims.", "negative"),
+    ("Losses widened as the firm wrote down its fossil fuel assets.", "negative"),
+    ("A workplace safety violation led to a costly plant shutdown.", "negative"),
+    ("The annual general meeting will be held on 14 May in London.", "neutral"),
+    ("The company operates in 40 countries and employs 12,000 people.", "neutral"),
+    ("The report covers the fiscal year ending 31 December.", "neutral"),
+    ("The board consists of nine directors, four of whom are independent.", "neutral"),
+    ("The sustainability committee meets four times a year.", "neutral"),
+    ("Emissions data is reported according to the GHG Protocol.", "neutral"),
+    ("The firm's headquarters are located in Amsterdam.", "neutral"),
+    ("Quarterly results will be published at the end of the month.", "neutral"),
+]
+
+
+def run_parity_check(candidate, reference, sample: List[Tuple[str, str]] = LABELED_SAMPLE) -> Dict:
+    """
+    Compares a candidate pipeline against the reference on a labeled sample.
+    Reports label agreement with the reference, accuracy of both against the
+    labels, and the largest confidence difference where labels agree.
+    """
+    texts = [text for text, _ in sample]
+    labels = [label for _, label in sample]
+    candidate_results = candidate(texts, truncation=True)
+    reference_results = reference(texts, truncation=True)
+
+    agreements = 0
+    score_diffs = []
+    for cand, ref in zip(candidate_results, reference_results):
+        if cand["label"].lower() == ref["label"].lower():
+            agreements += 1
+            score_diffs.append(abs(cand["score"] - ref["score"]))
+
+    def accuracy(results):
+        return sum(r["label"].lower() == label for r, label in zip(results, labels)) / len(labels)
+
+    return {
+        "samples": len(sample),
+        "agreement": round(agreements / len(sample), 4),
+        "candidate_accuracy": round(accuracy(candidate_results), 4),
+        "reference_accuracy": round(accuracy(reference_results), 4),
+        "max_score_diff": round(max(score_diffs), 4) if score_diffs else None,
+    }
+
+
+def benchmark_pipeline(sentiment_pipeline, texts: List[str], batch_size: int = 16, repeats: int = 3) -> Dict:
+    """
+    Measures single-document latency (p50/p95) and batched throughput (docs/sec).
+    One warm-up pass is run first so lazy initialization is not counted.
+    """
+    sentiment_pipeline(texts[:1], truncation=True)
+
+    latencies = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            sentiment_pipeline(text, truncation=True)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        sentiment_pipeline(texts, batch_size=batch_size, truncation=True)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "throughput_docs_per_sec": round(len(texts) * repeats / elapsed, 2),
+    }
+
+
+def evaluate_tiers(texts: List[str], tiers: Optional[List[str]] = None, batch_size: int = 16,
+                   labels: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Runs every sentiment tier over the same texts and reports docs/sec and
+    label agreement with the FinBERT tier (plus accuracy when labels are given).
+    """
+    from nlp_engine.analysis import TIERS, analyze_sentiment_batch
+
+    tiers = tiers or list(TIERS)
+    outputs = {}
+    report = {}
+    for tier in tiers:
+        analyze_sentiment_batch(texts[:1], tier=tier, batch_size=batch_size)  # warm-up / model load
+        start = time.perf_counter()
+        outputs[tier] = analyze_sentiment_batch(texts, tier=tier, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        report[tier] = {"docs": len(texts), "docs_per_sec": round(len(texts) / elapsed, 2) if elapsed else None}
+
+    reference = outputs.get("finbert") or analyze_sentiment_batch(texts, tier="finbert", batch_size=batch_size)
+    for tier, results in outputs.items():
+        agreements = sum(r["label"] == ref["label"] for r, ref in zip(results, reference))
+        report[tier]["agreement_with_finbert"] = round(agreements / len(texts), 4)
+        if labels:
+            correct = sum(r["label"] == label for r, label in zip(results, labels))
+            report[tier]["accuracy"] = round(correct / len(labels), 4)
+
+    return report
+
+
+def load_texts(path: str) -> List[str]:
+    """Loads texts from a JSON list of articles (title/description) or a plain text file, one per line."""
+    with open(path, "r") as f:
+        if path.endswith(".json"):
+            return [
+                ((item.get("title") or "") + " " + (item.get("description") or "")).strip()
+                for item in json.load(f)
+            ]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FinBERT sentiment backends and model tiers on CPU.")
+    parser.add_argument("--mode", choices=["backends", "tiers"], default="backends")
+    parser.add_argument("--model", default="ProsusAI/finbert")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--tiers", nargs="+", default=None)
+    parser.add_argument("--texts-file", default=None, help="Evaluate tiers on this corpus instead of the labeled sample")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.mode == "tiers":
+        if args.texts_file:
+            texts, labels = load_texts(args.texts_file), None
+        else:
+            texts, labels = [text for text, _ in LABELED_SAMPLE], [label for _, label in LABELED_SAMPLE]
+        report = evaluate_tiers(texts, args.tiers, args.batch_size, labels)
+        print("\nTier         docs/sec  agreement w/ FinBERT  accuracy")
+        for tier, r in report.items():
+            print(f"{tier:<12} {r['docs_per_sec']:>8}  {r['agreement_with_finbert']:>20}  {r.get('accuracy', 'n/a'):>8}")
+        return
+
+    texts = [text for text, _ in LABELED_SAMPLE]
+    print(f"Loading reference backend (pytorch) for {args.model}...")
+    reference, _ = load_sentiment_pipeline(args.model, "pytorch")
+
+    results = {}
+    for backend in args.backends:
+        print(f"\nBenchmarking backend: {backend}")
+        if backend == "pytorch":
+            candidate, loaded = reference, "pytorch"
+        else:
+            candidate, loaded = load_sentiment_pipeline(args.model, backend)
+        if loaded != backend:
+            # A fallback would be measured as the reference under this backend's name
+            print(f"Skipping {backend}: it is not available here (loaded {loaded}).")
+            continue
+        results[backend] = benchmark_pipeline(candidate, texts, args.batch_size, args.repeats)
+        results[backend].update(run_parity_check(candidate, reference))
+        print(results[backend])
+
+    baseline = results.get("pytorch")
+    print("\nBackend      p50 ms   p95 ms   docs/sec  speedup  agreement  accuracy")
+    for backend, r in results.items():
+        speedup = r["throughput_docs_per_sec"] / baseline["throughput_docs_per_sec"] if baseline else float("nan")
+        print(f"{backend:<12} {r['latency_p50_ms']:>6}   {r['latency_p95_ms']:>6}   {r['throughput_docs_per_sec']:>8}"
+              f"  {speedup:>6.2f}x  {r['agreement']:>9}  {r['candidate_accuracy']:>8}")
+
+
+if __name__ == '__main__':
+    main()
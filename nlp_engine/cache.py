@@ -0,0 +1,174 @@
+"""
+NLP Analysis Cache
+Persistent, content-addressed cache for NLP results, stored in SQLite.
+
+Entries are keyed by a hash of the whitespace-normalized text, the analysis kind, the model
+name and the lexicon version, so changing any of them naturally misses the cache.
+The cache is bounded by entry count and evicts the least recently used entries.
+
+NLP worker processes share one file. Hits only read: their LRU refreshes are
+batched and written with the next set() (or every TOUCH_FLUSH_SIZE hits), and
+the entry count is re-read inside each write transaction, so the cap holds
+whichever process does the inserting.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import NLP_CACHE_PATH, NLP_CACHE_MAX_ENTRIES, NLP_CACHE_BUSY_TIMEOUT_MS
+
+WHITESPACE = re.compile(r"\s+")
+# Pending LRU refreshes written in one transaction once this many hits have accumulated
+TOUCH_FLUSH_SIZE = 500
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes whitespace so trivially reflowed text shares a cache entry. Case is
+    kept: cased models (e.g. distilroberta) can score differently cased text differently.
+    """
+    return WHITESPACE.sub(" ", text or "").strip()
+
+
+def make_cache_key(kind: str, text: str, model_name: str, lexicon_version: str) -> str:
+    """Builds the content-addressed key for one analysis result."""
+    payload = "\x1f".join([kind, model_name, lexicon_version, normalize_text(text)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded LRU cache of NLP results backed by a SQLite file."""
+
+    def __init__(self, path: str = NLP_CACHE_PATH, max_entries: int = NLP_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> last access time of hits not yet written
+        self._touched: Dict[str, float] = {}
+
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # NLP worker processes share the file: WAL lets readers run alongside a writer, and
+        # writers wait for the lock instead of failing with "database is locked"
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(NLP_CACHE_BUSY_TIMEOUT_MS)}")
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS nlp_cache ("
+            "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_nlp_cache_last_access ON nlp_cache (last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Returns (found, value) for a key and refreshes its LRU position."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM nlp_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+            return True, json.loads(row[0])
+
+    def _flush_touched(self):
+        """Writes the batched LRU refreshes; the caller commits."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE nlp_cache SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def set(self, key: str, kind: str, value: Any):
+        """Stores a JSON-serializable value, evicting old entries if the cache is full."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.execute(
+                "INSERT INTO nlp_cache (key, kind, value, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, last_access = excluded.last_access",
+                (key, kind, json.dumps(value), time.time()),
+            )
+            # Counted inside the write transaction, so inserts by other processes are included
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Deletes the least recently used entries, leaving 10% headroom to amortize eviction."""
+        target = int(self.max_entries * 0.9)
+        excess = self._entries - target
+        self._conn.execute(
+            "DELETE FROM nlp_cache WHERE key IN "
+            "(SELECT key FROM nlp_cache ORDER BY last_access ASC, rowid ASC LIMIT ?)",
+            (excess,),
+        )
+        self._entries = target
+        self.evictions += excess
+
+    def get_or_compute(self, kind: str, text: str, compute: Callable[[str], Any],
+                       model_name: str, lexicon_version: str) -> Any:
+        """
+        Returns the cached result for `text`, computing and storing it on a miss.
+        None results (analysis errors) are not cached so they are retried next time.
+        """
+        key = make_cache_key(kind, text, model_name, lexicon_version)
+        found, value = self.get(key)
+        if found:
+            return value
+
+        value = compute(text)
+        if value is not None:
+            self.set(key, kind, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the number of entries as of this instance's last write."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self._entries,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM nlp_cache")
+            self._conn.commit()
+            self._entries = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+        self._conn.close()
+
+
+_default_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Returns the process-wide cache, opening it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AnalysisCache()
+    return _default_cache
@@ -0,0 +1,177 @@
+"""
+NLP Worker Pool
+Process pool that keeps the NLP models resident in every worker process.
+
+Each worker loads spaCy and the default-tier sentiment model once at start-up,
+then receives batches of texts over the executor's call queue and returns the
+analyses. This sidesteps the GIL and the single shared model instance of
+inline analysis. Torch intra-op threads are capped per worker so that
+workers x threads does not oversubscribe the CPU.
+
+With NLP_WORKERS=0 (the default) analysis runs inline in the calling process.
+Only pool calls can be given a time limit: a call that overruns it has its
+workers terminated and the pool restarted, which inline analysis cannot do.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from config.settings import NLP_WORKERS, NLP_TORCH_THREADS, NLP_WORKER_BATCH_SIZE, NLP_WORKER_MAX_RESTARTS
+
+
+def _init_worker(torch_threads: int):
+    """Worker initializer: pin thread counts, then load the models once."""
+    # Must be set before torch creates its thread pools
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    os.environ["MKL_NUM_THREADS"] = str(torch_threads)
+    import torch
+    torch.set_num_threads(torch_threads)
+    from nlp_engine.analysis import get_sentiment_pipeline, resolve_tier  # loads spaCy into this worker
+    tier = resolve_tier()
+    if tier != "lexicon":
+        get_sentiment_pipeline(tier)  # keep the default tier's transformer resident
+
+
+def _analyze_text_batch(texts: List[str], tier: Optional[str] = None) -> List[Dict]:
+    from nlp_engine.analysis import analyze_text
+    return [analyze_text(text, tier=tier) for text in texts]
+
+
+def _analyze_document_batch(texts: List[str], tier: Optional[str] = None) -> List[Dict]:
+    from nlp_engine.analysis import analyze_report_text
+    return [analyze_report_text(text, tier=tier) for text in texts]
+
+
+class NLPWorkerPool:
+    """Process pool for NLP analysis with per-worker model residency and crash recovery."""
+
+    def __init__(self, workers: int = NLP_WORKERS, torch_threads: int = NLP_TORCH_THREADS,
+                 batch_size: int = NLP_WORKER_BATCH_SIZE, max_restarts: int = NLP_WORKER_MAX_RESTARTS):
+        self.workers = max(1, workers)
+        # 0 means "share the cores evenly between workers"
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.batch_size = batch_size
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: forking a process that already initialized torch can deadlock
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.torch_threads,),
+        )
+
+    def _restart(self, broken_executor: ProcessPoolExecutor, reason: str = "NLP worker crashed"):
+        """Replaces a broken or hung executor, unless another thread already did."""
+        with self._lock:
+            if self._executor is not broken_executor:
+                return
+            print(f"{reason}; restarting worker pool...")
+            # Running batches cannot be cancelled, so a hung worker is terminated
+            processes = list((getattr(broken_executor, "_processes", None) or {}).values())
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            self.restarts += 1
+            self._executor = self._create_executor()
+
+    def _run(self, task, texts: List[str], tier: Optional[str] = None, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Splits texts into batches, runs them on the pool and returns results in input order.
+        Raises TimeoutError if they are not all done within `timeout` seconds; the pool is
+        then restarted, and other callers' in-flight batches are retried on the new one.
+        """
+        if not texts:
+            return []
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("NLP time limit exhausted before analysis started")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+        for attempt in range(self.max_restarts + 1):
+            executor = self._executor
+            try:
+                futures = [executor.submit(task, batch, tier) for batch in batches]
+                results = []
+                for future in futures:
+                    remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                    results.extend(future.result(timeout=remaining))
+                return results
+            except TimeoutError:
+                self._restart(executor, f"NLP analysis exceeded its {timeout:g}s time limit")
+                raise
+            except BrokenProcessPool:
+                # Batches finished before the crash are served from the NLP cache on retry
+                if attempt == self.max_restarts:
+                    raise
+                self._restart(executor)
+
+    def analyze_texts(self, texts: List[str], tier: Optional[str] = None,
+                      timeout: Optional[float] = None) -> List[Dict]:
+        """Runs analyze_text (news articles) over texts on the pool."""
+        return self._run(_analyze_text_batch, texts, tier, timeout)
+
+    def analyze_documents(self, texts: List[str], tier: Optional[str] = None,
+                          timeout: Optional[float] = None) -> List[Dict]:
+        """Runs analyze_report_text (long reports) over texts on the pool."""
+        return self._run(_analyze_document_batch, texts, tier, timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers; with wait=True queued batches finish first."""
+        with self._lock:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_pool: Optional[NLPWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> NLPWorkerPool:
+    """Returns the process-wide worker pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = NLPWorkerPool()
+            atexit.register(shutdown_worker_pool)
+            print(f"Started NLP worker pool: {_pool.workers} workers x {_pool.torch_threads} torch threads.")
+        return _pool
+
+
+def shutdown_worker_pool(wait: bool = True):
+    """Shuts down the process-wide worker pool if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def analyze_texts(texts: List[str], tier: Optional[str] = None, timeout: Optional[float] = None) -> List[Dict]:
+    """
+    Analyzes short texts (news articles) with the given sentiment tier.
+    Uses the worker pool when NLP_WORKERS > 0, otherwise runs inline in the calling process.
+    `timeout` (seconds) is enforced on the pool only.
+    """
+    if NLP_WORKERS > 0:
+        return get_worker_pool().analyze_texts(texts, tier, timeout)
+    from nlp_engine.analysis import analyze_text
+    return [analyze_text(text, tier=tier) for text in texts]
+
+
+def analyze_documents(texts: List[str], tier: Optional[str] = None, timeout: Optional[float] = None) -> List[Dict]:
+    """Analyzes long documents (reports), on the worker pool when NLP_WORKERS > 0 (`timeout` as for analyze_texts)."""
+    if NLP_WORKERS > 0:
+        return get_worker_pool().analyze_documents(texts, tier, timeout)
+    from nlp_engine.analysis import analyze_report_text
+    return [analyze_report_text(text, tier=tier) for text in texts]
@@ -0,0 +1,81 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from data_collection.article_store import ArticleStore
+
+class TestArticleStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ArticleStore(":memory:", retention_days=30)
+        self.articles = [
+            {"title": "Acme cuts emissions", "url": "https://example.com/1", "publishedAt": "2024-05-01T10:00:00Z",
+             "source": {"name": "Reuters"}, "nlp_analysis": {"scores": {"total_score": 61.0}}},
+            {"title": "Acme faces strike", "url": "https://example.com/2", "publishedAt": "2024-05-03T10:00:00Z",
+             "source": {"name": "Bloomberg"}, "nlp_analysis": {"scores": {"total_score": 42.0}}},
+        ]
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_dedup_by_title_and_url(self):
+        self.assertEqual(self.store.add_articles(self.articles, "Acme"), 2)
+        same_title = {**self.articles[0], "url": "https://mirror.example.com/1", "title": "  ACME cuts emissions "}
+        same_url = {**self.articles[1], "title": "Acme faces strike (updated)"}
+        self.assertEqual(self.store.add_articles([same_title, same_url], "Acme"), 0)
+        # The same story for another company is stored separately
+        self.assertEqual(self.store.add_articles(self.articles[:1], "Other Corp"), 1)
+        self.assertEqual(self.store.count(), 3)
+
+    def test_keeps_nlp_analysis_and_orders_newest_first(self):
+        self.store.add_articles(self.articles, "Acme")
+        recent = self.store.recent(limit=1, company_name="Acme")
+        self.assertEqual(recent[0]["title"], "Acme faces strike")
+        self.assertEqual(recent[0]["nlp_analysis"]["scores"]["total_score"], 42.0)
+
+    def test_time_range_query(self):
+        self.store.add_articles(self.articles, "Acme")
+        in_range = self.store.query("Acme", start="2024-05-01T00:00:00Z", end="2024-05-02T00:00:00Z")
+        self.assertEqual([a["title"] for a in in_range], ["Acme cuts emissions"])
+        self.assertEqual(self.store.query("Other Corp"), [])
+
+    def test_compact_drops_expired_articles(self):
+        now = datetime.now(timezone.utc)
+        fresh = {"title": "Fresh story", "publishedAt": now.strftime("%Y-%m-%dT%H:%M:%SZ")}
+        stale = {"title": "Stale story", "publishedAt": (now - timedelta(days=60)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+        # Just inside the window: kept whatever the local UTC offset
+        edge = {"title": "Edge story", "publishedAt": (now - timedelta(days=30, hours=-1)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+        self.store.add_articles([fresh, stale, edge], "Acme")
+        self.assertEqual(self.store.compact(), 1)
+        self.assertEqual([a["title"] for a in self.store.recent()], ["Fresh story", "Edge story"])
+
+    def test_undated_articles_are_stamped_in_utc(self):
+        self.store.add_articles([{"title": "Undated story"}], "Acme")
+        published = self.store._conn.execute("SELECT published_at FROM articles").fetchone()[0]
+        self.assertTrue(published.endswith("Z"))
+        since = (datetime.now(timezone.utc) - timedelta(minutes=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.assertEqual(self.store.count_since(["Acme"], since), 1)
+
+    def test_score_state_counts_only_new_articles(self):
+        self.store.add_articles(self.articles, "Acme")
+        self.store.add_articles(self.articles, "Acme")
+        news = self.store.score_states("Acme")["news"]
+        self.assertEqual(news.count, 2)
+        # Two days apart, so the newer (lower) score weighs more than the older one
+        self.assertTrue(42.0 < news.mean["total"] < 51.5)
+
+    def test_report_updates_only_when_new(self):
+        self.assertTrue(self.store.set_report_scores("Acme", "hash-1", {"total_score": 70.0}))
+        self.assertFalse(self.store.set_report_scores("Acme", "hash-1", {"total_score": 70.0}))
+        self.assertEqual(self.store.current_scores("Acme")["total_score"], 70.0)
+        self.assertIsNone(self.store.current_scores("Other Corp"))
+
+    def test_dirty_flags(self):
+        self.store.add_articles(self.articles, "Acme")
+        self.assertEqual(self.store.dirty_companies(), ["Acme"])
+        self.store.clear_dirty(["Acme"], before=time.time())
+        self.assertEqual(self.store.dirty_companies(), [])
+        # Nothing new, nothing dirty
+        self.store.add_articles(self.articles, "Acme")
+        self.assertEqual(self.store.dirty_companies(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,5 +12,18 @@ class TestBackend(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"message": "ESG Builder API", "version": "1.0.0"})
 
+    def test_portfolio_summaries(self):
+        response = self.client.get("/api/portfolios/summary")
+        self.assertEqual(response.status_code, 200)
+        summaries = response.json()["summaries"]
+        self.assertTrue(summaries)
+        for summary in summaries:
+            self.assertLessEqual(summary["scored_count"], summary["company_count"])
+
+        response = self.client.get(f"/api/portfolios/{summaries[0]['id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("latest_score", response.json()["companies"][0])
+        self.assertEqual(self.client.get("/api/portfolios/999999").status_code, 404)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+from nlp_engine import analysis, backends
+
+
+class TestSentimentBackends(unittest.TestCase):
+    def test_quantized_load_quantizes_linear_layers(self):
+        with mock.patch.object(backends, "AutoTokenizer") as tokenizer_cls, \
+                mock.patch.object(backends, "AutoModelForSequenceClassification") as model_cls, \
+                mock.patch.object(backends, "torch") as torch, \
+                mock.patch.object(backends, "pipeline") as pipeline:
+            loaded, backend = backends.load_sentiment_pipeline("ProsusAI/finbert", "quantized")
+
+        self.assertEqual(backend, "quantized")
+        model = model_cls.from_pretrained.return_value
+        model.eval.assert_called_once()
+        torch.quantization.quantize_dynamic.assert_called_once_with(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        pipeline.assert_called_once_with(
+            "sentiment-analysis", model=torch.quantization.quantize_dynamic.return_value,
+            tokenizer=tokenizer_cls.from_pretrained.return_value
+        )
+        self.assertIs(loaded, pipeline.return_value)
+
+    def test_onnx_falls_back_to_pytorch_when_not_installed(self):
+        with mock.patch.object(backends, "onnx_available", return_value=False), \
+                mock.patch.object(backends, "load_onnx_pipeline") as load_onnx, \
+                mock.patch.object(backends, "pipeline") as pipeline:
+            loaded, backend = backends.load_sentiment_pipeline("ProsusAI/finbert", "onnx")
+        self.assertEqual(backend, "pytorch")
+        load_onnx.assert_not_called()
+        self.assertIs(loaded, pipeline.return_value)
+
+    def test_onnx_import_error_during_load_falls_back_to_pytorch(self):
+        with mock.patch.object(backends, "onnx_available", return_value=True), \
+                mock.patch.object(backends, "load_onnx_pipeline", side_effect=ImportError("no onnxruntime")), \
+                mock.patch.object(backends, "pipeline"):
+            _, backend = backends.load_sentiment_pipeline("ProsusAI/finbert", "onnx")
+        self.assertEqual(backend, "pytorch")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            backends.load_sentiment_pipeline("ProsusAI/finbert", "tensorrt")
+
+    def test_cache_model_id_names_the_loaded_backend(self):
+        with mock.patch.object(analysis, "NLP_SENTIMENT_BACKEND", "onnx"), \
+                mock.patch.object(backends, "onnx_available", return_value=False), \
+                mock.patch.dict(analysis._sentiment_backends, clear=True):
+            self.assertEqual(analysis.sentiment_model_id("finbert"), "ProsusAI/finbert:pytorch")
+            analysis._sentiment_backends["finbert"] = "onnx"
+            self.assertEqual(analysis.sentiment_model_id("finbert"), "ProsusAI/finbert:onnx")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import random
+import unittest
+import numpy as np
+from nlp_engine.analysis import calculate_esg_score_from_nlp
+from nlp_engine.batch_scoring import (
+    calculate_esg_scores_batch, analyses_to_arrays, aggregate_scores_by_company, round_like_python, SCORE_KEYS
+)
+
+CATEGORIES = ("environmental", "social", "governance")
+
+def random_analysis(rng):
+    label = rng.choice(["positive", "negative", "neutral", None])
+    sentiment = None if label is None else {"label": label, "score": rng.choice([rng.random(), 0.125, 0.375, 0.0005])}
+    entities = {c: ["x"] * rng.randint(0, 4) for c in CATEGORIES}
+    controversies = {c: ["y"] * rng.randint(0, 3) for c in CATEGORIES}
+    return {"sentiment": sentiment, "entities": entities, "controversies": controversies}
+
+class TestBatchScoring(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.analyses = [random_analysis(rng) for _ in range(2000)]
+        self.company_ids = [rng.randint(1, 25) for _ in self.analyses]
+
+    def test_matches_scalar_scores_exactly(self):
+        batch = calculate_esg_scores_batch(*analyses_to_arrays(self.analyses))
+        for i, analysis in enumerate(self.analyses):
+            expected = calculate_esg_score_from_nlp(analysis["sentiment"], analysis["entities"], analysis["controversies"])
+            for key in SCORE_KEYS:
+                self.assertEqual(batch[key][i], expected[key], f"{key} differs for document {i}")
+
+    def test_company_aggregation_matches_simple_average(self):
+        batch = calculate_esg_scores_batch(*analyses_to_arrays(self.analyses))
+        company_ids, averages = aggregate_scores_by_company(self.company_ids, batch)
+
+        for row, company_id in enumerate(company_ids):
+            rows = [i for i, cid in enumerate(self.company_ids) if cid == company_id]
+            for key in SCORE_KEYS:
+                total = 0
+                for i in rows:
+                    total += batch[key][i].item()
+                self.assertEqual(averages[key][row], round(total / len(rows), 2))
+
+    def test_round_like_python_ties(self):
+        values = np.array([0.125, 0.375, 2.675, 1.005, 50.0, 69.665])
+        self.assertEqual(list(round_like_python(values)), [round(float(v), 2) for v in values])
+
+if __name__ == '__main__':
+    unittest.main()
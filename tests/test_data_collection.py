@@ -1,9 +1,237 @@
 # This file will contain tests for the data collection module.
+import os
+import shutil
+import tempfile
+import time
 import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from data_collection import pipeline
+from data_collection.article_store import ArticleStore
+from data_collection.checkpoints import IngestionCheckpoints, article_id
+from data_collection.http_client import get_http_client
+from data_collection.mock_server import MockCollectionServer, SyntheticCorpus
+from data_collection.pipeline import StageCheckpoints, prune_old_runs
+from data_collection.scrapers import news_scraper
 
 class TestDataCollection(unittest.TestCase):
     def test_example(self):
         self.assertEqual(1, 1)
 
+class TestStageCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.runs_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.runs_dir, ignore_errors=True)
+
+    def test_completed_stage_is_not_rerun(self):
+        calls = []
+        def stage(value):
+            calls.append(value)
+            return {"value": value}
+
+        self.assertEqual(StageCheckpoints("cycle", self.runs_dir).run_stage("fetch", stage, 1), {"value": 1})
+        # A resumed run loads the checkpoint instead of running the stage again
+        self.assertEqual(StageCheckpoints("cycle", self.runs_dir).run_stage("fetch", stage, 2), {"value": 1})
+        self.assertEqual(calls, [1])
+
+    def test_mark_complete(self):
+        checkpoints = StageCheckpoints("cycle", self.runs_dir)
+        self.assertFalse(checkpoints.is_complete())
+        checkpoints.mark_complete()
+        self.assertTrue(StageCheckpoints("cycle", self.runs_dir).is_complete())
+
+    def test_prune_old_runs(self):
+        for cycle_id in ["20240101T00", "20240101T01"]:
+            StageCheckpoints(cycle_id, self.runs_dir).mark_complete()
+        old_time = time.time() - 48 * 3600
+        os.utime(self.runs_dir / "20240101T00", (old_time, old_time))
+        prune_old_runs(self.runs_dir, max_age_hours=24)
+        self.assertEqual([p.name for p in self.runs_dir.iterdir()], ["20240101T01"])
+
+class TestIngestionCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.path = self.tmp_dir / "checkpoints.json"
+        self.articles = [
+            {"url": "https://example.com/a", "title": "A", "publishedAt": "2024-05-01T10:00:00Z"},
+            {"url": "https://example.com/b", "title": "B", "publishedAt": "2024-05-01T12:00:00Z"},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_high_water_mark_survives_restart(self):
+        checkpoints = IngestionCheckpoints(self.path)
+        self.assertIsNone(checkpoints.last_published_at("Acme"))
+        checkpoints.advance("Acme", self.articles)
+        checkpoints.save()
+
+        restarted = IngestionCheckpoints(self.path)
+        self.assertEqual(restarted.last_published_at("Acme"), "2024-05-01T12:00:00Z")
+        self.assertIsNone(restarted.last_published_at("Other Corp"))
+
+    def test_filter_new_drops_seen_articles(self):
+        checkpoints = IngestionCheckpoints(self.path)
+        checkpoints.advance("Acme", self.articles)
+        newer = {"url": "https://example.com/c", "title": "C", "publishedAt": "2024-05-01T12:00:00Z"}
+        self.assertEqual(checkpoints.filter_new("Acme", self.articles + [newer]), [newer])
+
+    def test_seen_ids_are_bounded(self):
+        checkpoints = IngestionCheckpoints(self.path, max_seen_ids=1)
+        checkpoints.advance("Acme", self.articles)
+        self.assertEqual(checkpoints.state["Acme"]["seen_ids"], ["https://example.com/b"])
+
+    def test_incomplete_fetch_keeps_the_mark(self):
+        checkpoints = IngestionCheckpoints(self.path)
+        checkpoints.advance("Acme", [self.articles[0]])
+        # Only the newest page was read: the mark stays, the next fetch ends at the oldest article read
+        newer = [{"url": f"https://example.com/n{i}", "publishedAt": f"2024-06-0{i}T00:00:00Z"} for i in (5, 6)]
+        checkpoints.advance("Acme", newer, complete=False, oldest_read="2024-06-05T00:00:00Z")
+        self.assertEqual(checkpoints.fetch_window("Acme"), ("2024-05-01T10:00:00Z", "2024-06-05T00:00:00Z"))
+        checkpoints.advance("Acme", [self.articles[1]], complete=True)
+        self.assertEqual(checkpoints.fetch_window("Acme"), ("2024-06-06T00:00:00Z", None))
+
+    def test_article_id_without_url(self):
+        article = {"title": "A", "publishedAt": "2024-05-01T10:00:00Z"}
+        self.assertEqual(article_id(article), article_id(dict(article)))
+        self.assertNotEqual(article_id(article), article_id({**article, "title": "B"}))
+
+class TestPipelineFailures(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.companies = [{"id": 1, "name": "Acme", "ticker": "ACME"}, {"id": 2, "name": "Beta", "ticker": "BETA"}]
+        self.raw_news = {
+            "1": [{"url": "https://example.com/acme", "title": "Acme news", "publishedAt": "2024-05-01T10:00:00Z"}],
+            "2": [{"url": "https://example.com/beta", "title": "Beta news", "publishedAt": "2024-05-01T11:00:00Z"}],
+        }
+        self.store = ArticleStore(str(self.tmp_dir / "articles.db"))
+        self.checkpoints = IngestionCheckpoints(self.tmp_dir / "checkpoints.json")
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_failed_analysis_leaves_the_checkpoint_unchanged(self):
+        def analyze_articles(articles, tier=None, timeout=None):
+            if articles[0]["title"].startswith("Acme"):
+                raise RuntimeError("NLP worker died")
+            return [dict(article, nlp_analysis={}) for article in articles]
+
+        with mock.patch.object(pipeline, "analyze_articles", side_effect=analyze_articles):
+            analyzed = pipeline.analyze_stage(self.companies, self.raw_news, None, False)
+        self.assertTrue(analyzed["1"]["failed"])
+        self.assertNotIn("failed", analyzed["2"])
+
+        saved = pipeline.persist_stage(self.companies, analyzed, self.raw_news, self.checkpoints, self.store)
+        self.assertEqual(saved, {"1": None, "2": 1})
+        self.assertIsNone(self.checkpoints.last_published_at("Acme"))
+        self.assertEqual(self.checkpoints.last_published_at("Beta"), "2024-05-01T11:00:00Z")
+        # Acme's article is fetched (not filtered as seen) and stored by the next cycle
+        self.assertEqual(self.checkpoints.filter_new("Acme", self.raw_news["1"]), self.raw_news["1"])
+
+    def test_hung_company_times_out_without_blocking_the_others(self):
+        timeouts = []
+
+        def analyze_articles(articles, tier=None, timeout=None):
+            timeouts.append(timeout)
+            if articles[0]["title"].startswith("Acme"):
+                # A hung worker: the pool gives up on the call once its time limit passes
+                time.sleep(timeout)
+                raise TimeoutError("NLP analysis exceeded its time limit")
+            return [dict(article, nlp_analysis={}) for article in articles]
+
+        with mock.patch.object(pipeline, "analyze_articles", side_effect=analyze_articles), \
+                mock.patch.object(pipeline, "PIPELINE_ANALYZE_TIMEOUT", 0.2), \
+                mock.patch.object(pipeline, "PIPELINE_ANALYZE_WORKERS", 2):
+            analyzed = pipeline.analyze_stage(self.companies, self.raw_news, None, False)
+        self.assertEqual(timeouts, [0.2, 0.2])
+        self.assertTrue(analyzed["1"]["failed"])
+
+        saved = pipeline.persist_stage(self.companies, analyzed, self.raw_news, self.checkpoints, self.store)
+        self.assertEqual(saved, {"1": None, "2": 1})
+        self.assertIsNone(self.checkpoints.last_published_at("Acme"))
+        self.assertEqual(self.checkpoints.last_published_at("Beta"), "2024-05-01T11:00:00Z")
+
+    def test_failed_scoring_keeps_the_company_dirty(self):
+        for company in self.companies:
+            self.store.add_articles([dict(self.raw_news[str(company["id"])][0], nlp_analysis={"scores": {
+                "environmental_score": 60.0, "social_score": 55.0, "governance_score": 50.0, "total_score": 55.0,
+            }})], company["name"])
+        current_scores = self.store.current_scores
+
+        def scores_or_fail(name, now=None):
+            if name == "Acme":
+                raise RuntimeError("corrupt score state")
+            return current_scores(name, now)
+
+        with mock.patch.object(self.store, "current_scores", side_effect=scores_or_fail), \
+                mock.patch.object(pipeline, "SessionLocal"):
+            scores = pipeline.aggregate_stage(self.companies, self.store)
+        self.assertEqual(list(scores), ["2"])
+        self.assertEqual(self.store.dirty_companies(), ["Acme"])
+
+
+class FailingPageClient:
+    """Delegates to the real HTTP client but fails the first request for `page` with a connection error."""
+
+    def __init__(self, page):
+        self.page = page
+        self.failed = False
+
+    def get(self, url, params=None, **kwargs):
+        if params and params.get("page") == self.page and not self.failed:
+            self.failed = True
+            raise requests.ConnectionError("connection reset")
+        return get_http_client().get(url, params=params, **kwargs)
+
+
+class TestIncrementalNewsFetch(unittest.TestCase):
+    """30 articles newer than the checkpoint, fetched 10 per page."""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.server = MockCollectionServer(corpus=SyntheticCorpus(articles_per_company=30)).start()
+        self.checkpoints = IngestionCheckpoints(self.tmp_dir / "checkpoints.json")
+        self.checkpoints.state["Acme"] = {"last_published_at": "2000-01-01T00:00:00Z", "seen_ids": []}
+        for patcher in (mock.patch.object(news_scraper, "NEWS_API_URL", self.server.settings_env()["NEWS_API_URL"]),
+                        mock.patch.object(news_scraper, "NEWS_API_PAGE_SIZE", 10),
+                        mock.patch.object(news_scraper, "NEWS_API_KEY", "test-key")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def cycle(self, max_pages):
+        """One fetch + persist: returns the new article URLs and advances the checkpoint."""
+        fetched = news_scraper.fetch_new_news_for_companies(["Acme"], self.checkpoints, max_pages=max_pages)["Acme"]
+        articles = fetched.pop("articles")
+        self.checkpoints.advance("Acme", articles, **fetched)
+        return [a["url"] for a in articles]
+
+    def test_page_cap_resumes_with_older_pages(self):
+        first = self.cycle(max_pages=2)
+        self.assertEqual(len(first), 20)
+        self.assertEqual(self.checkpoints.last_published_at("Acme"), "2000-01-01T00:00:00Z")
+        second = self.cycle(max_pages=2)
+        self.assertEqual(len(set(first + second)), 30)
+        self.assertEqual(self.cycle(max_pages=2), [])
+        newest = self.server.corpus.articles("Acme")[0]["publishedAt"]
+        self.assertEqual(self.checkpoints.fetch_window("Acme"), (newest, None))
+
+    def test_request_error_mid_pagination_loses_nothing(self):
+        with mock.patch.object(news_scraper, "get_http_client", return_value=FailingPageClient(page=2)):
+            first = self.cycle(max_pages=5)
+        self.assertEqual(len(first), 10)
+        second = self.cycle(max_pages=5)
+        self.assertEqual(len(set(first + second)), 30)
+        self.assertEqual(self.cycle(max_pages=5), [])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from sqlalchemy import inspect, text
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from database.create_tables import create_all_tables
+from database.database import make_engine
+
+class TestEngineProfile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.url = f"sqlite:///{self.tmp_dir / 'test.db'}"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def pragma(self, engine, name):
+        with engine.connect() as connection:
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_tuned_sqlite_pragmas(self):
+        engine = make_engine(self.url, role="api", tuned=True)
+        try:
+            self.assertEqual(self.pragma(engine, "journal_mode"), "wal")
+            self.assertEqual(self.pragma(engine, "synchronous"), 1)  # NORMAL
+            self.assertGreater(self.pragma(engine, "busy_timeout"), 0)
+            self.assertLess(self.pragma(engine, "cache_size"), 0)  # sized in KiB
+        finally:
+            engine.dispose()
+
+    def test_untuned_engine_keeps_sqlite_defaults(self):
+        engine = make_engine(self.url, role="api", tuned=False)
+        try:
+            self.assertEqual(self.pragma(engine, "journal_mode"), "delete")
+        finally:
+            engine.dispose()
+
+    def test_pool_per_role(self):
+        engines = {role: make_engine(self.url, role=role) for role in ("api", "worker", "script")}
+        try:
+            self.assertIsInstance(engines["api"].pool, QueuePool)
+            self.assertIsInstance(engines["worker"].pool, QueuePool)
+            self.assertEqual(engines["worker"].pool._max_overflow, 0)
+            self.assertIsInstance(engines["script"].pool, NullPool)
+        finally:
+            for engine in engines.values():
+                engine.dispose()
+        memory = make_engine("sqlite:///:memory:", role="script")
+        self.assertIsInstance(memory.pool, StaticPool)
+        with self.assertRaises(ValueError):
+            make_engine(self.url, role="dashboard")
+
+    def test_create_all_tables_adds_indexes_to_existing_tables(self):
+        engine = make_engine(self.url, role="script")
+        try:
+            create_all_tables(engine)
+            with engine.begin() as connection:
+                connection.execute(text("DROP INDEX ix_esg_scores_company_id_rating_date"))
+            # A database created before the index: the table exists, so create_all() alone skips it
+            create_all_tables(engine)
+            indexes = {index["name"] for index in inspect(engine).get_indexes("esg_scores")}
+            self.assertIn("ix_esg_scores_company_id_rating_date", indexes)
+        finally:
+            engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
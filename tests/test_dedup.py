@@ -0,0 +1,35 @@
+import unittest
+from data_collection.dedup import collapse_near_duplicates, shingles, jaccard
+
+class TestNearDuplicateDetection(unittest.TestCase):
+    def test_collapses_syndicated_copies(self):
+        articles = [
+            {"title": "Apple announces new sustainability initiatives for 2025",
+             "description": "The company will expand renewable energy across its supply chain.",
+             "source": {"name": "Reuters"}},
+            {"title": "Apple announces new sustainability initiatives for 2025 - report",
+             "description": "The company will expand renewable energy across its supply chain.",
+             "source": {"name": "Yahoo Finance"}},
+            {"title": "Tesla expands solar energy partnerships globally",
+             "description": "New deals were signed in Europe and Asia.",
+             "source": {"name": "Bloomberg"}},
+        ]
+        collapsed = collapse_near_duplicates(articles)
+
+        self.assertEqual(len(collapsed), 2)
+        self.assertEqual(collapsed[0]["syndication_count"], 2)
+        self.assertEqual(collapsed[0]["syndicated_sources"], ["Reuters", "Yahoo Finance"])
+        self.assertEqual(collapsed[1]["syndication_count"], 1)
+        self.assertNotIn("syndication_count", articles[0])
+
+    def test_distinct_stories_are_kept(self):
+        articles = [{"title": f"Company {i} reports quarterly results", "description": f"Story number {i} about topic {i * 7}"}
+                    for i in range(20)]
+        self.assertEqual(len(collapse_near_duplicates(articles, threshold=0.9)), 20)
+
+    def test_jaccard(self):
+        self.assertEqual(jaccard(shingles("a b c d"), shingles("a b c d")), 1.0)
+        self.assertEqual(jaccard(shingles("a b c"), shingles("x y z")), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from data_collection.dispatcher import SchedulerLock, ShardDispatcher, make_shards, is_due
+
+COMPANIES = [{"id": i, "name": f"Company {i}", "ticker": f"C{i}"} for i in (3, 1, 2)]
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.release = threading.Event()
+        self.started = []
+
+    def tearDown(self):
+        self.release.set()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_dispatcher(self, velocities, max_workers=2):
+        def run_shard(cycle_id, companies):
+            self.started.append(companies[0]["id"])
+            self.release.wait(5)
+        return ShardDispatcher(run_shard, lambda: COMPANIES, lambda names: velocities[names[0]],
+                               max_workers=max_workers, shard_size=1, state_path=self.tmp_dir / "state.json")
+
+    def test_make_shards(self):
+        self.assertEqual(list(make_shards(COMPANIES, 1)), ["company-1", "company-2", "company-3"])
+        shards = make_shards(COMPANIES, 2)
+        self.assertEqual([[c["id"] for c in shard] for shard in shards.values()], [[1, 2], [3]])
+
+    def test_news_velocity_shortens_refresh_interval(self):
+        self.assertFalse(is_due(30, 0, refresh_minutes=60))
+        self.assertTrue(is_due(30, 1.5, refresh_minutes=60))
+
+    def test_highest_velocity_first_within_budget(self):
+        dispatcher = self.make_dispatcher({"Company 1": 0.0, "Company 2": 5.0, "Company 3": 1.0})
+        dispatcher.staleness_minutes = lambda shard_id, now: 120
+        self.assertEqual([shard_id for _, shard_id, _ in dispatcher.due_shards()], ["company-2", "company-3", "company-1"])
+
+        dispatcher.tick()
+        # Running shards are not dispatched again and the budget caps concurrency
+        dispatcher.tick()
+        self.release.set()
+        dispatcher.shutdown()
+        self.assertEqual(sorted(self.started), [2, 3])
+        self.assertIn("company-2", dispatcher.last_completed)
+
+    def test_lock_is_exclusive(self):
+        first, second = SchedulerLock(self.tmp_dir / "scheduler.lock"), SchedulerLock(self.tmp_dir / "scheduler.lock")
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import hashlib
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from data_collection import pipeline
+from data_collection.article_store import ArticleStore
+from data_collection.checkpoints import FeedCheckpoints
+from data_collection.company_matcher import CompanyMatcher, name_aliases
+from data_collection.scrapers.feed_scraper import fetch_feed_articles
+
+COMPANIES = [
+    {"id": 1, "name": "Apple Inc.", "ticker": "AAPL"},
+    {"id": 2, "name": "Amazon.com Inc.", "ticker": "AMZN"},
+    {"id": 3, "name": "ON Semiconductor Corp", "ticker": "ON"},
+]
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>ESG Wire</title>
+<item><guid>1</guid><title>Apple expands renewable energy use</title>
+<description>&lt;p&gt;The iPhone maker cut emissions.&lt;/p&gt;</description>
+<link>https://esg.example.com/1</link><pubDate>Mon, 06 May 2024 10:00:00 GMT</pubDate></item>
+<item><guid>2</guid><title>Warehouse strike hits ($AMZN) shipments</title>
+<link>https://esg.example.com/2</link><pubDate>Tue, 07 May 2024 10:00:00 GMT</pubDate></item>
+<item><guid>3</guid><title>Regulators turn ON the pressure over water use</title>
+<link>https://esg.example.com/3</link></item>
+</channel></rss>"""
+
+class MockFeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.server.body.encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        status = 304 if self.headers.get("If-None-Match") == etag else 200
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", "0" if status == 304 else str(len(body)))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestCompanyMatcher(unittest.TestCase):
+    def test_aliases_drop_legal_suffixes(self):
+        self.assertEqual(name_aliases("Amazon.com Inc."), {"Amazon.com Inc.", "Amazon"})
+
+    def test_matches_names_and_marked_tickers_only(self):
+        matcher = CompanyMatcher(COMPANIES)
+        self.assertEqual(matcher.match("apple and Amazon.com Inc. results"), ["Apple Inc.", "Amazon.com Inc."])
+        self.assertEqual(matcher.match("Chipmaker (NASDAQ: ON) and $AAPL rally"), ["ON Semiconductor Corp", "Apple Inc."])
+        # Bare tickers that are ordinary words, and names inside other words, do not match
+        self.assertEqual(matcher.match("Turn ON the Pineapple press"), [])
+
+    def test_tickers_stored_with_an_exchange_match(self):
+        matcher = CompanyMatcher([{"name": "Tesla Inc.", "ticker": "TSLA (NASDAQ)"},
+                                  {"name": "NVIDIA Corporation", "ticker": "NVD(NASDAQ)"}])
+        self.assertEqual(matcher.match("Carmaker (TSLA) recalls"), ["Tesla Inc."])
+        self.assertEqual(matcher.match("$NVD and NASDAQ: TSLA fall"), ["NVIDIA Corporation", "Tesla Inc."])
+
+class FeedServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MockFeedHandler)
+        self.server.body = RSS
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/feed.xml"
+        self.checkpoints = FeedCheckpoints(Path(tempfile.mkdtemp()) / "feeds.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestFeedIngestion(FeedServerTestCase):
+    def poll(self):
+        result = fetch_feed_articles(COMPANIES, [self.url], checkpoints=self.checkpoints)
+        for feed_url, polled in result["feeds"].items():
+            self.checkpoints.advance(feed_url, polled["etag"], polled["last_modified"], polled["entry_ids"])
+        return result
+
+    def test_one_poll_matches_entries_to_companies(self):
+        result = self.poll()
+        self.assertEqual(sorted(result["articles"]), ["Amazon.com Inc.", "Apple Inc."])
+        apple = result["articles"]["Apple Inc."][0]
+        self.assertEqual(apple["description"], "The iPhone maker cut emissions.")
+        self.assertEqual(apple["publishedAt"], "2024-05-06T10:00:00Z")
+        self.assertEqual(apple["source"]["name"], "ESG Wire")
+        self.assertEqual(result["feeds"][self.url]["entry_ids"], ["1", "2", "3"])
+
+    def test_conditional_get_and_seen_entries(self):
+        self.poll()
+        self.assertEqual(self.poll()["articles"], {})
+        self.assertIsNotNone(self.server.requests[-1])
+        # A changed feed is downloaded again, but only new entries are returned
+        self.server.body = RSS.replace("<item><guid>1</guid>", "<item><guid>4</guid><title>Apple board adds director</title></item><item><guid>1</guid>")
+        result = self.poll()
+        self.assertEqual([a["title"] for a in result["articles"]["Apple Inc."]], ["Apple board adds director"])
+
+class TestFeedCycle(FeedServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.store = ArticleStore(str(self.tmp_dir / "articles.db"))
+        self.events = []
+        self.fail_for = {"Amazon.com Inc."}
+        self.store.add_articles = self.recorded("persist", self.store.add_articles)
+        self.checkpoints.save = self.recorded("checkpoint", self.checkpoints.save)
+        for patcher in (mock.patch.object(pipeline, "get_article_store", return_value=self.store),
+                        mock.patch.object(pipeline, "analyze_articles", side_effect=self.analyze_articles),
+                        mock.patch.object(pipeline, "aggregate_stage", side_effect=self.aggregate_stage)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        super().tearDown()
+        self.store.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def recorded(self, event, func):
+        def wrapper(*args, **kwargs):
+            self.events.append(event)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def analyze_articles(self, articles, tier=None, timeout=None):
+        self.events.append("analyze")
+        if any("AMZN" in article["title"] for article in articles) and "Amazon.com Inc." in self.fail_for:
+            raise RuntimeError("NLP worker died")
+        return [dict(article, nlp_analysis={}) for article in articles]
+
+    def aggregate_stage(self, companies, store=None):
+        self.events.append("aggregate")
+        return {}
+
+    def run_cycle(self, cycle_id):
+        self.events.clear()
+        pipeline.run_feed_cycle(COMPANIES, [self.url], cycle_id=cycle_id, runs_dir=self.tmp_dir / "runs",
+                                checkpoints=self.checkpoints)
+
+    def stored_titles(self):
+        return sorted(article["title"] for article in self.store.query())
+
+    def test_failed_company_entries_are_polled_again(self):
+        self.run_cycle("feeds-1")
+        self.assertEqual(self.events, ["analyze", "analyze", "persist", "checkpoint", "aggregate"])
+        self.assertEqual(self.stored_titles(), ["Apple expands renewable energy use"])
+        # Amazon's entry is not marked seen and the feed keeps no validators, so it is downloaded again
+        self.assertEqual(self.checkpoints.seen_ids(self.url), {"1", "3"})
+        self.assertEqual(self.checkpoints.validators(self.url), (None, None))
+
+        self.fail_for.clear()
+        self.run_cycle("feeds-2")
+        self.assertIsNone(self.server.requests[-1])
+        self.assertEqual(self.stored_titles(), ["Apple expands renewable energy use", "Warehouse strike hits ($AMZN) shipments"])
+        self.assertEqual(self.checkpoints.seen_ids(self.url), {"1", "2", "3"})
+        self.assertIsNotNone(self.checkpoints.validators(self.url)[0])
+
+    def test_entries_are_not_marked_seen_when_persist_fails(self):
+        self.fail_for.clear()
+        self.store.add_articles = mock.Mock(side_effect=RuntimeError("disk full"))
+        self.run_cycle("feeds-1")
+        # Only the entry matching no company is marked seen; the feed is downloaded again
+        self.assertEqual(self.checkpoints.seen_ids(self.url), {"3"})
+        self.assertEqual(self.checkpoints.validators(self.url), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
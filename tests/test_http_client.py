@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from data_collection.http_client import HttpClient, TokenBucket
+
+class MockNewsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.client_ports.add(self.client_address[1])
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            fail = server.failures_left > 0
+            if fail:
+                server.failures_left -= 1
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+
+        status, body = (429, b'{"status": "error"}') if fail else (200, b'{"status": "ok", "articles": []}')
+        self.send_response(status)
+        if fail:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MockNewsHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.client_ports = set()
+        self.server.active = 0
+        self.server.max_active = 0
+        self.server.failures_left = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v2/everything"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_rate_limited_responses(self):
+        self.server.failures_left = 2
+        client = HttpClient(max_retries=3, backoff_base=0.01)
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.failures_left = 10
+        client = HttpClient(max_retries=1, backoff_base=0.01)
+        self.assertEqual(client.get(self.url).status_code, 429)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_reuses_keep_alive_connections(self):
+        client = HttpClient()
+        for _ in range(5):
+            client.get(self.url).json()
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_per_host_concurrency_cap(self):
+        self.server.delay = 0.05
+        client = HttpClient(per_host_concurrency=2)
+        threads = [threading.Thread(target=client.get, args=(self.url,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.requests, 8)
+        self.assertLessEqual(self.server.max_active, 2)
+
+class TestTokenBucket(unittest.TestCase):
+    def test_limits_sustained_rate(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # The first token is free, the next five wait 1/50s each
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0, capacity=0)
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
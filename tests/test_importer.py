@@ -0,0 +1,212 @@
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from backend.api import imports
+from database.database import Base, make_engine
+from database.importer import DatabaseStore, JsonStore, detect_format, run_import
+from database.models import Company, ESGScore
+
+COMPANIES_CSV = """name,ticker,sector,region
+Apple Inc.,aapl,Technology,North America
+Shell plc,SHEL,Energy,Europe
+,NONAME,Energy,Europe
+Apple Inc.,AAPL,,
+"""
+
+SCORES_JSONL = "\n".join([
+    json.dumps({"ticker": "AAPL", "rating_date": "2024-01-01", "environmental_score": 60,
+                "social_score": 70, "governance_score": 80}),
+    json.dumps({"company": "shell plc", "rating_date": "2024-01-01", "total_score": 40, "source": "Vendor"}),
+    "{not json",
+    json.dumps({"ticker": "MSFT", "rating_date": "2024-01-01", "total_score": 50}),
+    json.dumps({"company_id": 1, "rating_date": "2024-13-01", "total_score": 50}),
+    json.dumps({"company_id": 1, "rating_date": "2024-02-01", "total_score": 150}),
+]) + "\n"
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.engine = make_engine(f"sqlite:///{self.tmp_dir / 'test.db'}", role="script")
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.store = DatabaseStore(self.Session)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name, text, compress=False):
+        path = self.tmp_dir / name
+        path.write_bytes(gzip.compress(text.encode()) if compress else text.encode())
+        return path
+
+    def run_companies(self, store=None):
+        return run_import("companies", self.write("companies.csv", COMPANIES_CSV), store=store or self.store,
+                          chunk_size=2, progress=None)
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("history.csv.gz"), "csv")
+        self.assertEqual(detect_format("history.ndjson"), "jsonl")
+        self.assertEqual(detect_format("history.parquet"), "parquet")
+        with self.assertRaises(ValueError):
+            detect_format("history.xlsx")
+
+    def test_companies_upsert_by_ticker(self):
+        stats = self.run_companies()
+        self.assertEqual((stats["rows"], stats["inserted"], stats["rejected"]), (4, 2, 1))
+        self.assertEqual(stats["errors"], [{"row": 3, "error": "name is missing"}])
+
+        # Apple appears in both chunks of two rows, so it is updated once per chunk
+        stats = self.run_companies()
+        self.assertEqual((stats["inserted"], stats["updated"]), (0, 3))
+        db = self.Session()
+        companies = {c.ticker: c for c in db.query(Company)}
+        db.close()
+        self.assertEqual(sorted(companies), ["AAPL", "SHEL"])
+        # A blank sector on a later row does not overwrite the stored one
+        self.assertEqual(companies["AAPL"].sector, "Technology")
+
+    def test_scores_resolve_validate_and_upsert(self):
+        self.run_companies()
+        errors_path = self.tmp_dir / "rejected.jsonl"
+        path = self.write("scores.jsonl.gz", SCORES_JSONL, compress=True)
+        stats = run_import("scores", path, store=self.store, chunk_size=4, errors_path=str(errors_path), progress=None)
+
+        self.assertEqual((stats["rows"], stats["inserted"], stats["updated"], stats["rejected"]), (6, 2, 0, 4))
+        self.assertEqual([e["row"] for e in stats["errors"]], [3, 4, 5, 6])
+        self.assertIn("invalid JSON", stats["errors"][0]["error"])
+        self.assertIn("unknown company", stats["errors"][1]["error"])
+        self.assertIn("out of range", stats["errors"][3]["error"])
+        self.assertEqual(len(errors_path.read_text().splitlines()), 4)
+
+        db = self.Session()
+        apple = db.query(ESGScore).filter_by(company_id=1).one()
+        self.assertEqual((float(apple.total_score), apple.source), (70.0, "Import"))
+        db.close()
+
+        stats = run_import("scores", io.BytesIO(SCORES_JSONL.encode()), fmt="jsonl", store=self.store, progress=None)
+        self.assertEqual((stats["inserted"], stats["updated"]), (0, 2))
+
+    def test_json_store(self):
+        data_dir = self.tmp_dir / "data"
+        data_dir.mkdir()
+        (data_dir / "companies.json").write_text(json.dumps([{"id": 7, "name": "Shell plc", "ticker": "SHEL"}]))
+        self.run_companies(JsonStore(data_dir))
+        scores = "company_id,rating_date,total_score\n7,2024-01-01,55\n8,2024-01-01,45\n"
+        stats = run_import("scores", self.write("scores.csv", scores), store=JsonStore(data_dir), progress=None)
+
+        companies = json.loads((data_dir / "companies.json").read_text())
+        self.assertEqual(sorted((c["id"], c["ticker"]) for c in companies), [(7, "SHEL"), (8, "AAPL")])
+        saved = json.loads((data_dir / "esg_scores.json").read_text())
+        self.assertEqual(stats["inserted"], 2)
+        self.assertEqual(saved[0]["rating_date"], date(2024, 1, 1).isoformat())
+
+    def test_company_ids_come_from_the_database(self):
+        self.run_companies()
+        load_index = self.store.load_index
+
+        def load_index_then_concurrent_insert():
+            # Another writer adds a company after this import has loaded its index
+            index = load_index()
+            db = self.Session()
+            db.add(Company(name="Microsoft Corp.", ticker="MSFT"))
+            db.commit()
+            db.close()
+            return index
+
+        with mock.patch.object(self.store, "load_index", load_index_then_concurrent_insert):
+            stats = run_import("companies", io.BytesIO(b"name,ticker\nNestle SA,NESN\nNestle SA,NESN\n"),
+                               fmt="csv", store=self.store, chunk_size=1, progress=None)
+        self.assertEqual((stats["inserted"], stats["updated"]), (1, 1))
+
+        db = self.Session()
+        ids = {c.ticker: c.id for c in db.query(Company)}
+        db.close()
+        self.assertEqual(ids, {"AAPL": 1, "SHEL": 2, "MSFT": 3, "NESN": 4})
+
+    def test_parquet_import(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        self.run_companies()
+        path = self.tmp_dir / "scores.parquet"
+        pq.write_table(pa.table({
+            "ticker": ["AAPL", "SHEL", "MSFT"],
+            "rating_date": ["2024-01-01", "2024-01-01", "2024-01-01"],
+            "total_score": [70.0, 40.0, 50.0],
+        }), path)
+        stats = run_import("scores", path, store=self.store, chunk_size=2, progress=None)
+        self.assertEqual((stats["rows"], stats["inserted"], stats["rejected"]), (3, 2, 1))
+        self.assertIn("unknown company", stats["errors"][0]["error"])
+
+
+class TestImportAPI(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.engine = make_engine(f"sqlite:///{self.tmp_dir / 'test.db'}", role="script")
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        app = FastAPI()
+        app.include_router(imports.router, prefix="/api/import")
+        self.client = TestClient(app)
+        patches = [
+            mock.patch.object(imports, "IMPORT_API_TOKEN", "secret"),
+            mock.patch.object(imports, "IMPORT_MAX_BYTES", 1024),
+            mock.patch.object(imports, "get_store", lambda target: DatabaseStore(self.Session)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def post(self, body, token="secret", **headers):
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return self.client.post("/api/import/companies?format=csv", content=body, headers=headers)
+
+    def test_import_with_token(self):
+        response = self.post(COMPANIES_CSV.encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["inserted"], response.json()["rejected"]), (2, 1))
+
+        response = self.post(gzip.compress(COMPANIES_CSV.encode()), **{"Content-Encoding": "gzip"})
+        self.assertEqual(response.json()["updated"], 2)
+
+    def test_rejects_missing_or_wrong_token(self):
+        self.assertEqual(self.post(COMPANIES_CSV.encode(), token=None).status_code, 401)
+        self.assertEqual(self.post(COMPANIES_CSV.encode(), token="guess").status_code, 401)
+        with mock.patch.object(imports, "IMPORT_API_TOKEN", ""):
+            self.assertEqual(self.post(COMPANIES_CSV.encode()).status_code, 403)
+        db = self.Session()
+        self.assertEqual(db.query(Company).count(), 0)
+        db.close()
+
+    def test_rejects_oversized_upload(self):
+        body = COMPANIES_CSV.encode() * 20
+        self.assertEqual(self.post(body).status_code, 413)
+        # Without a Content-Length the limit applies to the streamed body
+        response = self.client.post("/api/import/companies?format=csv", content=iter([body[:800], body[800:]]),
+                                    headers={"Authorization": "Bearer secret"})
+        self.assertEqual(response.status_code, 413)
+        db = self.Session()
+        self.assertEqual(db.query(Company).count(), 0)
+        db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import requests
+from data_collection.mock_server import MockCollectionServer, SyntheticCorpus
+from data_collection.scrapers.reports_scraper import download_report
+
+class TestMockServer(unittest.TestCase):
+    def setUp(self):
+        corpus = SyntheticCorpus(articles_per_company=25, report_pages=2)
+        self.server = MockCollectionServer(corpus=corpus, news_rate_per_sec=0.001, news_burst=3).start()
+        self.news_url = self.server.settings_env()["NEWS_API_URL"]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_everything_paginates_and_filters(self):
+        first = requests.get(self.news_url, params={"q": "Acme", "pageSize": 10, "page": 1}).json()
+        third = requests.get(self.news_url, params={"q": "Acme", "pageSize": 10, "page": 3}).json()
+        self.assertEqual(first["totalResults"], 25)
+        self.assertEqual((len(first["articles"]), len(third["articles"])), (10, 5))
+        since = first["articles"][4]["publishedAt"]
+        recent = requests.get(self.news_url, params={"q": "Acme", "from": since}).json()
+        self.assertTrue(all(a["publishedAt"] >= since for a in recent["articles"]))
+
+    def test_rate_limit_returns_429(self):
+        statuses = [requests.get(self.news_url, params={"q": "Acme"}).status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(self.server.stats()["requests"]["v2 429"], 1)
+
+    def test_report_supports_conditional_get(self):
+        search = requests.get(self.server.settings_env()["REPORT_SEARCH_URL"], params={"q": "ACME annual report pdf"})
+        self.assertIn("/reports/ACME-annual-report.pdf", search.text)
+        url = f"{self.server.base_url}/reports/ACME-annual-report.pdf"
+        first = download_report(url)
+        self.assertTrue(first["pdf"].read().startswith(b"%PDF"))
+        self.assertTrue(download_report(url, etag=first["etag"])["not_modified"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from nlp_engine.cache import AnalysisCache, make_cache_key
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = AnalysisCache(":memory:", max_entries=10)
+        self.calls = []
+
+    def tearDown(self):
+        self.cache.close()
+
+    def analyze(self, text):
+        self.calls.append(text)
+        return {"label": "positive", "score": 0.9}
+
+    def test_hit_after_miss(self):
+        first = self.cache.get_or_compute("sentiment", "Green bonds issued.", self.analyze, "finbert", "v1")
+        second = self.cache.get_or_compute("sentiment", "  Green   bonds\nissued. ", self.analyze, "finbert", "v1")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+
+    def test_case_is_part_of_the_key(self):
+        # Cased models may score these differently, so they must not share a result
+        self.cache.get_or_compute("sentiment", "Green bonds issued.", self.analyze, "distilroberta", "v1")
+        self.cache.get_or_compute("sentiment", "GREEN BONDS ISSUED.", self.analyze, "distilroberta", "v1")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_key_includes_model_and_lexicon(self):
+        key = make_cache_key("sentiment", "text", "finbert", "v1")
+        self.assertNotEqual(key, make_cache_key("sentiment", "text", "finbert", "v2"))
+        self.assertNotEqual(key, make_cache_key("sentiment", "text", "distilbert", "v1"))
+        self.assertNotEqual(key, make_cache_key("entities", "text", "finbert", "v1"))
+
+    def test_none_results_are_not_cached(self):
+        self.cache.get_or_compute("sentiment", "text", lambda text: None, "finbert", "v1")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        for i in range(10):
+            self.cache.get_or_compute("sentiment", f"article {i}", self.analyze, "finbert", "v1")
+        # Touch the oldest entry so it survives eviction
+        self.cache.get_or_compute("sentiment", "article 0", self.analyze, "finbert", "v1")
+        self.cache.get_or_compute("sentiment", "article 10", self.analyze, "finbert", "v1")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 9)
+        self.assertEqual(stats["evictions"], 2)
+        found, _ = self.cache.get(make_cache_key("sentiment", "article 0", "finbert", "v1"))
+        self.assertTrue(found)
+        found, _ = self.cache.get(make_cache_key("sentiment", "article 1", "finbert", "v1"))
+        self.assertFalse(found)
+
+    def test_file_cache_is_shared_between_connections(self):
+        # Each NLP worker process opens its own connection to the same file
+        tmp_dir = Path(tempfile.mkdtemp())
+        try:
+            first = AnalysisCache(str(tmp_dir / "cache.db"))
+            second = AnalysisCache(str(tmp_dir / "cache.db"))
+            self.assertEqual(first._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertGreater(first._conn.execute("PRAGMA busy_timeout").fetchone()[0], 0)
+            first.get_or_compute("sentiment", "text", self.analyze, "finbert", "v1")
+            second.get_or_compute("sentiment", "text", self.analyze, "finbert", "v1")
+            self.assertEqual(len(self.calls), 1)
+            first.close()
+            second.close()
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_size_cap_holds_across_instances(self):
+        # Every worker process inserts into the same file, so the cap must count all of their rows
+        tmp_dir = Path(tempfile.mkdtemp())
+        try:
+            caches = [AnalysisCache(str(tmp_dir / "cache.db"), max_entries=10) for _ in range(2)]
+            for i in range(40):
+                caches[i % 2].get_or_compute("sentiment", f"article {i}", self.analyze, "finbert", "v1")
+            rows = caches[0]._conn.execute("SELECT COUNT(*) FROM nlp_cache").fetchone()[0]
+            self.assertLessEqual(rows, 10)
+            found, _ = caches[0].get(make_cache_key("sentiment", "article 39", "finbert", "v1"))
+            self.assertTrue(found)
+            for cache in caches:
+                cache.close()
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_hits_do_not_write_until_flushed(self):
+        self.cache.get_or_compute("sentiment", "text", self.analyze, "finbert", "v1")
+        changes = self.cache._conn.total_changes
+        for _ in range(3):
+            self.cache.get_or_compute("sentiment", "text", self.analyze, "finbert", "v1")
+        self.assertEqual(self.cache._conn.total_changes, changes)
+        # The refresh is written with the next insert
+        self.cache.get_or_compute("sentiment", "other text", self.analyze, "finbert", "v1")
+        self.assertEqual(self.cache._conn.total_changes, changes + 2)
+
+if __name__ == '__main__':
+    unittest.main()
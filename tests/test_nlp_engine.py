@@ -1,9 +1,50 @@
 # This file will contain tests for the NLP engine module.
 import unittest
+from nlp_engine.analysis import split_sentences, select_esg_sentences, build_prefilter_lexicon, analyze_sentiment
 
 class TestNlpEngine(unittest.TestCase):
     def test_example(self):
         self.assertEqual(1, 1)
 
+class TestSentencePrefilter(unittest.TestCase):
+    def setUp(self):
+        self.sentences = split_sentences(
+            "Revenue grew by 4%. Our carbon emissions fell sharply this year. "
+            "The office moved to a new building.\n\nWe faced a bribery probe in Asia! "
+            "Dividends were unchanged. Capital spending rose."
+        )
+
+    def test_split_sentences(self):
+        self.assertEqual(len(self.sentences), 6)
+        self.assertEqual(self.sentences[0], "Revenue grew by 4%.")
+        self.assertEqual(split_sentences(""), [])
+
+    def test_selects_keyword_hits_with_context(self):
+        self.assertEqual(select_esg_sentences(self.sentences, context_window=1), [0, 1, 2, 3, 4])
+        self.assertEqual(select_esg_sentences(self.sentences, context_window=0), [1, 3])
+
+    def test_custom_lexicon(self):
+        self.assertEqual(select_esg_sentences(self.sentences, lexicon=["dividends"], context_window=0), [4])
+        self.assertEqual(select_esg_sentences(self.sentences, lexicon=[], context_window=0), [])
+
+    def test_default_lexicon_covers_controversies(self):
+        lexicon = build_prefilter_lexicon()
+        self.assertIn("carbon emissions", lexicon)
+        self.assertIn("bribery", lexicon)
+
+class TestSentimentTiers(unittest.TestCase):
+    def test_lexicon_tier_is_tagged(self):
+        result = analyze_sentiment("Profits surge after record growth.", tier="lexicon")
+        self.assertEqual(result["label"], "positive")
+        self.assertEqual(result["tier"], "lexicon")
+
+    def test_lexicon_tier_negative_and_neutral(self):
+        self.assertEqual(analyze_sentiment("The firm was fined over fraud.", tier="lexicon")["label"], "negative")
+        self.assertEqual(analyze_sentiment("The meeting is on Tuesday.", tier="lexicon")["label"], "neutral")
+
+    def test_unknown_tier(self):
+        with self.assertRaises(ValueError):
+            analyze_sentiment("text", tier="gpt")
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
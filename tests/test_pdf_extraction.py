@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+import unittest
+from data_collection.pdf_extraction import iter_pdf_pages, extract_pdf_text
+
+def make_pdf(page_texts):
+    """Builds a minimal PDF with one line of Helvetica text per page (None = blank page)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    out.seek(0)
+    return out
+
+class TestPdfExtraction(unittest.TestCase):
+    def setUp(self):
+        self.pdf = make_pdf(["Page one", None, "Page three", "Page four", "Page five"])
+
+    def test_inline_extraction_handles_blank_pages(self):
+        self.assertEqual(list(iter_pdf_pages(self.pdf, processes=0)), ["Page one", "", "Page three", "Page four", "Page five"])
+
+    def test_page_cap(self):
+        self.assertEqual(extract_pdf_text(self.pdf, processes=0, max_pages=3), ("Page one\n\nPage three", False))
+        self.assertTrue(extract_pdf_text(self.pdf, processes=0, max_pages=5)[1])
+
+    def test_parallel_extraction_keeps_page_order(self):
+        pages = list(iter_pdf_pages(self.pdf, processes=2, pages_per_task=2))
+        self.assertEqual(pages, ["Page one", "", "Page three", "Page four", "Page five"])
+
+    def test_parallel_extraction_from_path(self):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(self.pdf.getvalue())
+        try:
+            self.assertEqual(extract_pdf_text(f.name, processes=2, pages_per_task=2),
+                             ("Page one\n\nPage three\nPage four\nPage five", True))
+        finally:
+            os.unlink(f.name)
+
+    def test_timeout_recycles_the_pool(self):
+        self.assertEqual(extract_pdf_text(self.pdf, processes=2, pages_per_task=2, timeout=0), ("", False))
+        # The next document gets a working pool
+        self.assertEqual(len(list(iter_pdf_pages(self.pdf, processes=2, pages_per_task=2))), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import hashlib
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from data_collection.report_cache import ReportCache
+from data_collection.scrapers.reports_scraper import download_report
+
+class MockReportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.server.body
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestReportCache(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MockReportHandler)
+        self.server.body = b"%PDF-1.4 annual report v1"
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/annual-report.pdf"
+
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.cache = ReportCache(":memory:", blob_dir=self.tmp_dir / "reports", url_ttl_hours=1)
+        self.extractions = []
+        self.complete = True
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def extract(self, pdf):
+        data = Path(pdf).read_bytes()
+        self.extractions.append(data)
+        return data.decode(), self.complete
+
+    def load(self):
+        content_hash, pdf = self.cache.fetch(self.url, download_report)
+        return content_hash, self.cache.get_text(content_hash, self.extract, pdf)[0]
+
+    def test_unchanged_report_is_not_downloaded_or_extracted_again(self):
+        first_hash, text = self.load()
+        self.assertEqual(text, "%PDF-1.4 annual report v1")
+        self.assertTrue(self.cache.blob_path(first_hash).exists())
+
+        second_hash, _ = self.load()
+        self.assertEqual(second_hash, first_hash)
+        self.assertEqual(len(self.extractions), 1)
+        # The second request was conditional and answered 304
+        self.assertIsNone(self.server.requests[0])
+        self.assertIsNotNone(self.server.requests[1])
+
+    def test_changed_bytes_produce_new_hash(self):
+        first_hash, _ = self.load()
+        self.server.body = b"%PDF-1.4 annual report v2"
+        second_hash, text = self.load()
+        self.assertNotEqual(second_hash, first_hash)
+        self.assertEqual(text, "%PDF-1.4 annual report v2")
+        self.assertEqual(len(self.extractions), 2)
+
+    def test_truncated_text_is_not_cached(self):
+        self.complete = False
+        content_hash, _ = self.load()
+        self.assertFalse(self.cache.has_text(content_hash))
+        self.complete = True
+        self.load()
+        self.assertEqual(len(self.extractions), 2)
+        self.assertTrue(self.cache.has_text(content_hash))
+
+    def test_resolved_url_is_reused_within_ttl(self):
+        searches = []
+        def find_url(ticker):
+            searches.append(ticker)
+            return self.url
+        self.assertEqual(self.cache.resolve_url("ACME", find_url), self.url)
+        self.assertEqual(self.cache.resolve_url("ACME", find_url), self.url)
+        self.assertEqual(searches, ["ACME"])
+
+if __name__ == '__main__':
+    unittest.main()
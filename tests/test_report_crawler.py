@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from data_collection.mock_server import make_pdf
+from data_collection.report_cache import ReportCache
+from data_collection.report_crawler import report_kind, report_rank
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Fixture IR site: the investors page links to a reports page (and to unrelated pages)
+PAGES = {
+    "/robots.txt": ("text/plain", b"User-agent: *\nAllow: /\n"),
+    "/acme/investors.html": ("text/html", b'<a href="/acme/reports.html">Reports and filings</a>'
+                                          b'<a href="/acme/careers.html">Careers</a>'
+                                          b'<a href="/acme/menu.pdf">Canteen menu</a>'),
+    "/acme/careers.html": ("text/html", b'<a href="/acme/jobs.pdf">Annual job fair</a>'),
+    "/acme/reports.html": ("text/html", b'<a href="/acme/files/ar-2023.pdf">Annual Report 2023</a>'
+                                        b'<a href="/acme/files/sustainability-2024.pdf">Sustainability Report 2024</a>'),
+    "/acme/menu.pdf": ("application/pdf", make_pdf(["Soup of the day"])),
+    "/acme/jobs.pdf": ("application/pdf", make_pdf(["Job fair"])),
+    "/acme/files/ar-2023.pdf": ("application/pdf", make_pdf(["Acme annual report 2023"])),
+    "/acme/files/sustainability-2024.pdf": ("application/pdf", make_pdf(["Acme cut emissions by 20 percent"])),
+}
+
+class FixtureSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        content_type, body = PAGES.get(self.path, ("text/plain", b"Not found"))
+        etag = '"%d"' % hash(body)
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified.append(self.path)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200 if self.path in PAGES else 404)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestReportRanking(unittest.TestCase):
+    def test_kind_and_rank(self):
+        self.assertEqual(report_kind("https://x.com/ESG-report.pdf"), "sustainability")
+        self.assertEqual(report_kind("https://x.com/files/10-K.pdf"), "annual")
+        self.assertIsNone(report_kind("https://x.com/menu.pdf"))
+        self.assertGreater(report_rank("https://x.com/ar-2024.pdf"), report_rank("https://x.com/esg-2023.pdf"))
+        self.assertGreater(report_rank("https://x.com/esg-2024.pdf"), report_rank("https://x.com/ar-2024.pdf"))
+
+class TestReportCrawler(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureSiteHandler)
+        self.server.requests = []
+        self.server.not_modified = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.companies_file = self.tmp_dir / "companies.json"
+        with open(self.companies_file, "w") as f:
+            json.dump([{"id": 1, "name": "Acme Corp", "ticker": "ACME",
+                        "ir_url": f"http://127.0.0.1:{self.server.server_port}/acme/investors.html"}], f)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def crawl(self, returncode=0):
+        env = {
+            **os.environ,
+            "REPORT_CACHE_PATH": str(self.tmp_dir / "report_cache.db"),
+            "REPORT_CACHE_DIR": str(self.tmp_dir / "reports"),
+            "REPORT_CRAWL_HTTPCACHE_DIR": str(self.tmp_dir / "crawl_cache"),
+            "REPORT_CRAWL_EXTRACT": "true",
+            "REPORT_EXTRACT_PROCESSES": "0",
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")])),
+        }
+        result = subprocess.run(
+            [sys.executable, "-m", "data_collection.report_crawler", "--companies-file", str(self.companies_file),
+             "--job-dir", str(self.tmp_dir / "crawl_job")],
+            env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, returncode, result.stderr[-2000:])
+        return result.stdout
+
+    def test_crawls_fixture_site_into_report_cache(self):
+        output = self.crawl()
+        self.assertIn("2 reports stored", output)
+        self.assertNotIn("/acme/menu.pdf", self.server.requests)
+        self.assertNotIn("/acme/careers.html", self.server.requests)
+
+        cache = ReportCache(self.tmp_dir / "report_cache.db", blob_dir=self.tmp_dir / "reports")
+        try:
+            url = cache.cached_url("ACME")
+            self.assertTrue(url.endswith("/acme/files/sustainability-2024.pdf"))
+            content_hash = cache.validators(url)[2]
+            self.assertTrue(cache.blob_path(content_hash).exists())
+            self.assertIn("emissions", cache.get_text(content_hash, extract=None)[0])
+        finally:
+            cache.close()
+        # A finished crawl clears its job state so the next one starts afresh
+        self.assertFalse((self.tmp_dir / "crawl_job").exists())
+
+    def test_reports_are_revalidated_against_the_report_cache(self):
+        self.crawl()
+        # PDFs are kept by the report cache only, not duplicated in the HTTP cache
+        cached = [path.read_text() for path in (self.tmp_dir / "crawl_cache").rglob("meta")]
+        self.assertTrue(cached)
+        self.assertFalse([meta for meta in cached if ".pdf" in meta])
+
+        output = self.crawl()
+        self.assertIn("2 reports stored", output)
+        # Pages are revalidated by the HTTP cache, PDFs with the report cache's validators
+        self.assertEqual(sorted(path for path in self.server.not_modified if path.endswith(".pdf")),
+                         ["/acme/files/ar-2023.pdf", "/acme/files/sustainability-2024.pdf"])
+
+    def test_fails_without_crawlable_seeds(self):
+        with open(self.companies_file, "w") as f:
+            json.dump([{"id": 1, "name": "Acme Corp", "ticker": "ACME"}], f)
+        self.assertIn("ACME", self.crawl(returncode=1))
+
+        with open(self.companies_file, "w") as f:
+            json.dump([{"id": 1, "name": "Acme Corp", "ticker": "ACME",
+                        "ir_url": f"http://127.0.0.1:{self.server.server_port}/acme/missing.html"}], f)
+        self.assertIn("None of the seed pages could be crawled", self.crawl(returncode=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from database.async_database import async_database_url, make_async_engine
+from database.database import Base, make_engine
+from database.models import Company, ESGScore, Portfolio
+from database.repository import AsyncRepository, Repository
+from backend.services.portfolio_summary import latest_scores_by_company, summarize_portfolios
+
+class TestRepositories(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.url = f"sqlite:///{self.tmp_dir / 'test.db'}"
+        self.engine = make_engine(self.url, role="script")
+        Base.metadata.create_all(bind=self.engine)
+        db = sessionmaker(bind=self.engine)()
+        apple = Company(id=1, name="Apple Inc.", ticker="AAPL", sector="Technology", region="North America")
+        shell = Company(id=2, name="Shell plc", ticker="SHEL", sector="Energy", region="Europe")
+        db.add_all([apple, shell, Company(id=3, name="Unscored Co", ticker="UNS")])
+        db.add_all([
+            ESGScore(company_id=1, total_score=70, environmental_score=60, social_score=70, governance_score=80,
+                     rating_date=date(2024, 1, 1), source="old"),
+            ESGScore(company_id=1, total_score=75, environmental_score=65, social_score=75, governance_score=85,
+                     rating_date=date(2024, 6, 1), source="first of the day"),
+            ESGScore(company_id=1, total_score=80, environmental_score=70, social_score=80, governance_score=90,
+                     rating_date=date(2024, 6, 1), source="latest"),
+            ESGScore(company_id=2, total_score=40, environmental_score=30, social_score=45, governance_score=45,
+                     rating_date=date(2023, 1, 1), source="latest"),
+        ])
+        db.add(Portfolio(id=1, name="Mixed", companies=[apple, shell]))
+        db.commit()
+        db.close()
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def check_results(self, companies, latest, portfolios):
+        self.assertEqual([c["ticker"] for c in companies], ["AAPL", "SHEL", "UNS"])
+        self.assertEqual(set(latest), {1, 2})
+        self.assertEqual(latest[1]["source"], "latest")
+        self.assertEqual(latest[1]["total_score"], 80.0)
+        self.assertEqual(latest[1]["rating_date"], "2024-06-01")
+        self.assertEqual(portfolios, [{"id": 1, "name": "Mixed", "description": None,
+                                       "companies": [{"id": 1}, {"id": 2}]}])
+
+    def test_sync_repository(self):
+        db = sessionmaker(bind=self.engine)()
+        try:
+            repository = Repository(db)
+            self.check_results(repository.list_companies(), repository.latest_scores(), repository.list_portfolios())
+            self.assertEqual(list(repository.latest_scores([2])), [2])
+            self.assertEqual(repository.sectors(), ["Energy", "Technology"])
+            self.assertEqual(repository.regions(), ["Europe", "North America"])
+            self.assertIsNone(repository.get_portfolio(99))
+        finally:
+            db.close()
+
+    def test_async_repository_matches_sync(self):
+        async def read():
+            engine = make_async_engine(async_database_url(self.url), role="script")
+            try:
+                async with AsyncSession(engine) as db:
+                    repository = AsyncRepository(db)
+                    return (await repository.list_companies(), await repository.latest_scores(),
+                            await repository.list_portfolios(), await repository.get_company(2))
+            finally:
+                await engine.dispose()
+
+        companies, latest, portfolios, shell = asyncio.run(read())
+        self.check_results(companies, latest, portfolios)
+        self.assertEqual(shell["name"], "Shell plc")
+
+    def test_portfolios_with_scores_in_constant_queries(self):
+        db = sessionmaker(bind=self.engine)()
+        try:
+            members = db.query(Company).order_by(Company.id).all()
+            db.add_all(Portfolio(id=i, name=f"Portfolio {i}", companies=members[: 1 + i % 3]) for i in range(2, 40))
+            db.commit()
+
+            statements = []
+            event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            repository = Repository(db)
+            portfolios = repository.list_portfolios_with_scores()
+            self.assertEqual(len(statements), 3)
+
+            mixed = portfolios[0]
+            self.assertEqual([c["ticker"] for c in mixed["companies"]], ["AAPL", "SHEL"])
+            self.assertEqual(mixed["companies"][0]["latest_score"]["source"], "latest")
+            self.assertEqual(len(portfolios), 39)
+
+            self.assertEqual([s["id"] for s in repository.portfolio_summaries(portfolio_ids=[1, 5])], [1, 5])
+            summary = repository.portfolio_summaries(portfolio_ids=[1])[0]
+            self.assertEqual(summary["company_count"], 2)
+            self.assertEqual(summary["average_total"], 60.0)
+            self.assertEqual(summary["as_of"], "2024-06-01")
+            self.assertEqual(repository.list_portfolios_with_scores(portfolio_id=99), [])
+        finally:
+            db.close()
+
+    def test_summaries_from_json_records(self):
+        scores = [
+            {"company_id": 1, "rating_date": "2024-06-01", "total_score": 80.0, "environmental_score": 70.0},
+            {"company_id": 1, "rating_date": "2023-01-01", "total_score": 10.0, "environmental_score": 10.0},
+            {"company_id": 2, "rating_date": "2024-01-01", "total_score": 41.0, "environmental_score": None},
+        ]
+        portfolios = [{"id": 1, "name": "A", "companies": [{"id": 1}, {"id": 2}, {"id": 3}]},
+                      {"id": 2, "name": "Empty", "companies": []}]
+        summaries = summarize_portfolios(portfolios, latest_scores_by_company(scores))
+        self.assertEqual(summaries[0]["average_total"], 60.5)
+        self.assertEqual(summaries[0]["average_environmental"], 70.0)
+        self.assertEqual((summaries[0]["company_count"], summaries[0]["scored_count"]), (3, 2))
+        self.assertIsNone(summaries[1]["average_total"])
+
+    def test_async_database_url(self):
+        self.assertEqual(async_database_url("sqlite:///./esg_builder.db"), "sqlite+aiosqlite:///./esg_builder.db")
+        self.assertEqual(async_database_url("postgresql://u:p@host:5432/esg_db"), "postgresql+asyncpg://u:p@host:5432/esg_db")
+        self.assertEqual(async_database_url("sqlite+aiosqlite:///x.db"), "sqlite+aiosqlite:///x.db")
+        with self.assertRaises(ValueError):
+            async_database_url("mysql://host/db")
+
+if __name__ == '__main__':
+    unittest.main()
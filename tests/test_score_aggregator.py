@@ -0,0 +1,58 @@
+import unittest
+from backend.services.score_aggregator import DecayedScoreState, combine_states, decay_factor
+
+HOUR = 3600
+
+
+def scores(value):
+    return {f"{pillar}_score": value for pillar in ("environmental", "social", "governance", "total")}
+
+
+class TestScoreAggregator(unittest.TestCase):
+    def test_decay_factor(self):
+        self.assertAlmostEqual(decay_factor(24 * HOUR, 24), 0.5)
+        self.assertEqual(decay_factor(24 * HOUR, 0), 1.0)
+
+    def test_matches_weighted_mean_and_variance(self):
+        state = DecayedScoreState()
+        observations = [(0, 40.0), (12 * HOUR, 60.0), (36 * HOUR, 80.0)]
+        for at, value in observations:
+            state.update(scores(value), at, half_life_hours=24)
+
+        weights = [decay_factor(36 * HOUR - at, 24) for at, _ in observations]
+        mean = sum(w * v for w, (_, v) in zip(weights, observations)) / sum(weights)
+        variance = sum(w * (v - mean) ** 2 for w, (_, v) in zip(weights, observations)) / sum(weights)
+        self.assertAlmostEqual(state.mean["total"], mean)
+        self.assertAlmostEqual(state.variance("total"), variance)
+        self.assertAlmostEqual(state.weight, sum(weights))
+        self.assertEqual(state.count, 3)
+
+    def test_late_document_is_decayed(self):
+        in_order, late = DecayedScoreState(), DecayedScoreState()
+        in_order.update(scores(40.0), 0, 24)
+        in_order.update(scores(80.0), 24 * HOUR, 24)
+        late.update(scores(80.0), 24 * HOUR, 24)
+        late.update(scores(40.0), 0, 24)
+        self.assertAlmostEqual(late.mean["total"], in_order.mean["total"])
+        self.assertAlmostEqual(late.variance("total"), in_order.variance("total"))
+
+    def test_combine_weights_sources_by_decayed_weight(self):
+        news, report = DecayedScoreState(), DecayedScoreState()
+        news.update(scores(30.0), 0, 24)
+        report.update(scores(90.0), 0, 0)
+        half_lives = {"news": 24, "report": 0}
+        self.assertEqual(combine_states({"news": news, "report": report}, 0, half_lives)["total_score"], 60.0)
+        # A day later the news weighs half as much as the (non-decaying) report
+        later = combine_states({"news": news, "report": report}, 24 * HOUR, half_lives)
+        self.assertEqual(later["total_score"], 70.0)
+        self.assertEqual(later["documents"], 2)
+        self.assertIsNone(combine_states({}, 0, half_lives))
+
+    def test_round_trips_through_dict(self):
+        state = DecayedScoreState()
+        state.update(scores(55.0), 0, 24)
+        copy = DecayedScoreState.from_dict(state.to_dict())
+        self.assertEqual(copy.to_dict(), state.to_dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+from data_collection.streaming import Stage, StreamingPipeline
+
+class TestStreamingPipeline(unittest.TestCase):
+    def test_items_flow_through_all_stages(self):
+        pipeline = StreamingPipeline([
+            Stage("double", lambda x: x * 2, workers=3),
+            Stage("drop_odd_inputs", lambda x: x if x % 4 == 0 else None, workers=2),
+            Stage("split", lambda x: [x, x + 1], fan_out=True),
+        ])
+        results = pipeline.run(range(10))
+        self.assertEqual(sorted(results), [0, 1, 4, 5, 8, 9, 12, 13, 16, 17])
+        metrics = pipeline.metrics()
+        self.assertEqual(metrics["double"]["processed"], 10)
+        self.assertEqual(metrics["drop_odd_inputs"]["dropped"], 5)
+        self.assertEqual(metrics["split"]["queue_depth"], 0)
+
+    def test_errors_are_isolated(self):
+        errors = []
+        def fail_on_three(x):
+            if x == 3:
+                raise ValueError("bad item")
+            return x
+        pipeline = StreamingPipeline([Stage("check", fail_on_three)], on_error=lambda stage, item, e: errors.append(item))
+        self.assertEqual(sorted(pipeline.run(range(5))), [0, 1, 2, 4])
+        self.assertEqual(errors, [3])
+        self.assertEqual(pipeline.metrics()["check"]["errors"], 1)
+
+    def test_backpressure_bounds_queued_items(self):
+        release = threading.Event()
+        pipeline = StreamingPipeline([
+            Stage("fast", lambda x: x, queue_size=2),
+            Stage("slow", lambda x: release.wait(5) and x, queue_size=2),
+        ])
+        submitted = []
+        def produce():
+            for i in range(20):
+                pipeline.submit(i)
+                submitted.append(i)
+            pipeline.close()
+        producer = threading.Thread(target=produce)
+        producer.start()
+        time.sleep(0.3)
+        # 1 in the slow stage, 2 queued for it, 1 held by the fast worker, 2 queued for the fast stage
+        self.assertLessEqual(len(submitted), 6)
+        release.set()
+        producer.join(5)
+        self.assertEqual(sorted(pipeline.join(5)), list(range(20)))
+
+    def test_abort_drops_queued_items(self):
+        started = threading.Event()
+        release = threading.Event()
+        def block(x):
+            started.set()
+            release.wait(5)
+            return x
+        pipeline = StreamingPipeline([Stage("block", block, queue_size=10)])
+        for i in range(5):
+            pipeline.submit(i)
+        started.wait(5)
+        pipeline.abort()
+        release.set()
+        # The in-flight item finishes; the rest are dropped
+        self.assertEqual(pipeline.join(5), [0])
+        self.assertEqual(pipeline.metrics()["block"]["dropped"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
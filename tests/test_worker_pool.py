@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from nlp_engine.worker_pool import NLPWorkerPool
+
+
+def _echo_batch(texts, tier=None):
+    return [{"text": text, "pid": os.getpid()} for text in texts]
+
+
+def _crash_once_batch(texts, marker):
+    # The first worker to run dies hard, as a segfaulting model would; the restarted pool succeeds
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return _echo_batch(texts)
+
+
+def _crash_batch(texts, tier=None):
+    os._exit(1)
+
+
+def _hang_batch(texts, tier=None):
+    time.sleep(60)
+
+
+class LightWorkerPool(NLPWorkerPool):
+    """The real pool logic over plain spawn workers, without loading the NLP models."""
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class TestNLPWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.pool = LightWorkerPool(workers=2, torch_threads=1, batch_size=2, max_restarts=2)
+
+    def tearDown(self):
+        self.pool.shutdown(wait=False)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_results_keep_input_order_across_batches(self):
+        texts = [f"article {i}" for i in range(5)]
+        self.assertEqual([r["text"] for r in self.pool._run(_echo_batch, texts)], texts)
+        self.assertEqual(self.pool._run(_echo_batch, []), [])
+
+    def test_restarts_after_a_worker_crash(self):
+        broken = self.pool._executor
+        results = self.pool._run(_crash_once_batch, ["a", "b", "c"], str(self.tmp_dir / "crashed"))
+        self.assertEqual([r["text"] for r in results], ["a", "b", "c"])
+        self.assertEqual(self.pool.restarts, 1)
+        self.assertIsNot(self.pool._executor, broken)
+
+    def test_gives_up_after_max_restarts(self):
+        with self.assertRaises(BrokenProcessPool):
+            self.pool._run(_crash_batch, ["a"])
+        self.assertEqual(self.pool.restarts, self.pool.max_restarts)
+
+    def test_hung_call_times_out_and_recycles_the_pool(self):
+        self.pool._run(_echo_batch, ["warm up"])
+        hung = list(self.pool._executor._processes.values())
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            self.pool._run(_hang_batch, ["a"], None, 0.5)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(self.pool.restarts, 1)
+        for process in hung:
+            process.join(5)
+            self.assertFalse(process.is_alive())
+        self.assertEqual([r["text"] for r in self.pool._run(_echo_batch, ["b"], None, 30)], ["b"])
+
+    def test_shutdown_stops_the_workers(self):
+        self.pool._run(_echo_batch, ["a", "b", "c"])
+        processes = list(self.pool._executor._processes.values())
+        self.assertTrue(processes)
+        self.pool.shutdown(wait=True)
+        self.assertFalse(any(p.is_alive() for p in processes))
+        with self.assertRaises(RuntimeError):
+            self.pool._run(_echo_batch, ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main()